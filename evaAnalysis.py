@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+"""
+Analyses working on the columnar case data of evaData. CaseDiff,
+rollingSeries and Gradients accept any object with the attributes 'time'
+(sorted array), 'components' (list) and 'Tmax'/'Tmin' (arrays of shape
+(components, times)), such as evaData.CaseData or Series. Sensitivity works
+on the global extrema of many cases.
+"""
+
+import numpy as np
+
+import evaData
+
+
+class Series():
+    """ Minimal container for Tmax/Tmin time series of several components. """
+    def __init__(self, time, components, Tmax, Tmin, caseComb=None):
+        self.time = np.asarray(time, dtype=float)
+        self.components = list(components)
+        self.Tmax = Tmax
+        self.Tmin = Tmin
+        self.caseComb = caseComb
+        self._extrema = None
+
+
+    @property
+    def extrema(self):
+        """ Global extrema of every component, see evaData.findExtrema. """
+        if self._extrema is None:
+            self._extrema = evaData.findExtrema(self.time, self.components, self.Tmax, self.Tmin)
+        return self._extrema
+
+
+
+class CaseDiff():
+    """
+    Difference of case <a> minus case <b> for the components both cases
+    have in common. The cases are aligned on a common time axis, which is
+    the union of both time grids within the time range both cases cover.
+    Holds the series dTmax and dTmin of shape (components, times) and the
+    delta extrema per component in <extrema>.
+    """
+    def __init__(self, a, b):
+        self.a = a
+        self.b = b
+
+        # Common components, in the order of case a
+        indexA = dict((comp, i) for i, comp in enumerate(a.components))
+        indexB = dict((comp, i) for i, comp in enumerate(b.components))
+        self.components = [comp for comp in a.components if comp in indexB]
+        rowsA = [indexA[comp] for comp in self.components]
+        rowsB = [indexB[comp] for comp in self.components]
+
+        # Common time axis
+        start = max(a.time[0], b.time[0]) if len(a.time) and len(b.time) else 0.0
+        stop = min(a.time[-1], b.time[-1]) if len(a.time) and len(b.time) else -1.0
+        time = np.union1d(a.time, b.time)
+        self.time = time[(time >= start) & (time <= stop)]
+
+        # Interpolate all components of both cases at once
+        self.dTmax = evaData.interpolate(a.time, a.Tmax[rowsA], self.time) - evaData.interpolate(b.time, b.Tmax[rowsB], self.time)
+        self.dTmin = evaData.interpolate(a.time, a.Tmin[rowsA], self.time) - evaData.interpolate(b.time, b.Tmin[rowsB], self.time)
+
+        # Differences of the global extrema, taken on the original time grids
+        self.dGlobMax = np.fmax.reduce(a.Tmax[rowsA], axis=1) - np.fmax.reduce(b.Tmax[rowsB], axis=1) if rowsA else np.zeros(0)
+        self.dGlobMin = np.fmin.reduce(a.Tmin[rowsA], axis=1) - np.fmin.reduce(b.Tmin[rowsB], axis=1) if rowsA else np.zeros(0)
+
+        self.findExtrema()
+
+
+    def findExtrema(self):
+        """
+        Determines the delta extrema of every component. <extrema> maps
+        components to dictionaries with the differences of the global
+        maximum ('glob_max') and minimum ('glob_min'), and the (time, delta)
+        tuples of the largest increase ('max_delta') and decrease
+        ('min_delta') of Tmax and Tmin over time.
+        """
+        self.extrema = {}
+        both = np.concatenate([self.dTmax, self.dTmin], axis=1)
+        times = np.concatenate([self.time, self.time])
+        valid = ~np.isnan(both).all(axis=1)
+        iMax = np.argmax(np.where(np.isnan(both), -np.inf, both), axis=1)
+        iMin = np.argmin(np.where(np.isnan(both), np.inf, both), axis=1)
+        for i, comp in enumerate(self.components):
+            self.extrema[comp] = {'glob_max': self.dGlobMax[i], 'glob_min': self.dGlobMin[i]}
+            if valid[i]:
+                self.extrema[comp]['max_delta'] = (times[iMax[i]], both[i, iMax[i]])
+                self.extrema[comp]['min_delta'] = (times[iMin[i]], both[i, iMin[i]])
+
+
+    def saveExtrema(self, saveFile):
+        """ Writes the delta extrema of all components to a file. """
+        with open(saveFile, 'w') as f:
+            f.write('##############################\n# ESATAN Evaluation - Case {} minus Case {}\n##############################\n\n'.format(self.a.caseComb, self.b.caseComb))
+            f.write('{:60s}{:15s}{:15s}{:15s}{:15s}\n'.format('Component', 'dTmax', 'dTmin', 'max delta', 'min delta'))
+            for comp in self.components:
+                extrema = self.extrema[comp]
+                maxDelta = str(round(extrema['max_delta'][1], 2)) if 'max_delta' in extrema else ''
+                minDelta = str(round(extrema['min_delta'][1], 2)) if 'min_delta' in extrema else ''
+                f.write('{:60s}{:15s}{:15s}{:15s}{:15s}\n'.format(comp, str(round(extrema['glob_max'], 2)), str(round(extrema['glob_min'], 2)), maxDelta, minDelta))
+
+
+
+# Statistics available for rolling windows
+WINDOW_STATISTICS = ('mean', 'min', 'max')
+
+
+def windowStarts(time, window):
+    """ Returns the index of the first sample of the window (t - <window>, t] ending at every sample of the sorted array <time>. """
+    return np.searchsorted(time, time - window, side='right')
+
+
+def rollingMean(values, starts):
+    """
+    Mean of the rows of <values> over the windows from <starts> up to every
+    sample, from cumulative sums. NaN values are left out, windows without
+    any value are NaN.
+    """
+    present = ~np.isnan(values)
+    zeros = np.zeros((values.shape[0], 1))
+    total = np.concatenate([zeros, np.cumsum(np.where(present, values, 0.0), axis=1)], axis=1)
+    count = np.concatenate([zeros, np.cumsum(present, axis=1)], axis=1)
+    stops = np.arange(1, values.shape[1] + 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (total[:, stops] - total[:, starts]) / (count[:, stops] - count[:, starts])
+
+
+def rollingExtreme(values, starts, ufunc=np.fmax):
+    """
+    Maximum (or minimum for np.fmin) of the rows of <values> over the
+    windows from <starts> up to every sample. The reductions over 2**k
+    samples are built level by level. Every window is covered by two blocks
+    of the largest level fitting into it, so each level is one vectorized
+    operation over all rows and windows.
+    """
+    stops = np.arange(values.shape[1])
+    lengths = stops - starts + 1
+    levels = np.floor(np.log2(np.maximum(lengths, 1))).astype(int)
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] == 0:
+        return result
+    block = np.asarray(values, dtype=float)
+    k = 0
+    while True:
+        ind = np.flatnonzero(levels == k)
+        if len(ind):
+            result[:, ind] = ufunc(block[:, starts[ind]], block[:, stops[ind] - (1 << k) + 1])
+        if (1 << (k + 1)) > lengths.max():
+            return result
+        block = ufunc(block[:, :-(1 << k)], block[:, (1 << k):])
+        k += 1
+
+
+def rollingSeries(data, window, statistic='mean', chunk=64):
+    """
+    Applies <statistic> ('mean', 'min' or 'max') to Tmax and Tmin of every
+    component of <data> over a rolling window of <window> seconds, e.g. one
+    orbit. The window ending at time t covers the samples after t - window
+    up to t, so the mean is an average over samples, which equals the time
+    average for uniform time steps. Times before the first full window are
+    NaN. <chunk> components are processed at a time. Returns a Series.
+    """
+    if statistic not in WINDOW_STATISTICS:
+        raise ValueError("Unknown window statistic {}, use one of {}".format(statistic, ', '.join(WINDOW_STATISTICS)))
+    time = np.asarray(data.time, dtype=float)
+    starts = windowStarts(time, window)
+    rolled = []
+    for values in (data.Tmax, data.Tmin):
+        result = np.empty(values.shape)
+        for start in range(0, values.shape[0], chunk):
+            block = np.asarray(values[start:start + chunk], dtype=float)
+            if statistic == 'mean':
+                result[start:start + chunk] = rollingMean(block, starts)
+            else:
+                result[start:start + chunk] = rollingExtreme(block, starts, np.fmax if statistic == 'max' else np.fmin)
+        rolled.append(result)
+    if len(time):
+        partial = time - time[0] < window * (1 - 1e-9)
+        for values in rolled:
+            values[:, partial] = np.nan
+    return Series(time, data.components, rolled[0], rolled[1], getattr(data, 'caseComb', None))
+
+
+
+# Joins the components of a group to its name
+GROUP_SEPARATOR = '/'
+
+
+def parseGroups(setting):
+    """
+    Parses groups of components from a setting like 'battery_board1,
+    battery_board2; PC104_1, PC104_2, PC104_3'. Groups are separated by
+    semicolons, their components by commas. Returns a list of tuples, groups
+    of less than two components are left out.
+    """
+    groups = []
+    for group in setting.split(';'):
+        comps = [comp.strip() for comp in group.split(',') if comp.strip() != '']
+        if len(comps) >= 2:
+            groups.append(tuple(comps))
+    return groups
+
+
+def formatGroups(groups):
+    """ Formats <groups> as setting readable by parseGroups. """
+    return '; '.join(', '.join(group) for group in groups)
+
+
+
+class Gradients():
+    """
+    Temperature differences within groups of components of <data>, e.g.
+    two batteries or the boards of a stack. dT(t) of a group is the largest
+    difference between two of its components at time t: the hottest point
+    (Tmax) of one component minus the coldest point (Tmin) of another. For a
+    pair a, b this is max(Tmax_a - Tmin_b, Tmax_b - Tmin_a).
+
+    The ordered component pairs of all groups are evaluated in one array
+    operation and reduced per group, <chunk> time steps at a time. Groups
+    with less than two components in the case are listed in <missing>.
+    Holds the group <names>, <dT> of shape (groups, times) and per group the
+    largest difference <dTmax>, the time <tMax> it occurs and the <hot> and
+    <cold> component at that time. Groups without data have a NaN dTmax.
+    """
+    def __init__(self, data, groups, chunk=65536):
+        self.time = np.asarray(data.time, dtype=float)
+        self.caseComb = getattr(data, 'caseComb', None)
+        compIndex = dict((comp, i) for i, comp in enumerate(data.components))
+        self.groups = []
+        self.missing = []
+        for group in groups:
+            present = [comp for k, comp in enumerate(group) if comp in compIndex and comp not in group[:k]]
+            if len(present) >= 2:
+                self.groups.append(tuple(present))
+            else:
+                self.missing.append(tuple(group))
+        self.names = [GROUP_SEPARATOR.join(group) for group in self.groups]
+
+        # Ordered pairs of all groups, the pairs of a group are consecutive
+        hot, cold, offsets = [], [], []
+        for group in self.groups:
+            offsets.append(len(hot))
+            rows = [compIndex[comp] for comp in group]
+            for a in rows:
+                for b in rows:
+                    if a != b:
+                        hot.append(a)
+                        cold.append(b)
+        hot = np.array(hot, dtype=int)
+        cold = np.array(cold, dtype=int)
+
+        self.dT = np.full((len(self.groups), len(self.time)), np.nan)
+        if len(hot):
+            for start in range(0, len(self.time), chunk):
+                pairs = np.asarray(data.Tmax[hot, start:start + chunk], dtype=float) - np.asarray(data.Tmin[cold, start:start + chunk], dtype=float)
+                self.dT[:, start:start + chunk] = np.fmax.reduceat(pairs, offsets, axis=0)
+
+        # Largest difference of every group and the pair reaching it
+        self.dTmax = np.full(len(self.groups), np.nan)
+        self.tMax = np.full(len(self.groups), np.nan)
+        self.hot = [None] * len(self.groups)
+        self.cold = [None] * len(self.groups)
+        if not len(hot) or not len(self.time):
+            return
+        filled = np.where(np.isnan(self.dT), -np.inf, self.dT)
+        iMax = np.argmax(filled, axis=1)
+        ends = offsets[1:] + [len(hot)]
+        pairTime = np.repeat(iMax, np.subtract(ends, offsets))
+        atMax = np.asarray(data.Tmax[hot, pairTime], dtype=float) - np.asarray(data.Tmin[cold, pairTime], dtype=float)
+        atMax = np.where(np.isnan(atMax), -np.inf, atMax)
+        for g in range(len(self.groups)):
+            if np.isinf(filled[g, iMax[g]]):
+                continue
+            p = offsets[g] + np.argmax(atMax[offsets[g]:ends[g]])
+            self.dTmax[g] = filled[g, iMax[g]]
+            self.tMax[g] = self.time[iMax[g]]
+            self.hot[g] = data.components[hot[p]]
+            self.cold[g] = data.components[cold[p]]
+
+
+    def saveMaxima(self, saveFile):
+        """ Writes the largest difference of every group with its time and components to a file. Groups without data have empty columns. """
+        with open(saveFile, 'w') as f:
+            f.write('Group\tdTmax\tTime\tHot\tCold\n')
+            for g, name in enumerate(self.names):
+                if np.isnan(self.dTmax[g]):
+                    f.write('{:60s}\n'.format(name))
+                    continue
+                f.write('{:60s}{:15s}{:15s}{:60s}{}\n'.format(name, formatValue(self.dTmax[g]), '{:g}'.format(self.tMax[g]), self.hot[g], self.cold[g]))
+
+
+
+# Factors encoded by the three digits of a case combination
+FACTORS = ('Optical set', 'Power budget', 'Orientation')
+
+
+def groupMean(values, axes):
+    """ Mean of <values> over <axes>, ignoring NaN. Means over no values at all are NaN. """
+    present = ~np.isnan(values)
+    total = np.where(present, values, 0.0).sum(axis=axes)
+    count = present.sum(axis=axes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return total / count
+
+
+
+class Sensitivity():
+    """
+    Effects of the case factors on the extrema of every component. <combs>
+    are the case combinations, <Tmax> and <Tmin> the global extrema as
+    arrays of shape (cases, components), NaN where a case lacks a component.
+    The extrema are arranged in a cube with one axis per factor, of shape
+    (quantities, components, levels of each factor).
+
+    The main effect of a factor is the spread of the mean extrema over its
+    levels. The interaction of two factors is the largest deviation of
+    their cell means from the sum of both main effects. Missing cases are
+    left out of all means, so for an incomplete cube the effects are
+    estimates.
+    """
+    quantities = ('Tmax', 'Tmin')
+
+    def __init__(self, combs, components, Tmax, Tmin):
+        self.components = list(components)
+        combs = [str(comb) for comb in combs]
+        valid = [i for i, comb in enumerate(combs) if len(comb) == len(FACTORS) and comb.isdigit()]
+        self.combs = [combs[i] for i in valid]
+
+        # Levels present for every factor and the level index of every case
+        digits = np.array([[int(d) for d in comb] for comb in self.combs], dtype=int).reshape(-1, len(FACTORS))
+        self.levels = [np.unique(digits[:, k]) for k in range(len(FACTORS))]
+        ind = [np.searchsorted(self.levels[k], digits[:, k]) for k in range(len(FACTORS))]
+
+        shape = (len(self.quantities), len(self.components)) + tuple(len(levels) for levels in self.levels)
+        self.cube = np.full(shape, np.nan)
+        values = np.stack([np.asarray(Tmax, dtype=float)[valid].T, np.asarray(Tmin, dtype=float)[valid].T])
+        self.cube[:, :, ind[0], ind[1], ind[2]] = values
+
+        self.analyse()
+
+
+    def analyse(self):
+        """ Computes level means, main effects and pairwise interactions for all components at once. """
+        factorAxes = tuple(range(2, 2 + len(FACTORS)))
+        self.grand = groupMean(self.cube, factorAxes)
+
+        # Mean extrema per level, shape (quantities, components, levels)
+        self.levelMeans = []
+        self.effects = np.full(self.cube.shape[:2] + (len(FACTORS),), np.nan)
+        for k in range(len(FACTORS)):
+            means = groupMean(self.cube, tuple(a for a in factorAxes if a != 2 + k))
+            self.levelMeans.append(means)
+            if means.shape[-1]:
+                self.effects[..., k] = np.fmax.reduce(means, axis=-1) - np.fmin.reduce(means, axis=-1)
+
+        # Deviation of the cell means of two factors from the additive model
+        self.pairs = [(a, b) for a in range(len(FACTORS)) for b in range(a + 1, len(FACTORS))]
+        self.interactions = np.full(self.cube.shape[:2] + (len(self.pairs),), np.nan)
+        for p, (a, b) in enumerate(self.pairs):
+            other = tuple(2 + k for k in range(len(FACTORS)) if k not in (a, b))
+            cells = groupMean(self.cube, other)
+            residual = cells - self.levelMeans[a][..., :, None] - self.levelMeans[b][..., None, :] + self.grand[..., None, None]
+            residual = np.abs(residual).reshape(residual.shape[:2] + (-1,))
+            if residual.shape[-1]:
+                self.interactions[..., p] = np.fmax.reduce(residual, axis=-1)
+
+
+    def ranking(self, quantity, comp):
+        """ Returns the factor indices ordered from strongest to weakest main effect on <quantity> of <comp>. Factors without effect are left out. """
+        effects = self.effects[self.quantities.index(quantity), self.components.index(comp)]
+        order = np.argsort(-np.where(np.isnan(effects), -np.inf, effects), kind='stable')
+        return [k for k in order if not np.isnan(effects[k])]
+
+
+    def saveEffects(self, saveFile, descriptions=None):
+        """
+        Writes main effects, interactions, ranking and level means of all
+        components to a file. <descriptions> optionally maps every factor
+        index to a dictionary of level descriptions.
+        """
+        pairNames = ['{} x {}'.format(FACTORS[a], FACTORS[b]) for a, b in self.pairs]
+        with open(saveFile, 'w') as f:
+            f.write('##############################\n# ESATAN Evaluation - Sensitivity to case factors, {} cases\n##############################\n\n'.format(len(self.combs)))
+            f.write('# Main effect: largest difference between the mean extrema of the levels of a factor [K]\n')
+            f.write('# Interaction: largest deviation of the mean extrema of two factors from the sum of their main effects [K]\n\n')
+            f.write('{:60s}{:10s}'.format('Component', 'Quantity') + ''.join('{:30s}'.format(name) for name in FACTORS + tuple(pairNames)) + 'Ranking\n')
+            for c, comp in enumerate(self.components):
+                for q, quantity in enumerate(self.quantities):
+                    values = list(self.effects[q, c]) + list(self.interactions[q, c])
+                    ranking = ' > '.join(FACTORS[k] for k in self.ranking(quantity, comp))
+                    f.write('{:60s}{:10s}'.format(comp, quantity) + ''.join('{:30s}'.format(formatValue(v)) for v in values) + ranking + '\n')
+
+            for k, factor in enumerate(FACTORS):
+                f.write('\n# Mean extrema per level of factor {}\n'.format(factor))
+                for level in self.levels[k]:
+                    if descriptions is not None and level in descriptions[k]:
+                        f.write('# {}: {}\n'.format(level, descriptions[k][level]))
+                f.write('{:60s}{:10s}'.format('Component', 'Quantity') + ''.join('{:15s}'.format(str(level)) for level in self.levels[k]) + '\n')
+                for c, comp in enumerate(self.components):
+                    for q, quantity in enumerate(self.quantities):
+                        f.write('{:60s}{:10s}'.format(comp, quantity) + ''.join('{:15s}'.format(formatValue(v)) for v in self.levelMeans[k][q, c]) + '\n')
+
+
+def formatValue(value):
+    """ Formats a temperature for the tables, leaving missing values empty. """
+    return '' if np.isnan(value) else str(round(float(value), 2))
+
+
+
+class Regression():
+    """
+    Comparison of the global extrema of two campaigns, e.g. before and
+    after a change of the thermal model. Each campaign is given by its
+    case combinations, components and the extrema as arrays of shape (cases,
+    components), NaN where a case lacks a component. Both are joined on
+    case and component. The deltas are candidate minus baseline.
+
+    <changes> holds the (case, component) index pairs changed by more than
+    <tolerance> in Tmax or Tmin, largest change first. <added> and
+    <removed> list the pairs found in only one of the campaigns.
+    """
+    def __init__(self, baseline, candidate, tolerance=0.0):
+        self.tolerance = tolerance
+        combsA, compsA, TmaxA, TminA = baseline
+        combsB, compsB, TmaxB, TminB = candidate
+
+        # Union of cases and components, in order of the baseline
+        knownCombs, knownComps = set(combsA), set(compsA)
+        self.combs = list(combsA) + [comb for comb in combsB if comb not in knownCombs]
+        self.components = list(compsA) + [comp for comp in compsB if comp not in knownComps]
+        self.baseline = self.align(combsA, compsA, TmaxA, TminA)
+        self.candidate = self.align(combsB, compsB, TmaxB, TminB)
+
+        self.dTmax = self.candidate[0] - self.baseline[0]
+        self.dTmin = self.candidate[1] - self.baseline[1]
+        with np.errstate(invalid='ignore'):
+            self.magnitude = np.fmax(np.abs(self.dTmax), np.abs(self.dTmin))
+            changed = self.magnitude > tolerance
+
+        # Changed entries, largest first
+        rows, cols = np.nonzero(changed)
+        order = np.argsort(-self.magnitude[rows, cols], kind='stable')
+        self.changes = list(zip(rows[order], cols[order]))
+
+        inA = ~np.isnan(self.baseline[0]) | ~np.isnan(self.baseline[1])
+        inB = ~np.isnan(self.candidate[0]) | ~np.isnan(self.candidate[1])
+        self.added = list(zip(*np.nonzero(inB & ~inA)))
+        self.removed = list(zip(*np.nonzero(inA & ~inB)))
+
+
+    def align(self, combs, components, Tmax, Tmin):
+        """ Places the extrema of one campaign into arrays of shape (all cases, all components). """
+        caseIndex = dict((comb, i) for i, comb in enumerate(self.combs))
+        compIndex = dict((comp, i) for i, comp in enumerate(self.components))
+        rows = np.array([caseIndex[comb] for comb in combs], dtype=int)
+        cols = np.array([compIndex[comp] for comp in components], dtype=int)
+        aligned = []
+        for values in (Tmax, Tmin):
+            full = np.full((len(self.combs), len(self.components)), np.nan)
+            full[np.ix_(rows, cols)] = np.asarray(values, dtype=float).reshape(len(rows), len(cols))
+            aligned.append(full)
+        return aligned
+
+
+    def componentChanges(self):
+        """ Returns the largest change of every component over all cases, as list of (component, change) tuples, largest first. Components present in only one campaign are left out. """
+        largest = np.fmax.reduce(self.magnitude, axis=0) if len(self.combs) else np.full(len(self.components), np.nan)
+        order = np.argsort(-np.where(np.isnan(largest), -np.inf, largest), kind='stable')
+        return [(self.components[c], largest[c]) for c in order if not np.isnan(largest[c])]
+
+
+    def saveReport(self, saveFile, baselineName='baseline', candidateName='candidate'):
+        """ Writes the changed extrema, the largest change per component and the added and removed entries to a file. """
+        with open(saveFile, 'w') as f:
+            f.write('##############################\n# ESATAN Evaluation - Regression of {} against {}\n##############################\n\n'.format(candidateName, baselineName))
+            f.write('# {} of {} compared extrema changed by more than {} K\n\n'.format(len(self.changes), int((~np.isnan(self.magnitude)).sum()), self.tolerance))
+            f.write('{:15s}{:60s}'.format('Case', 'Component') + ''.join('{:15s}'.format(name) for name in ('Tmax before', 'Tmax after', 'dTmax', 'Tmin before', 'Tmin after', 'dTmin')) + '\n')
+            for row, col in self.changes:
+                values = (self.baseline[0][row, col], self.candidate[0][row, col], self.dTmax[row, col], self.baseline[1][row, col], self.candidate[1][row, col], self.dTmin[row, col])
+                f.write('{:15s}{:60s}'.format(self.combs[row], self.components[col]) + ''.join('{:15s}'.format(formatValue(v)) for v in values) + '\n')
+
+            f.write('\n# Largest change per component over all cases [K]\n')
+            for comp, change in self.componentChanges():
+                f.write('{:60s}{:15s}\n'.format(comp, formatValue(change)))
+
+            for title, pairs in (('only in ' + candidateName, self.added), ('only in ' + baselineName, self.removed)):
+                f.write('\n# Components {}\n'.format(title))
+                for row, col in pairs:
+                    f.write('{:15s}{:60s}\n'.format(self.combs[row], self.components[col]))
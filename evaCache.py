@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Workspace of loaded cases. Keeps parsed cases resident so switching between
+recently viewed cases does not read the output files again.
+"""
+
+import logging
+import multiprocessing
+import threading
+import traceback
+from collections import OrderedDict
+
+# Default memory budget of the workspace in MB
+CACHE_BUDGET = 1000
+
+
+class CaseCache():
+    """
+    Least-recently-used cache of loaded cases, bounded by a memory budget
+    and optionally by a maximum number of entries. The size of an entry is
+    determined by calling its nbytes() method. When entries are evicted,
+    <onEvict> is called with key and entry.
+
+    The entries of another CaseCache <shared> can count against the budget
+    as well. Entries are then evicted down to none to make room for the
+    entries of the other cache.
+    """
+    def __init__(self, budget=CACHE_BUDGET, onEvict=None, maxEntries=None, shared=None):
+        self.budget = budget
+        self.onEvict = onEvict
+        self.maxEntries = maxEntries
+        self.shared = shared
+        self.entries = OrderedDict()
+        self.sizes = {}
+        # Running total of the sizes, read by other threads sharing the budget
+        self.size = 0
+
+
+    def __contains__(self, key):
+        return key in self.entries
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    def keys(self):
+        """ Returns the keys from least to most recently used. """
+        return list(self.entries.keys())
+
+
+    def get(self, key):
+        """ Returns the entry for <key> and marks it as most recently used, or None if it is not cached. """
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+
+    def put(self, key, entry):
+        """ Adds <entry> as most recently used and evicts old entries until the budget is met again. """
+        if key in self.entries:
+            self.pop(key)
+        self.entries[key] = entry
+        self.sizes[key] = entry.nbytes()
+        self.size += self.sizes[key]
+        self.evict()
+
+
+    def pop(self, key):
+        """ Removes <key> from the cache and returns its entry. onEvict is not called. """
+        self.size -= self.sizes.pop(key, 0)
+        return self.entries.pop(key, None)
+
+
+    def clear(self):
+        """ Evicts all entries. """
+        for key in self.keys():
+            self.evictKey(key)
+
+
+    def totalSize(self):
+        """ Returns the memory used by all entries in bytes. """
+        return self.size
+
+
+    def overBudget(self):
+        """ Tells whether the entries, along with those of the shared cache, exceed the budget. """
+        shared = self.shared.totalSize() if self.shared is not None else 0
+        return self.totalSize() + shared > self.budget * 1024**2
+
+
+    def evict(self):
+        """ Evicts least recently used entries while over budget. Without a shared cache the most recent entry is always kept. """
+        keep = 1 if self.shared is None else 0
+        while len(self.entries) > keep and (self.overBudget() or (self.maxEntries is not None and len(self.entries) > self.maxEntries)):
+            self.evictKey(next(iter(self.entries)))
+
+
+    def evictKey(self, key):
+        """ Removes <key> from the cache and hands its entry to onEvict. """
+        entry = self.pop(key)
+        logging.info("Evicting case {} from workspace".format(key))
+        if self.onEvict is not None:
+            self.onEvict(key, entry)
+
+
+
+def loadInto(connection, load, key):
+    """ Calls <load> with <key> in a prefetching process and sends the result, or the error message, through <connection>. """
+    try:
+        result = (True, load(key))
+    except Exception:
+        result = (False, traceback.format_exc())
+    connection.send(result)
+    connection.close()
+
+
+
+class Prefetcher():
+    """
+    Background reading of cases the user is likely to open next. A worker
+    thread hands one case after another to a separate process, which calls
+    <load> with the key of the case, so parsing does not hold the
+    interpreter lock the GUI event loop needs. <load> has to be picklable,
+    e.g. a module level function or a functools.partial of one.
+
+    The results are kept in a CaseCache of at most <maxEntries> entries
+    until taken. They count against the budget of the <workspace> the cases
+    are opened in, prefetched results are dropped first.
+    """
+    def __init__(self, load, workspace, maxEntries=4):
+        self.load = load
+        self.workspace = workspace
+        self.results = CaseCache(workspace.budget, maxEntries=maxEntries, shared=workspace)
+        self.pending = []
+        self.current = None
+        self.process = None
+        self.generation = 0
+        self.condition = threading.Condition()
+        self.worker = threading.Thread(target=self.run, name='Prefetcher')
+        self.worker.daemon = True
+        self.worker.start()
+
+
+    def schedule(self, keys):
+        """
+        Replaces the pending keys with <keys>, most likely first. Keys already
+        read are skipped. Prefetched results are dropped if the workspace has
+        grown in the meantime.
+        """
+        with self.condition:
+            self.results.evict()
+            self.pending = [key for key in keys if key not in self.results and key != self.current]
+            self.condition.notify_all()
+
+
+    def take(self, key):
+        """
+        Removes and returns the prefetched result for <key>, handing it over
+        to the workspace. If the worker is reading <key> right now, waits for
+        it to finish. Returns None if the case has not been prefetched.
+        """
+        with self.condition:
+            if key in self.pending:
+                self.pending.remove(key)
+            while self.current == key:
+                self.condition.wait()
+            return self.results.pop(key)
+
+
+    def clear(self, load=None):
+        """
+        Drops pending keys and all prefetched results, e.g. after settings
+        have changed. <load> replaces the function reading the cases, if
+        given. A case being read right now is stopped.
+        """
+        with self.condition:
+            if load is not None:
+                self.load = load
+            self.pending = []
+            self.results = CaseCache(self.results.budget, maxEntries=self.results.maxEntries, shared=self.workspace)
+            self.generation += 1
+            if self.process is not None:
+                self.process.terminate()
+
+
+    def readCase(self, load, key):
+        """ Reads case <key> with <load> in a separate process and returns the result. Raises an IOError if reading failed. """
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=loadInto, args=(sender, load, key), name='Prefetcher')
+        # Daemonic processes are terminated when the GUI exits
+        process.daemon = True
+        process.start()
+        sender.close()
+        with self.condition:
+            self.process = process
+        try:
+            success, result = receiver.recv()
+        except EOFError:
+            raise IOError("Prefetching process ended without result")
+        finally:
+            receiver.close()
+            process.join()
+            with self.condition:
+                self.process = None
+        if not success:
+            raise IOError(result)
+        return result
+
+
+    def run(self):
+        """ Worker loop. Reads one pending case after another. """
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                self.current = self.pending.pop(0)
+                generation = self.generation
+                load = self.load
+            key = self.current
+            try:
+                logging.info("Prefetching case {}".format(key))
+                result = self.readCase(load, key)
+            except Exception:
+                # Cases stopped by clear() are not worth a message
+                if generation == self.generation:
+                    logging.exception("Prefetching case {} failed".format(key))
+                result = None
+            with self.condition:
+                if result is not None and generation == self.generation:
+                    self.results.put(key, result)
+                self.current = None
+                self.condition.notify_all()
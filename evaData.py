@@ -0,0 +1,864 @@
+# -*- coding: utf-8 -*-
+"""
+Reading of ESATAN output files into columnar arrays. Does not depend on the
+GUI, so it can be used by evatan.py as well as by the batch tools.
+"""
+
+import bz2
+import gzip
+import logging
+import lzma
+import os
+from array import array
+
+import numpy as np
+
+# Name of the ESATAN output file inside each Case_<case combination> folder
+OUTPUT_FILE = 'MOVE_II_.out'
+
+# Archived output files may be compressed. They are decompressed while reading.
+OPENERS = {'.gz': gzip.open, '.xz': lzma.open, '.bz2': bz2.open}
+
+# Accepted names of the output file, in order of preference
+OUTPUT_NAMES = (OUTPUT_FILE, OUTPUT_FILE + '.gz', OUTPUT_FILE + '.xz', OUTPUT_FILE + '.bz2')
+
+# Default memory budget for node resolution data in MB
+NODE_BUDGET = 500
+
+# Parsed rows are folded into arrays once this many have been buffered
+ROW_CHUNK = 1 << 20
+
+# Submodel shown by default, if present. Other submodels can be selected.
+MAIN_SUBMODEL = 'MOVE'
+
+# Time steps of the coarsest level of a min/max pyramid
+PYRAMID_MIN = 1024
+
+# ESATAN quantities read by default. Other entities of the output file, such
+# as the internal dissipation 'QI', can be requested in addition.
+QUANTITIES = ('T',)
+
+# Attributes of CaseData holding the results of the selected submodel and quantity
+RESULT_ATTRS = ('time', 'components', 'nodeIds', 'nodeComp', 'nodeTemps', '_Tmax', '_Tmin', '_extrema', '_pyramid')
+
+
+def openOutput(filePath):
+    """ Opens an output file for reading text. Compressed files are decompressed on the fly, without temporary files. """
+    opener = OPENERS.get(os.path.splitext(filePath)[1], open)
+    return opener(filePath, 'rt')
+
+
+def findOutput(folder):
+    """ Returns the path of the output file in case folder <folder>, preferring the uncompressed file. """
+    for name in OUTPUT_NAMES:
+        filePath = os.path.join(folder, name)
+        if os.path.isfile(filePath):
+            return filePath
+    return os.path.join(folder, OUTPUT_FILE)
+
+
+def timeOf(line):
+    """ Returns the time of a line holding a 'TIMEN' time stamp. """
+    return float(line.split()[2])
+
+
+def scanHeader(filePath, tailSize=65536):
+    """
+    Quick overview of an output file without parsing its results. Reads the
+    header and the first time step, and the last time stamp from the end of
+    the file. Returns a dictionary with the 'model' name, the 'submodels'
+    with their 'components' (dictionary of lists) and 'quantities', the
+    number of time steps ('timesteps'), the 'timeRange' as (first, last)
+    tuple and the file 'size' in bytes.
+
+    Small files are read completely and their time steps are counted. For
+    larger files the number of time steps is estimated from the size of the
+    first time step and 'estimated' is set. The estimate is only exact if
+    every time step prints the same blocks. Compressed files cannot be read
+    from the end cheaply, for them only the first time is known and
+    'timesteps' is None.
+    """
+    info = {'model': None, 'submodels': [], 'components': {}, 'quantities': [], 'timesteps': None, 'estimated': False, 'timeRange': (None, None), 'size': os.path.getsize(filePath)}
+    opener = OPENERS.get(os.path.splitext(filePath)[1], open)
+    stamps = []
+    offset = 0
+    with opener(filePath, 'rb') as f:
+        lines = iter(f.readline, b'')
+        for raw in lines:
+            line = raw.decode('latin-1')
+            start = offset
+            offset += len(raw)
+            if 'TIMEN' in line:
+                stamps.append((start, timeOf(line)))
+                # The second time stamp ends the first time step
+                if len(stamps) == 2:
+                    break
+                continue
+
+            words = line.split()
+            if info['model'] is None and 'submodel' in words and words.index('submodel') + 1 < len(words):
+                info['model'] = words[words.index('submodel') + 1]
+
+            # Result paragraphs start with +<submodel>, only their components are collected
+            if len(words) != 1 or len(words[0]) < 2 or words[0][0] != '+' or not stamps:
+                continue
+            submodel = words[0][1:]
+            header = [next(lines, b'') for _ in range(5)]
+            offset += sum(len(h) for h in header)
+            entity = header[2].decode('latin-1').split()
+            entity = entity[2] if len(entity) >= 3 else None
+            if submodel not in info['components']:
+                info['submodels'].append(submodel)
+                info['components'][submodel] = []
+            if entity is not None and entity not in info['quantities']:
+                info['quantities'].append(entity)
+            comps = info['components'][submodel]
+            known = set(comps)
+            for raw in lines:
+                offset += len(raw)
+                lWords = raw.split()
+                if not lWords:
+                    break
+                if len(lWords) > 1:
+                    comp = lWords[1].decode('latin-1')
+                    if comp not in known:
+                        known.add(comp)
+                        comps.append(comp)
+
+    if not stamps:
+        return info
+    first = stamps[0][1]
+    if len(stamps) == 1:
+        info['timesteps'] = 1
+        info['timeRange'] = (first, first)
+        return info
+    if opener is not open:
+        info['timeRange'] = (first, None)
+        return info
+
+    # The last time stamp is searched in the end of the file, which holds at least one time step
+    stepSize = stamps[1][0] - stamps[0][0]
+    tail = min(info['size'], max(tailSize, 2 * stepSize))
+    with open(filePath, 'rb') as f:
+        f.seek(info['size'] - tail)
+        block = f.read()
+    pos = block.rfind(b'TIMEN')
+    lineStart = block.rfind(b'\n', 0, pos) + 1
+    lineEnd = block.find(b'\n', pos)
+    try:
+        if pos < 0 or lineEnd < 0:
+            raise ValueError
+        last = timeOf(block[lineStart:lineEnd].decode('latin-1'))
+    except (ValueError, IndexError):
+        # Time stamp not found or still being written
+        info['timeRange'] = (first, None)
+        return info
+    if tail == info['size']:
+        info['timesteps'] = block.count(b'TIMEN')
+    else:
+        lastOffset = info['size'] - tail + lineStart
+        info['timesteps'] = int(round((lastOffset - stamps[0][0]) / float(stepSize))) + 1
+        info['estimated'] = True
+    info['timeRange'] = (first, last)
+    return info
+
+
+def formatTimesteps(info):
+    """ Returns the number of time steps of the overview <info> returned by scanHeader as text, estimates marked by '~' and '?' if unknown. """
+    if info['timesteps'] is None:
+        return '?'
+    return '{}{}'.format('~' if info.get('estimated') else '', info['timesteps'])
+
+
+def describeHeader(info):
+    """ Returns a one line summary of the output file overview <info> returned by scanHeader. """
+    if not info['components']:
+        return 'no results found ({:.1f} MB)'.format(info['size'] / 1e6)
+    first, last = info['timeRange']
+    steps = '{} time steps'.format(formatTimesteps(info)) if info['timesteps'] is not None else 'time steps unknown'
+    span = '{:.10g} to {:.10g} s'.format(first, last) if last is not None else 'from {:.10g} s'.format(first)
+    submodels = ', '.join('{} ({} components)'.format(sub, len(info['components'][sub])) for sub in info['submodels'])
+    return '{}: {}, {}, {}, {} ({:.1f} MB)'.format(info['model'], submodels, steps, span, '/'.join(info['quantities']), info['size'] / 1e6)
+
+
+def toNumpy(values):
+    """ Returns a numpy view of a typed array.array without copying it. """
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.dtype(values.typecode))
+    return np.frombuffer(values, dtype=np.dtype(values.typecode))
+
+
+def groupExtrema(keys, values, size):
+    """
+    Vectorized group-by reduction. Returns the maximum and minimum of
+    <values> for every key in range(<size>) as two float arrays. Keys without
+    any value are NaN.
+    """
+    keys = np.asarray(keys)
+    values = np.asarray(values, dtype=float)
+    gmax = np.full(size, np.nan)
+    gmin = np.full(size, np.nan)
+    if len(keys) == 0:
+        return gmax, gmin
+
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    values = values[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    gmax[keys[starts]] = np.maximum.reduceat(values, starts)
+    gmin[keys[starts]] = np.minimum.reduceat(values, starts)
+    return gmax, gmin
+
+
+
+def interpolate(time, values, newTime):
+    """
+    Linear interpolation of all rows of <values>, shape (rows, len(time)),
+    onto <newTime> in one vectorized operation. <time> must be sorted.
+    Values outside the range of <time> are NaN, NaN samples propagate to
+    the intervals next to them.
+    """
+    time = np.asarray(time, dtype=float)
+    newTime = np.asarray(newTime, dtype=float)
+    values = np.asarray(values)
+    result = np.full((values.shape[0], len(newTime)), np.nan)
+    if len(time) == 0:
+        return result
+    if len(time) == 1:
+        result[:, newTime == time[0]] = values[:, :1]
+        return result
+
+    inside = (newTime >= time[0]) & (newTime <= time[-1])
+    t = newTime[inside]
+    right = np.clip(np.searchsorted(time, t, side='right'), 1, len(time) - 1)
+    left = right - 1
+    weight = (t - time[left]) / (time[right] - time[left])
+    leftValues = values[:, left]
+    rightValues = values[:, right]
+    interpolated = leftValues * (1 - weight) + rightValues * weight
+    # Samples hit exactly must not be spoilt by a NaN neighbour
+    interpolated = np.where(weight == 0, leftValues, np.where(weight == 1, rightValues, interpolated))
+    result[:, inside] = interpolated
+    return result
+
+
+
+def uniformGrid(time, step):
+    """ Returns a uniform time grid with a spacing of <step> seconds, starting at the first time of the sorted array <time> and not exceeding its last. """
+    if len(time) == 0:
+        return np.zeros(0)
+    count = int(np.floor((time[-1] - time[0]) / step + 1e-9)) + 1
+    return time[0] + step * np.arange(count)
+
+
+
+def findExtrema(time, components, Tmax, Tmin):
+    """
+    Determines the global extrema of every component from Tmax and Tmin of
+    shape (components, times). Returns a dictionary mapping components to
+    dictionaries with (time, temperature) tuples under the keys 'glob_max'
+    and 'glob_min'. Components without any data are left out.
+    """
+    extrema = {}
+    hasData = ~np.isnan(Tmax).all(axis=1)
+    iMax = np.argmax(np.where(np.isnan(Tmax), -np.inf, Tmax), axis=1)
+    iMin = np.argmin(np.where(np.isnan(Tmin), np.inf, Tmin), axis=1)
+    for i, comp in enumerate(components):
+        if not hasData[i]:
+            continue
+        extrema[comp] = {}
+        extrema[comp]['glob_max'] = (time[iMax[i]], Tmax[i, iMax[i]])
+        extrema[comp]['glob_min'] = (time[iMin[i]], Tmin[i, iMin[i]])
+    return extrema
+
+
+
+def halve(values, ufunc):
+    """ Reduces pairs of neighbouring columns of <values> with <ufunc>. An odd last column is kept as it is. """
+    even = values.shape[1] - values.shape[1] % 2
+    halved = ufunc(values[:, 0:even:2], values[:, 1:even:2])
+    if even < values.shape[1]:
+        halved = np.concatenate([halved, values[:, even:]], axis=1)
+    return halved
+
+
+
+class Pyramid():
+    """
+    Min/max pyramid of Tmax and Tmin, for drawing series of any length at
+    screen resolution. Level k reduces blocks of 2**k time steps, Tmax to
+    its maximum and Tmin to its minimum, placed at the time of the first
+    step of the block, so peaks survive at every level. Level 0 holds the
+    original arrays without a copy. Levels are halved down to <minSize>
+    time steps.
+    """
+    def __init__(self, time, Tmax, Tmin, minSize=PYRAMID_MIN):
+        self.levels = [(time, Tmax, Tmin)]
+        while len(time) > minSize:
+            time = time[::2]
+            Tmax = halve(Tmax, np.fmax)
+            Tmin = halve(Tmin, np.fmin)
+            self.levels.append((time, Tmax, Tmin))
+
+
+    def nbytes(self):
+        """ Returns the memory held by the reduced levels in bytes. Level 0 belongs to the case data. """
+        return sum(a.nbytes for level in self.levels[1:] for a in level)
+
+
+    def view(self, start, stop, samples):
+        """
+        Returns time, Tmax and Tmin of the coarsest level with at least
+        <samples> time steps between <start> and <stop>, or of level 0 if
+        none has that many. The arrays are cut to the range, plus one time
+        step on either side so curves reach the edges.
+        """
+        for level, (time, Tmax, Tmin) in reversed(list(enumerate(self.levels))):
+            first = max(np.searchsorted(time, start, side='left') - 1, 0)
+            last = min(np.searchsorted(time, stop, side='right') + 1, len(time))
+            if last - first >= samples or level == 0:
+                return time[first:last], Tmax[:, first:last], Tmin[:, first:last]
+
+
+
+def mergeSteps(values, stepIndex, size, ufunc=None):
+    """
+    Maps the time steps of <values>, shape (..., steps), onto <size> sorted
+    unique times, step i going to time <stepIndex>[i]. Steps sharing a time
+    are reduced with <ufunc>. Without <ufunc> the later step wins wherever
+    it has data. Returns <values> itself if the steps are unique and sorted.
+    """
+    stepIndex = np.asarray(stepIndex)
+    if len(stepIndex) == size and (stepIndex == np.arange(size)).all():
+        return values
+    merged = np.full(values.shape[:-1] + (size,), np.nan, dtype=values.dtype)
+    if ufunc is None:
+        for step, t in enumerate(stepIndex):
+            np.copyto(merged[..., t], values[..., step], where=~np.isnan(values[..., step]))
+        return merged
+    order = np.argsort(stepIndex, kind='stable')
+    starts = np.flatnonzero(np.r_[True, stepIndex[order][1:] != stepIndex[order][:-1]])
+    merged[..., stepIndex[order][starts]] = ufunc.reduceat(values[..., order], starts, axis=-1)
+    return merged
+
+
+
+class ParsedRows():
+    """
+    Buffer of the result rows of an output file while it is parsed: time
+    step, quantity, component, node and value of every row. fold() turns the
+    buffered rows into a block of arrays covering the time steps parsed
+    since the last block, so the row buffers never hold more than about
+    <chunk> rows. Blocks hold the value of every node as float32 if <nodes>
+    is set, otherwise Tmax and Tmin of every component. Temperatures of
+    quantity <tempQuantity> are filtered with <filterMask>.
+    """
+    def __init__(self, nQuantity, nodes, filterMask, tempQuantity=None, chunk=ROW_CHUNK):
+        self.nQuantity = nQuantity
+        self.nodes = nodes
+        self.filterMask = filterMask
+        self.tempQuantity = tempQuantity
+        self.chunk = chunk
+        self.rowTime = array('i')
+        self.rowQuantity = array('i')
+        self.rowComp = array('i')
+        self.rowNode = array('i')
+        self.rowTemp = array('d')
+        self.rows = (self.rowTime, self.rowQuantity, self.rowComp, self.rowNode, self.rowTemp)
+        # Bytes buffered per row, node numbers are only buffered in node mode
+        self.rowSize = sum(a.itemsize for a in self.rows) - (0 if nodes else self.rowNode.itemsize)
+        # (first time step, arrays of shape (quantities, components or nodes, time steps))
+        self.blocks = []
+        self.blockBytes = 0
+        self.steps = 0
+
+
+    def nbytes(self):
+        """ Returns the memory held by the row buffers and the blocks in bytes. """
+        return len(self.rowTemp) * self.rowSize + self.blockBytes
+
+
+    def fold(self, steps, nComp, nNodes):
+        """ Folds the buffered rows of the time steps up to <steps> into a block and empties the buffers. """
+        arrays = self.reduceRows(steps - self.steps, nComp, nNodes)
+        self.blocks.append((self.steps,) + arrays)
+        self.blockBytes += sum(a.nbytes for a in arrays)
+        self.steps = steps
+        # The buffers are emptied in place, the parser holds on to them
+        for rows in self.rows:
+            del rows[:]
+
+
+    def reduceRows(self, count, nComp, nNodes):
+        """ Returns the arrays of a block of <count> time steps from the buffered rows. """
+        time = toNumpy(self.rowTime) - self.steps
+        quantity = toNumpy(self.rowQuantity)
+        temp = toNumpy(self.rowTemp)
+        keep = np.ones(len(temp), dtype=bool)
+        if self.tempQuantity is not None:
+            isTemp = quantity == self.tempQuantity
+            keep[isTemp] = self.filterMask(temp[isTemp])
+        if self.nodes:
+            nodeTemps = np.full((self.nQuantity, nNodes, count), np.nan, dtype=np.float32)
+            nodeTemps[quantity[keep], toNumpy(self.rowNode)[keep], time[keep]] = temp[keep]
+            return (nodeTemps,)
+        keys = (quantity * nComp + toNumpy(self.rowComp)) * count + time
+        Tmax, Tmin = groupExtrema(keys[keep], temp[keep], self.nQuantity * nComp * count)
+        return Tmax.reshape(self.nQuantity, nComp, count), Tmin.reshape(self.nQuantity, nComp, count)
+
+
+    def dropNodes(self, nodeComp, nComp):
+        """ Gives up node resolution. The node blocks are reduced to Tmax and Tmin of the components given by <nodeComp>. """
+        for i, (first, nodeTemps) in enumerate(self.blocks):
+            shape = (self.nQuantity, nComp, nodeTemps.shape[2])
+            Tmax = np.full(shape, np.nan)
+            Tmin = np.full(shape, np.nan)
+            order = np.argsort(nodeComp[:nodeTemps.shape[1]], kind='stable')
+            if len(order):
+                comps = nodeComp[order]
+                starts = np.flatnonzero(np.r_[True, comps[1:] != comps[:-1]])
+                Tmax[:, comps[starts]] = np.fmax.reduceat(nodeTemps[:, order], starts, axis=1)
+                Tmin[:, comps[starts]] = np.fmin.reduceat(nodeTemps[:, order], starts, axis=1)
+            self.blocks[i] = (first, Tmax, Tmin)
+        self.blockBytes = sum(a.nbytes for block in self.blocks for a in block[1:])
+        del self.rowNode[:]
+        self.rowSize -= self.rowNode.itemsize
+        self.nodes = False
+
+
+    def join(self, steps, nComp, nNodes):
+        """
+        Folds the remaining rows and returns the blocks joined over all
+        <steps> time steps: (nodeTemps,) in node mode, otherwise (Tmax, Tmin).
+        The blocks are released while they are copied.
+        """
+        self.fold(steps, nComp, nNodes)
+        size = nNodes if self.nodes else nComp
+        if len(self.blocks) == 1 and self.blocks[0][1].shape[1] == size:
+            return self.blocks.pop()[1:]
+        joined = tuple(np.full((self.nQuantity, size, steps), np.nan, dtype=a.dtype) for a in self.blocks[0][1:])
+        while self.blocks:
+            block = self.blocks.pop(0)
+            first = block[0]
+            for target, values in zip(joined, block[1:]):
+                target[:, :values.shape[1], first:first + values.shape[2]] = values
+        return joined
+
+
+
+class CaseData():
+    """
+    Results of one ESATAN output file. Holds one sorted time array and the
+    Tmax and Tmin of every component as arrays of shape (components, times).
+    Entries for which a component has no data are NaN. <nodeIds> holds the
+    ESATAN node numbers found in the result blocks and <nodeComp> the
+    component index of every node.
+
+    In node resolution mode the value of every node is kept as well, as
+    float32 array <nodeTemps> of shape (nodes, times). Tmax and Tmin are
+    then derived from the node data when first needed.
+
+    Besides temperatures, other ESATAN quantities like the internal
+    dissipation 'QI' can be read in the same pass. Tmax and Tmin then hold
+    the maximum and minimum of the selected <quantity> over the nodes of a
+    component.
+
+    The results of every submodel and quantity are kept separately.
+    <submodels> lists the submodels found, quantitiesOf() the quantities
+    found for a submodel and select() switches between them. <model> is the
+    model name given in the file header.
+
+    resample() moves all series onto a uniform time grid. <pyramid> holds
+    a min/max pyramid of Tmax and Tmin for drawing, built on first use.
+    """
+    def __init__(self, filePath, caseComb=None, thresholds=(None, None), ignoreValues=(), nodes=False, nodeBudget=NODE_BUDGET, quantities=QUANTITIES):
+        """
+        Reads the ESATAN <quantities> of <filePath>. Temperatures outside
+        <thresholds> or equal to one of <ignoreValues> are disregarded, the
+        other quantities are not filtered. If <nodes> is set, node data is
+        kept as long as it fits into <nodeBudget> MB, along with the rows
+        buffered while parsing.
+        """
+        self.filePath = filePath
+        self.caseComb = caseComb
+        self.thresholds = thresholds
+        self.ignoreValues = ignoreValues
+        self.nodes = nodes
+        self.nodeBudget = nodeBudget
+        self.quantities = list(quantities)
+        self.fetchTemp()
+
+
+    def fetchTemp(self):
+        """
+        Retrieves the data of all requested quantities and submodels from
+        the ESATAN output file in a single pass. The model name is taken
+        from the first line naming a 'submodel'.
+        """
+        self.model = None
+        submodels = []
+        subIndex = {}
+        quantityIndex = dict((quantity, q) for q, quantity in enumerate(self.quantities))
+        # (submodel, quantity) index pairs with data
+        found = set()
+        # Components and nodes of all submodels, keyed by (submodel, name)
+        compNames = []
+        compSub = array('i')
+        compIndex = {}
+        nodeNames = []
+        nodeIndex = {}
+        nodeComp = array('i')
+        times = []
+        rows = ParsedRows(len(self.quantities), self.nodes, self.filterMask, quantityIndex.get('T'), ROW_CHUNK)
+        rowTime, rowQuantity, rowComp, rowNode, rowTemp = rows.rowTime, rows.rowQuantity, rows.rowComp, rows.rowNode, rows.rowTemp
+        keepNodes = self.nodes
+
+        logging.info('Reading {} data from ESATAN logfile {}'.format(', '.join(self.quantities), self.filePath))
+        with openOutput(self.filePath) as logFile:
+            for line in logFile:
+                # Search for timestamp
+                if 'TIMEN' in line:
+                    # Fold the rows of the time steps so far into arrays before the buffers grow large
+                    if len(rowTemp) >= rows.chunk:
+                        rows.fold(len(times), len(compNames), len(nodeNames))
+                    times.append(timeOf(line))
+                    continue
+
+                if self.model is None and 'submodel' in line:
+                    words = line.split()
+                    if 'submodel' in words and words.index('submodel') + 1 < len(words):
+                        self.model = words[words.index('submodel') + 1]
+
+                # Search for result paragraph, which starts with +<submodel>
+                if '+' not in line:
+                    continue
+                words = line.split()
+                if len(words) != 1 or len(words[0]) < 2 or words[0][0] != '+':
+                    continue
+                submodel = words[0][1:]
+
+                # Skip the subheader. Its third line names the entity, only
+                # paragraphs of the requested quantities are read.
+                header = [next(logFile, '') for _ in range(5)]
+                words = header[2].split()
+                q = quantityIndex.get(words[2]) if len(words) >= 3 else None
+                if q is None or not times:
+                    if q is not None:
+                        logging.error("{} data found before first time stamp, skipping it".format(words[2]))
+                    # Skip the paragraph
+                    for l in logFile:
+                        if not l.strip():
+                            break
+                    continue
+
+                if submodel not in subIndex:
+                    subIndex[submodel] = len(submodels)
+                    submodels.append(submodel)
+                sub = subIndex[submodel]
+                found.add((sub, q))
+
+                for l in logFile:
+                    # Break at end of paragraph
+                    if not l.strip():
+                        break
+                    lWords = l.split()
+                    comp = lWords[1]
+                    try:
+                        temp = float(lWords[2])
+                    except Exception:
+                        logging.error("{} value seems to be faulty: {}".format(self.quantities[q], lWords[2]))
+                        break
+
+                    key = (sub, comp)
+                    if key not in compIndex:
+                        compIndex[key] = len(compNames)
+                        compNames.append(comp)
+                        compSub.append(sub)
+                    rowTime.append(len(times) - 1)
+                    rowQuantity.append(q)
+                    rowComp.append(compIndex[key])
+                    rowTemp.append(temp)
+
+                    # The node to component mapping is always kept, it is small
+                    key = (sub, lWords[0])
+                    if key not in nodeIndex:
+                        nodeIndex[key] = len(nodeNames)
+                        nodeNames.append(lWords[0])
+                        nodeComp.append(compIndex[(sub, comp)])
+                    if keepNodes:
+                        rowNode.append(nodeIndex[key])
+
+                # Give up node resolution as soon as the node array, along with
+                # the rows and blocks parsed so far, would exceed the budget
+                if keepNodes and rows.nbytes() + len(self.quantities) * len(nodeNames) * len(times) * 4 > self.nodeBudget * 1024**2:
+                    logging.warning("Node data exceeds memory budget of {} MB, keeping component data only".format(self.nodeBudget))
+                    keepNodes = False
+                    rows.dropNodes(np.array(nodeComp), len(compNames))
+
+        # Time stamps may repeat, the time steps are mapped onto the sorted unique times
+        time, timeIndex = np.unique(times, return_inverse=True)
+        timeIndex = timeIndex.ravel()
+        nQuantity, nComp, nTime = len(self.quantities), len(compNames), len(time)
+        self.nodes = keepNodes
+        blocks = rows.join(len(times), nComp, len(nodeNames))
+        compSub = toNumpy(compSub)
+        nodeComp = toNumpy(nodeComp)
+        if self.nodes:
+            nodeTemps = mergeSteps(blocks[0], timeIndex, nTime)
+            logging.info('Read {} nodes of {} components in {} submodels at {} times'.format(len(nodeNames), nComp, len(submodels), nTime))
+        else:
+            # Extrema per quantity, component and time, for all submodels at once
+            Tmax = mergeSteps(blocks[0], timeIndex, nTime, np.fmax)
+            Tmin = mergeSteps(blocks[1], timeIndex, nTime, np.fmin)
+            logging.info('Read {} components in {} submodels at {} times'.format(nComp, len(submodels), nTime))
+
+        # Split the results into submodels and quantities
+        self.submodels = submodels
+        self.results = {}
+        local = np.zeros(nComp, dtype=int)
+        for sub, submodel in enumerate(submodels):
+            comps = np.flatnonzero(compSub == sub)
+            local[comps] = np.arange(len(comps))
+            nodes = np.flatnonzero(compSub[nodeComp] == sub)
+            components = [compNames[c] for c in comps]
+            nodeIds = [nodeNames[n] for n in nodes]
+            for q, quantity in enumerate(self.quantities):
+                if (sub, q) not in found:
+                    continue
+                result = {'time': time, 'components': components, 'nodeIds': nodeIds, 'nodeComp': local[nodeComp[nodes]], '_extrema': None, '_pyramid': None}
+                if self.nodes:
+                    # Nodes of a submodel are usually numbered contiguously, then no copy is needed
+                    if len(nodes) and nodes[-1] - nodes[0] + 1 == len(nodes):
+                        result['nodeTemps'] = nodeTemps[q, nodes[0]:nodes[-1] + 1]
+                    else:
+                        result['nodeTemps'] = nodeTemps[q, nodes]
+                    result['_Tmax'] = None
+                    result['_Tmin'] = None
+                else:
+                    result['nodeTemps'] = None
+                    result['_Tmax'] = Tmax[q, comps]
+                    result['_Tmin'] = Tmin[q, comps]
+                self.results[(submodel, quantity)] = result
+
+        # Empty results if the file holds none of the quantities at all
+        if not submodels:
+            self.results[(None, None)] = {'time': time, 'components': [], 'nodeIds': [], 'nodeComp': np.zeros(0, dtype=int), 'nodeTemps': None, '_Tmax': np.zeros((0, nTime)), '_Tmin': np.zeros((0, nTime)), '_extrema': None, '_pyramid': None}
+        self.submodel = None
+        self.quantity = None
+        submodel = self.mainSubmodel()
+        quantities = self.quantitiesOf(submodel)
+        self.select(submodel, 'T' if 'T' in quantities else (quantities[0] if quantities else None))
+
+
+    def mainSubmodel(self):
+        """ Returns the submodel selected by default: the first one named like the main model, otherwise the first one found. """
+        for submodel in self.submodels:
+            if submodel.startswith(MAIN_SUBMODEL):
+                return submodel
+        return self.submodels[0] if self.submodels else None
+
+
+    def quantitiesOf(self, submodel):
+        """ Returns the quantities found for <submodel>, in the order they were requested. """
+        return [quantity for quantity in self.quantities if (submodel, quantity) in self.results]
+
+
+    def select(self, submodel=None, quantity=None):
+        """
+        Makes the results of <quantity> of <submodel> available in the
+        attributes time, components, Tmax, Tmin, extrema and the node
+        attributes. Without <submodel> the selected submodel is kept. Without
+        <quantity> the selected quantity is kept if the submodel has it,
+        otherwise its first quantity is selected. The previously selected
+        results are kept, including everything derived from them so far.
+        """
+        if submodel is None:
+            submodel = self.submodel
+        if quantity is None:
+            quantities = self.quantitiesOf(submodel)
+            quantity = self.quantity if self.quantity in quantities else (quantities[0] if quantities else None)
+        key = (submodel, quantity)
+        if key not in self.results:
+            raise KeyError("No {} data of submodel {} found in {}".format(quantity, submodel, self.filePath))
+        if (self.submodel, self.quantity) in self.results:
+            self.results[(self.submodel, self.quantity)] = dict((attr, getattr(self, attr)) for attr in RESULT_ATTRS)
+        for attr, value in self.results[key].items():
+            setattr(self, attr, value)
+        self.submodel, self.quantity = key
+
+
+    @property
+    def Tmax(self):
+        """ Maximum temperature of every component at every time, shape (components, times). """
+        if self._Tmax is None:
+            self.deriveComponents()
+        return self._Tmax
+
+
+    @property
+    def Tmin(self):
+        """ Minimum temperature of every component at every time, shape (components, times). """
+        if self._Tmin is None:
+            self.deriveComponents()
+        return self._Tmin
+
+
+    @property
+    def extrema(self):
+        """
+        Global extrema of every component as dictionary with (time,
+        temperature) tuples under the keys 'glob_max' and 'glob_min', as used
+        by evatan.py.
+        """
+        if self._extrema is None:
+            self.findExtrema()
+        return self._extrema
+
+
+    @property
+    def pyramid(self):
+        """ Min/max Pyramid of Tmax and Tmin of the selected results. """
+        if self._pyramid is None:
+            self._pyramid = Pyramid(self.time, self.Tmax, self.Tmin)
+        return self._pyramid
+
+
+    @property
+    def present(self):
+        """ Boolean mask of shape (components, times) telling at which times a component has data. """
+        return ~np.isnan(self.Tmax)
+
+
+    def series(self, comp):
+        """ Returns time, Tmax and Tmin of component <comp> at the times it has data. """
+        i = self.components.index(comp)
+        present = ~np.isnan(self.Tmax[i])
+        return self.time[present], self.Tmax[i, present], self.Tmin[i, present]
+
+
+    def nbytes(self):
+        """ Returns the memory held by the arrays of all submodels and quantities of this case in bytes. """
+        # Store what has been derived for the selected results
+        self.select(self.submodel, self.quantity)
+        arrays = [self.time]
+        pyramids = 0
+        for result in self.results.values():
+            arrays.extend([result['_Tmax'], result['_Tmin'], result['nodeTemps']])
+            if result['_pyramid'] is not None:
+                pyramids += result['_pyramid'].nbytes()
+        return sum(a.nbytes for a in arrays if a is not None) + pyramids
+
+
+    def resample(self, step, chunk=4096):
+        """
+        Resamples all series of all submodels and quantities onto a uniform time grid with
+        a spacing of <step> seconds by linear interpolation. The global
+        extrema are determined on the original time steps beforehand, so
+        peaks between grid points are not lost. Node data is interpolated
+        <chunk> nodes at a time and keeps its precision.
+        """
+        if step <= 0 or len(self.time) == 0:
+            return
+        selected = (self.submodel, self.quantity)
+        for key in list(self.results):
+            self.select(*key)
+            self.resampleSelected(step, chunk)
+        self.select(*selected)
+
+
+    def resampleSelected(self, step, chunk):
+        """ Resamples the series of the selected results, see resample(). """
+        if self._extrema is None:
+            self.findExtrema()
+        newTime = uniformGrid(self.time, step)
+        self._pyramid = None
+        logging.info('Resampling {} times onto {} times with a step of {} s'.format(len(self.time), len(newTime), step))
+        if self.nodes:
+            nodeTemps = np.empty((len(self.nodeIds), len(newTime)), dtype=self.nodeTemps.dtype)
+            for start in range(0, len(self.nodeIds), chunk):
+                nodeTemps[start:start + chunk] = interpolate(self.time, self.nodeTemps[start:start + chunk], newTime)
+            self.nodeTemps = nodeTemps
+            self._Tmax = None
+            self._Tmin = None
+        else:
+            self._Tmax = interpolate(self.time, self._Tmax, newTime)
+            self._Tmin = interpolate(self.time, self._Tmin, newTime)
+        self.time = newTime
+
+
+    def deriveComponents(self, chunk=4096):
+        """ Reduces the node data to Tmax and Tmin per component, a chunk of time steps at a time. """
+        order = np.argsort(self.nodeComp, kind='stable')
+        comps = self.nodeComp[order]
+        starts = np.flatnonzero(np.r_[True, comps[1:] != comps[:-1]])
+        nTime = len(self.time)
+        self._Tmax = np.full((len(self.components), nTime), np.nan, dtype=self.nodeTemps.dtype)
+        self._Tmin = np.full((len(self.components), nTime), np.nan, dtype=self.nodeTemps.dtype)
+        if len(order) == 0:
+            return
+        for start in range(0, nTime, chunk):
+            temps = self.nodeTemps[order, start:start + chunk]
+            self._Tmax[comps[starts], start:start + chunk] = np.fmax.reduceat(temps, starts, axis=0)
+            self._Tmin[comps[starts], start:start + chunk] = np.fmin.reduceat(temps, starts, axis=0)
+
+
+    def filterMask(self, temps):
+        """ Returns a boolean mask of the temperatures that pass the threshold and ignore filters. """
+        keep = np.ones(len(temps), dtype=bool)
+        lowerLim, upperLim = self.thresholds
+        if lowerLim is not None:
+            keep &= temps >= lowerLim
+        if upperLim is not None:
+            keep &= temps <= upperLim
+        if len(self.ignoreValues):
+            keep &= ~np.isin(temps, np.asarray(self.ignoreValues, dtype=float))
+        return keep
+
+
+    def findExtrema(self):
+        """ Determines the global extrema of every component. """
+        self._extrema = findExtrema(self.time, self.components, self.Tmax, self.Tmin)
+
+
+    def componentNodes(self, comp):
+        """
+        Returns the node IDs of component <comp> and their temperatures as
+        array of shape (nodes, times). Raises a ValueError if the case was not
+        read in node resolution mode or the node data exceeded the budget.
+        """
+        if self.nodeTemps is None:
+            raise ValueError("No node data of {} kept, read the case with nodes=True".format(self.filePath))
+        ind = np.flatnonzero(self.nodeComp == self.components.index(comp))
+        return [self.nodeIds[i] for i in ind], self.nodeTemps[ind]
+
+
+    def nodeExtrema(self, comp):
+        """
+        Finds the hottest and coldest node of component <comp>. Returns a
+        dictionary with (node, time, temperature) tuples under the keys
+        'glob_max' and 'glob_min'.
+        """
+        nodes, temps = self.componentNodes(comp)
+        extrema = {}
+        if np.isnan(temps).all():
+            return extrema
+        iMax = np.unravel_index(np.nanargmax(temps), temps.shape)
+        iMin = np.unravel_index(np.nanargmin(temps), temps.shape)
+        extrema['glob_max'] = (nodes[iMax[0]], self.time[iMax[1]], temps[iMax])
+        extrema['glob_min'] = (nodes[iMin[0]], self.time[iMin[1]], temps[iMin])
+        return extrema
+
+
+
+def readCase(filePath, thresholds=(None, None), ignoreValues=(), quantities=QUANTITIES, resampleStep=0):
+    """
+    Reads an output file the way the GUI shows it: filtered, resampled onto
+    a grid of <resampleStep> seconds if it is positive, and with the min/max
+    pyramid for drawing built. A plain function, so the prefetcher can call
+    it in a separate process.
+    """
+    data = CaseData(filePath, thresholds=thresholds, ignoreValues=ignoreValues, quantities=quantities)
+    if resampleStep > 0:
+        data.resample(resampleStep)
+    data.pyramid
+    return data
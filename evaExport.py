@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Export of complete temperature time series. Series are written in chunks of
+time steps, so memory use does not grow with the length of the simulation.
+
+Two formats are supported, chosen by file extension:
+- '.npz': compressed NumPy archive with one column per member ('time',
+  'Tmax/<component>', 'Tmin/<component>', ...). Readable with numpy.load.
+- '.csv': one row per time step, one column per component and quantity.
+"""
+
+import logging
+import os
+import zipfile
+
+import numpy as np
+
+# Number of time steps written at once
+CHUNK = 4096
+
+
+def exportSeries(fileName, time, names, quantities, chunk=CHUNK):
+    """
+    Writes time series to <fileName>. <quantities> is a list of
+    (quantity name, array) tuples where each array has the shape
+    (len(names), len(time)), e.g. [('Tmax', Tmax), ('Tmin', Tmin)].
+    """
+    logging.info("Exporting time series to file {}".format(fileName))
+    if fileName.endswith('.npz'):
+        exportBinary(fileName, time, names, quantities, chunk)
+    elif fileName.endswith('.csv'):
+        exportCSV(fileName, time, names, quantities, chunk)
+    else:
+        raise ValueError("Unknown export format for file {}. Use .npz or .csv".format(fileName))
+
+
+def exportCSV(fileName, time, names, quantities, chunk=CHUNK):
+    """ Writes time series as CSV file, one row per time step. """
+    nq = len(quantities)
+    header = ['time'] + ['{} {}'.format(name, q) for name in names for q, values in quantities]
+    with open(fileName, 'w') as f:
+        f.write(','.join(header) + '\n')
+        for start in range(0, len(time), chunk):
+            stop = min(start + chunk, len(time))
+            block = np.empty((stop - start, 1 + nq*len(names)))
+            block[:,0] = time[start:stop]
+            for j, (q, values) in enumerate(quantities):
+                block[:,1+j::nq] = values[:,start:stop].T
+            np.savetxt(f, block, fmt='%.6g', delimiter=',')
+
+
+def exportBinary(fileName, time, names, quantities, chunk=CHUNK):
+    """ Writes time series as compressed NumPy archive with one member per column. """
+    with zipfile.ZipFile(fileName, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        writeColumn(zf, 'components', np.array(names, dtype=str), chunk)
+        writeColumn(zf, 'time', np.asarray(time), chunk)
+        for q, values in quantities:
+            for i, name in enumerate(names):
+                writeColumn(zf, '{}/{}'.format(q, name), values[i], chunk)
+
+
+def writeColumn(zf, name, values, chunk=CHUNK):
+    """ Streams the one-dimensional array <values> chunk by chunk into the archive member <name>.npy. """
+    header = {'descr': np.lib.format.dtype_to_descr(values.dtype), 'fortran_order': False, 'shape': (len(values),)}
+    with zf.open(name + '.npy', 'w', force_zip64=True) as fp:
+        np.lib.format.write_array_header_1_0(fp, header)
+        for start in range(0, len(values), chunk):
+            fp.write(np.ascontiguousarray(values[start:start + chunk]).tobytes())
+
+
+def exportCase(data, folder, formats=('npz', 'csv')):
+    """
+    Exports the component series of an evaData.CaseData object into
+    <folder>, with the maximum and minimum of every quantity read for the
+    selected submodel ('Tmax', 'Tmin', 'QImax', ...). If the case was read
+    with node resolution, the node values are exported as well, one column
+    per '<component>/<node>'.
+    """
+    os.makedirs(folder, exist_ok=True)
+    selected = data.quantity
+    quantities = []
+    nodeQuantities = []
+    for quantity in data.quantitiesOf(data.submodel):
+        data.select(quantity=quantity)
+        quantities.extend([(quantity + 'max', data.Tmax), (quantity + 'min', data.Tmin)])
+        if data.nodeTemps is not None:
+            nodeQuantities.append((quantity, data.nodeTemps))
+    data.select(quantity=selected)
+
+    for fmt in formats:
+        fileName = os.path.join(folder, 'series_{}.{}'.format(data.caseComb, fmt))
+        exportSeries(fileName, data.time, data.components, quantities)
+
+    if nodeQuantities:
+        names = ['{}/{}'.format(data.components[c], node) for c, node in zip(data.nodeComp, data.nodeIds)]
+        for fmt in formats:
+            fileName = os.path.join(folder, 'nodes_{}.{}'.format(data.caseComb, fmt))
+            exportSeries(fileName, data.time, names, nodeQuantities)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Discovery of available cases. Scans a folder tree once for Case_<case
+combination> folders containing an ESATAN output file, instead of probing the
+path of every possible combination.
+"""
+
+import logging
+import os
+import time
+
+import evaData
+
+# Case folders are named <CASE_PREFIX><case combination>
+CASE_PREFIX = 'Case_'
+
+# Seconds between checks of the case folders and output files of known cases
+CHECK_INTERVAL = 30
+
+
+class CaseIndex():
+    """
+    Index of the cases available below <root>, searched up to <depth> folder
+    levels deep. <cases> maps case combinations to dictionaries holding the
+    case folder ('path'), the output file ('filePath') and its 'size' and
+    'mtime'. refresh() updates the index incrementally, checking the
+    cases found already at most every <checkInterval> seconds.
+    """
+    def __init__(self, root, depth=3, checkInterval=CHECK_INTERVAL):
+        self.root = root
+        self.depth = depth
+        self.checkInterval = checkInterval
+        self.cases = {}
+        # Scanned folders with their modification time and remaining depth.
+        # Case folders have a depth of None.
+        self.dirs = {}
+        self.lastCheck = 0
+        self.scan()
+
+
+    def __contains__(self, comb):
+        return str(comb) in self.cases
+
+
+    def combs(self):
+        """ Returns the available case combinations, sorted. """
+        return sorted(self.cases.keys())
+
+
+    def filePath(self, comb):
+        """ Returns the path of the output file of case <comb>, or None if the case is not available. """
+        entry = self.cases.get(str(comb))
+        return entry['filePath'] if entry is not None else None
+
+
+    def header(self, comb):
+        """
+        Returns the overview of the output file of case <comb> from
+        evaData.scanHeader, or None if the case is not available. The
+        overview is kept until the output file changes.
+        """
+        entry = self.cases.get(str(comb))
+        if entry is None:
+            return None
+        cached = entry.get('header')
+        if cached is None or cached[0] != (entry['size'], entry['mtime']):
+            try:
+                info = evaData.scanHeader(entry['filePath'])
+            except (OSError, EOFError, ValueError, IndexError):
+                logging.exception("Could not scan output file {}".format(entry['filePath']))
+                return None
+            cached = ((entry['size'], entry['mtime']), info)
+            entry['header'] = cached
+        return cached[1]
+
+
+    def scan(self):
+        """ Builds the index from scratch. Returns the combinations found. """
+        logging.info("Scanning {} for cases".format(self.root))
+        self.cases = {}
+        self.dirs = {}
+        self.lastCheck = time.time()
+        changed = []
+        if os.path.isdir(self.root):
+            self.scanDir(self.root, self.depth, changed)
+        else:
+            logging.error("Case folder {} does not exist".format(self.root))
+        logging.info("Found {} cases".format(len(self.cases)))
+        return changed
+
+
+    def refresh(self, force=False):
+        """
+        Updates the index. Only folders whose modification time changed are
+        listed again. New case folders are found right away, while the
+        folders and output files of cases found already are only checked
+        for changes every <checkInterval> seconds, or if <force> is set.
+        Returns the combinations that are new or whose output file changed.
+        """
+        changed = []
+        now = time.time()
+        checkCases = force or now - self.lastCheck >= self.checkInterval
+        if checkCases:
+            self.lastCheck = now
+        known = set(entry['path'] for entry in self.cases.values())
+        for folder, (mtime, depth) in list(self.dirs.items()):
+            if folder not in self.dirs:
+                # Removed while handling another folder
+                continue
+            if depth is None and not checkCases and folder in known:
+                continue
+            try:
+                newMtime = os.stat(folder).st_mtime
+            except OSError:
+                self.removeDir(folder)
+                continue
+            if newMtime == mtime:
+                continue
+            if depth is None:
+                self.scanCase(folder, changed)
+            else:
+                self.scanDir(folder, depth, changed)
+
+        # Output files can change without changing their folder
+        if not checkCases:
+            return changed
+        for comb, entry in list(self.cases.items()):
+            try:
+                stat = os.stat(entry['filePath'])
+            except OSError:
+                del self.cases[comb]
+                continue
+            if (stat.st_size, stat.st_mtime) != (entry['size'], entry['mtime']):
+                entry['size'], entry['mtime'] = stat.st_size, stat.st_mtime
+                if comb not in changed:
+                    changed.append(comb)
+        return changed
+
+
+    def scanDir(self, folder, depth, changed):
+        """ Lists <folder> and scans new case folders and, while depth is left, new subfolders. """
+        try:
+            self.dirs[folder] = (os.stat(folder).st_mtime, depth)
+            entries = list(os.scandir(folder))
+        except OSError:
+            logging.error("Could not list folder {}".format(folder))
+            return
+        for entry in entries:
+            if entry.path in self.dirs or not entry.is_dir():
+                continue
+            if entry.name.startswith(CASE_PREFIX):
+                self.scanCase(entry.path, changed)
+            elif depth > 0:
+                self.scanDir(entry.path, depth - 1, changed)
+
+
+    def scanCase(self, folder, changed):
+        """ Looks for the output file in case folder <folder> and updates the index entry. """
+        comb = os.path.basename(folder)[len(CASE_PREFIX):]
+        try:
+            self.dirs[folder] = (os.stat(folder).st_mtime, None)
+            entries = list(os.scandir(folder))
+        except OSError:
+            return
+
+        # The output file may also be compressed, the uncompressed file is preferred
+        found = dict((entry.name, entry) for entry in entries if entry.name in evaData.OUTPUT_NAMES and entry.is_file())
+        for name in evaData.OUTPUT_NAMES:
+            if name not in found:
+                continue
+            entry = found[name]
+            stat = entry.stat()
+            old = self.cases.get(comb)
+            if old is not None and old['path'] != folder:
+                logging.warning("Case {} found in {} and {}, using the first".format(comb, old['path'], folder))
+                return
+            if old is None or (old['filePath'], old['size'], old['mtime']) != (entry.path, stat.st_size, stat.st_mtime):
+                self.cases[comb] = {'path': folder, 'filePath': entry.path, 'size': stat.st_size, 'mtime': stat.st_mtime}
+                if comb not in changed:
+                    changed.append(comb)
+            return
+
+        # No output file (anymore)
+        if comb in self.cases and self.cases[comb]['path'] == folder:
+            del self.cases[comb]
+
+
+    def removeDir(self, folder):
+        """ Forgets a folder that does not exist anymore, along with everything below it. """
+        for known in list(self.dirs.keys()):
+            if known == folder or known.startswith(os.path.join(folder, '')):
+                del self.dirs[known]
+        for comb, entry in list(self.cases.items()):
+            if entry['path'] == folder or entry['path'].startswith(os.path.join(folder, '')):
+                del self.cases[comb]
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Mapping between ESATAN node numbers and components. The output files name
+the component of every node, while the CSV exports of ESATAN (see 'csv
+Dateien') only have node columns such as 'T604'. The mapping is taken from
+parsed output files and stored as a small text file, so node data from CSV
+files can be reduced to components without parsing an output file again.
+"""
+
+import logging
+import re
+
+import numpy as np
+
+import evaData
+
+# CSV columns are named <entity><node number>, e.g. T604
+CSV_COLUMN = re.compile(r'^([A-Za-z]+)(\d+)$')
+
+
+class NodeMap():
+    """ Maps node numbers (as strings) to component names. """
+    def __init__(self, nodes=(), components=()):
+        self.component = dict(zip(nodes, components))
+
+
+    def __len__(self):
+        return len(self.component)
+
+
+    def update(self, other):
+        """ Adds the nodes of NodeMap <other>. Nodes assigned to different components keep their current component. """
+        for node, comp in other.component.items():
+            if self.component.setdefault(node, comp) != comp:
+                logging.warning("Node {} belongs to {} and {}, keeping {}".format(node, self.component[node], comp, self.component[node]))
+
+
+    def save(self, fileName):
+        """ Writes the mapping to a text file with one 'node,component' line per node. """
+        with open(fileName, 'w') as f:
+            f.write('Node,Component\n')
+            for node in sorted(self.component, key=nodeKey):
+                f.write('{},{}\n'.format(node, self.component[node]))
+
+
+    def reduce(self, nodes, temps):
+        """
+        Reduces node temperatures to components. <nodes> are node numbers and
+        <temps> the temperatures of shape (nodes, times). Returns the
+        components, in order of their first node, and their Tmax and Tmin of
+        shape (components, times). Nodes missing in the mapping are ignored.
+        """
+        components = []
+        compIndex = {}
+        rows = []
+        rowComp = []
+        unknown = []
+        for i, node in enumerate(nodes):
+            comp = self.component.get(node)
+            if comp is None:
+                unknown.append(node)
+                continue
+            if comp not in compIndex:
+                compIndex[comp] = len(components)
+                components.append(comp)
+            rows.append(i)
+            rowComp.append(compIndex[comp])
+        if unknown:
+            logging.warning("{} nodes without component are ignored: {}".format(len(unknown), ', '.join(unknown)))
+
+        temps = np.asarray(temps, dtype=float)
+        Tmax = np.full((len(components), temps.shape[1]), np.nan)
+        Tmin = np.full((len(components), temps.shape[1]), np.nan)
+        if not rows:
+            return components, Tmax, Tmin
+
+        # Group the node rows by component and reduce every group at once
+        rowComp = np.array(rowComp)
+        order = np.argsort(rowComp, kind='stable')
+        comps = rowComp[order]
+        starts = np.flatnonzero(np.r_[True, comps[1:] != comps[:-1]])
+        grouped = temps[np.array(rows)[order]]
+        Tmax[comps[starts]] = np.fmax.reduceat(grouped, starts, axis=0)
+        Tmin[comps[starts]] = np.fmin.reduceat(grouped, starts, axis=0)
+        return components, Tmax, Tmin
+
+
+
+def nodeKey(node):
+    """ Sorts node numbers numerically. """
+    return (len(node), node)
+
+
+def fromCase(data):
+    """ Returns the NodeMap of an evaData.CaseData object. """
+    return NodeMap(data.nodeIds, [data.components[c] for c in data.nodeComp])
+
+
+def load(fileName):
+    """ Reads a NodeMap written by NodeMap.save. """
+    nodeMap = NodeMap()
+    with open(fileName) as f:
+        next(f, None)
+        for line in f:
+            words = line.strip().split(',')
+            if len(words) == 2:
+                nodeMap.component[words[0]] = words[1]
+    return nodeMap
+
+
+def readCSV(fileName, entity='T'):
+    """
+    Reads an ESATAN CSV export. Returns the sorted time array, the node
+    numbers of the columns of quantity <entity> and their values as array
+    of shape (nodes, times). Columns of other quantities are skipped.
+    """
+    # Every block starts with a header line naming the columns
+    rawBlocks = []
+    with evaData.openOutput(fileName) as f:
+        for line in f:
+            if line.startswith('TIME,'):
+                names = [name.strip() for name in line.split(',')[1:] if name.strip()]
+                rawBlocks.append((names, []))
+            elif rawBlocks and line.strip():
+                rawBlocks[-1][1].append(line)
+
+    times = []
+    values = []
+    nodes = None
+    for names, lines in rawBlocks:
+        matches = [CSV_COLUMN.match(name) for name in names]
+        used = [i for i, m in enumerate(matches) if m and m.group(1) == entity]
+        if not used or not lines:
+            continue
+        blockNodes = [matches[i].group(2) for i in used]
+        if nodes is None:
+            nodes = blockNodes
+        elif blockNodes != nodes:
+            logging.error("Block of CSV file {} has different nodes, skipping it".format(fileName))
+            continue
+        block = np.loadtxt(lines, delimiter=',', usecols=[0] + [1 + i for i in used], ndmin=2)
+        times.append(block[:, 0])
+        values.append(block[:, 1:])
+
+    if nodes is None:
+        logging.error("No {} data found in CSV file {}".format(entity, fileName))
+        return np.zeros(0), [], np.zeros((0, 0))
+
+    time = np.concatenate(times)
+    values = np.concatenate(values, axis=0)
+    order = np.argsort(time, kind='stable')
+    return time[order], nodes, values[order].T
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Plotting of case data onto matplotlib axes. Used by the GUI as well as by the
+headless report rendering, so it must not depend on a specific backend.
+"""
+
+from matplotlib import cm
+import matplotlib.patches as mpatches
+import numpy as np
+
+TEMP_TITLE = "Temporal Evolution of Hottest and Coldest Points"
+EXTREMA_TITLE = "Absolute Extrema in Time and Space"
+
+# Name, plural and unit of the ESATAN quantities
+QUANTITIES = {
+        'T': ('temperature', 'temperatures', '°C'),
+        'QI': ('internal dissipation', 'internal dissipations', 'W'),
+        'QS': ('solar heat flux', 'solar heat fluxes', 'W'),
+        'QA': ('albedo heat flux', 'albedo heat fluxes', 'W'),
+        'QE': ('earth heat flux', 'earth heat fluxes', 'W'),
+        'QR': ('radiative heat flow', 'radiative heat flows', 'W'),
+        }
+
+
+def quantityName(quantity, plural=False):
+    """ Returns the name of ESATAN quantity <quantity>. Unknown quantities are named by their ESATAN entity. """
+    if quantity not in QUANTITIES:
+        return str(quantity)
+    return QUANTITIES[quantity][1 if plural else 0]
+
+
+def quantityUnit(quantity):
+    """ Returns the unit of ESATAN quantity <quantity>, an empty string if it is unknown. """
+    return QUANTITIES[quantity][2] if quantity in QUANTITIES else ''
+
+
+def quantityLabel(quantity):
+    """ Returns the axis label of ESATAN quantity <quantity>. """
+    name = quantityName(quantity)
+    name = name[:1].upper() + name[1:]
+    unit = quantityUnit(quantity)
+    return "{} [{}]".format(name, unit) if unit else name
+
+
+def differenceName(quantity, plural=False):
+    """ Returns the capitalized name of differences of ESATAN quantity <quantity>, e.g. 'Temperature differences'. """
+    name = quantityName(quantity)
+    return "{}{} difference{}".format(name[:1].upper(), name[1:], 's' if plural else '')
+
+
+def differenceLabel(quantity):
+    """ Returns the axis label of differences of ESATAN quantity <quantity>. Temperature differences are given in K. """
+    unit = quantityUnit(quantity)
+    unit = 'K' if unit == '°C' else unit
+    name = differenceName(quantity)
+    return "{} [{}]".format(name, unit) if unit else name
+
+
+def componentColors(components):
+    """ Creates a color map with one color for each component. """
+    components = list(components)
+    colors = {}
+    for color, comp in zip(cm.gist_rainbow(np.linspace(0,1,len(components))), components):
+        colors[comp] = color
+    return colors
+
+
+def heatmapRows(components, Tmax, Tmin, key='Tmax'):
+    """
+    Orders the rows of a heatmap by the global maximum of the components,
+    hottest first. Components without any data go to the bottom. Returns the
+    ordered component names and the rows of Tmax, or of Tmin if <key> is
+    'Tmin'.
+    """
+    if Tmax.shape[1]:
+        peak = np.fmax.reduce(Tmax, axis=1)
+    else:
+        peak = np.full(len(components), np.nan)
+    peak[np.isnan(peak)] = -np.inf
+    order = np.argsort(-peak, kind='stable')
+    return [components[i] for i in order], (Tmin if key == 'Tmin' else Tmax)[order]
+
+
+def heatmapCell(shape, x, y):
+    """ Returns the (row, column) indices of the cell of a heatmap of <shape> at data coordinates <x>, <y>, or None outside the image. """
+    if x is None or y is None:
+        return None
+    row = int(round(y))
+    col = int(round(x))
+    if 0 <= row < shape[0] and 0 <= col < shape[1]:
+        return row, col
+    return None
+
+
+def indexLabel(labels, x, fmt='{}'):
+    """ Tick label of heatmap axis position <x>: the label of the nearest row or column formatted with <fmt>, empty outside. """
+    i = int(round(x))
+    if 0 <= i < len(labels):
+        return fmt.format(labels[i])
+    return ''
+
+
+def nearestPosition(sortedValues, x):
+    """ Position of the value nearest to <x> in the ascending <sortedValues>, found by binary search. """
+    i = int(np.searchsorted(sortedValues, x))
+    if i == len(sortedValues) or (i > 0 and x - sortedValues[i-1] < sortedValues[i] - x):
+        i -= 1
+    return i
+
+
+def hoverIndex(values):
+    """ 
+    Sorts the <values> of all curves (one row per curve) at every time step, 
+    so the curve nearest to the mouse is found by binary search. Returns the 
+    sorted values, the curve of every value and the number of valid values 
+    per time step.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    # NaN is sorted to the end of every column
+    order = np.argsort(values, axis=0, kind='stable')
+    return np.take_along_axis(values, order, axis=0), order.astype(np.int32), (~np.isnan(values)).sum(axis=0)
+
+
+def nearestSample(time, index, x, y):
+    """ Returns the (curve, time step) of the sample of a <hoverIndex> nearest to (x, y), or None. """
+    if len(time) == 0 or np.isnan(x) or np.isnan(y):
+        return None
+    values, order, count = index
+    # Nearest time step first, then the nearest curve at that time step
+    j = nearestPosition(time, x)
+    if count[j] == 0:
+        return None
+    k = nearestPosition(values[:count[j], j], y)
+    return int(order[k, j]), j
+
+
+def setupAxes(tempAxes, extrAxes, quantity='T'):
+    """ Sets titles and labels of the temporal and the extrema axes for ESATAN quantity <quantity>. """
+    tempAxes.set_title(TEMP_TITLE)
+    tempAxes.set_xlabel("Time [s]")
+    tempAxes.set_ylabel(quantityLabel(quantity))
+    
+    extrAxes.set_title(EXTREMA_TITLE)
+
+
+def plotTemp(axes, x, yMax, yMin, Tmax_glob, Tmin_glob, color):
+    """ 
+    Plots the temperature data of one component against the time. 
+    <Tmax_glob> and <Tmin_glob> are (time, temperature) tuples of the global
+    extrema. Returns the artists in a dictionary.
+    """
+    plots = {}
+    plots['max'], = axes.plot(x,yMax, lw=2, color=color)
+    plots['min'], = axes.plot(x,yMin, color=color, lw=2)
+    plots['max_glob'] = axes.scatter(Tmax_glob[0],Tmax_glob[1], marker="^", s=100, color=color)
+    plots['min_glob'] = axes.scatter(Tmin_glob[0],Tmin_glob[1], marker="v", s=100, color=color)
+    plots['fill'] = axes.fill_between(x,yMax,yMin,alpha=.5,facecolor=color)
+    return plots
+
+
+def plotRolling(axes, x, yMax, yMin, color):
+    """ Plots rolling window series of one component as dashed lines next to its raw curves. Returns the artists in a dictionary. """
+    plots = {}
+    plots['roll_max'], = axes.plot(x, yMax, lw=1, ls='--', color=color)
+    plots['roll_min'], = axes.plot(x, yMin, lw=1, ls='--', color=color)
+    return plots
+
+
+def plotExtrema(axes, comps, extrema, width=0.35, quantity='T'):
+    """ 
+    Plots the global extrema of the components <comps> as a bar chart.
+    <extrema> maps components to dictionaries with (time, value) tuples
+    under the keys 'glob_max' and 'glob_min' of ESATAN quantity <quantity>.
+    Returns the bars per component.
+    """
+    axes.clear()
+    axes.set_title(EXTREMA_TITLE)
+    extrPlots = {}
+    for ind, comp in enumerate(comps):
+        yMax = extrema[comp]['glob_max'][1]
+        yMin = extrema[comp]['glob_min'][1]
+        extrPlots[comp] = {}
+        extrPlots[comp]['extrMax'] = axes.bar(ind, yMax, width=width, color='r', align='center')
+        extrPlots[comp]['extrMin'] = axes.bar(ind + width, yMin, width=width, color='b', align='center')
+
+    # Place and name ticks
+    axes.set_xticks([ind + width/2 for ind in range(len(comps))])
+    axes.tick_params(axis='x', which='both', length=0)
+    axes.set_xticklabels(comps)
+
+    # Add padding to every other ticklabel so they won't overlap
+    for i, tick in enumerate(axes.xaxis.get_major_ticks()):
+        if i%2 == 0:
+            tick.set_pad(20)
+
+    # Add values above/below bars
+    bars = axes.patches
+    vals = []
+    for bar in bars:
+        if bar.get_y() < 0:
+            vals.append(bar.get_y())
+        else:
+            vals.append(bar.get_height())
+
+    # Figure out how high the y-axis is
+    ybottom, ytop = axes.get_ylim() 
+
+    # Place the labels in good positions depending on the height of the
+    # bar and use height of y-axis as a scale for the padding
+    for bar, val in zip(bars, vals):
+        # If bar is positive, try to place label above it
+        if val > 0:
+            propHeight = val / ytop
+            # If the bar is too high, place label inside
+            if propHeight > .90: 
+                axes.text(bar.get_x() + bar.get_width()/2, val - ytop*.04, str(val), ha='center', va='bottom')
+            # Else, place label above
+            else:
+                axes.text(bar.get_x() + bar.get_width()/2, val + ytop*.01, str(val), ha='center', va='bottom')
+        # If bar is negative, try to place label below it
+        else:
+            propHeight = val / ybottom
+            # Note that ybottom is negative, so signs are reversed
+            if propHeight > .95: 
+                axes.text(bar.get_x() + bar.get_width()/2, val - ybottom*.01, str(val), ha='center', va='bottom')
+            else:
+                axes.text(bar.get_x() + bar.get_width()/2, val + ybottom*.04, str(val), ha='center', va='bottom')
+    
+    # Legend
+    name = quantityName(quantity)
+    blue_patch = mpatches.Patch(color='blue', label='Minimum {}'.format(name))
+    red_patch = mpatches.Patch(color='red', label='Maximum {}'.format(name))
+    leg = axes.legend(handles=[red_patch, blue_patch])
+    leg.get_frame().set_alpha(0.4)
+
+    return extrPlots
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Profiling of slow operations. Once enabled, functions decorated with
+profiled() run under cProfile. For every call a report of the hotspots,
+sorted by cumulative and by own time, is written to the profiles folder as
+text file, along with the raw statistics as .prof file. The .prof files can
+be read with pstats or turned into call graphs with tools like gprof2dot or
+snakeviz. Files are named by stage and case combination.
+
+Profiled functions called by another profiled function are part of the
+outer report and get no report of their own.
+"""
+
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import threading
+import time
+
+PROFILE_DIR = 'profiles'
+
+# Number of functions listed per table in the reports
+REPORT_LINES = 40
+
+# Folder the reports are written to, None while profiling is disabled
+folder = None
+
+# Profiling is done per thread, nested calls are not profiled separately
+state = threading.local()
+
+
+def enable(profileDir=PROFILE_DIR):
+    """ Enables profiling of all decorated functions, writing the reports to <profileDir>. """
+    global folder
+    if not os.path.isdir(profileDir):
+        os.makedirs(profileDir)
+    folder = profileDir
+    logging.info("Profiling enabled, writing reports to {}".format(profileDir))
+
+
+def profiled(stage, caseOf=None):
+    """
+    Decorator for methods to be profiled as <stage>. The report is named
+    after the case combination returned by <caseOf>, which is called with
+    the instance after the call. By default the 'caseComb' attribute of the
+    instance is used.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if folder is None or getattr(state, 'active', False):
+                return func(self, *args, **kwargs)
+            profiler = cProfile.Profile()
+            state.active = True
+            try:
+                return profiler.runcall(func, self, *args, **kwargs)
+            finally:
+                state.active = False
+                try:
+                    caseComb = caseOf(self) if caseOf is not None else getattr(self, 'caseComb', None)
+                except Exception:
+                    caseComb = None
+                dump(profiler, stage, caseComb)
+        return wrapper
+    return decorator
+
+
+def dump(profiler, stage, caseComb):
+    """ Writes statistics and hotspot report of <profiler>. """
+    name = '{}_{}_{}'.format(stage, caseComb if caseComb else 'file', time.strftime('%Y%m%d-%H%M%S'))
+    base = os.path.join(folder, name)
+    count = 1
+    while os.path.exists(base + '.prof'):
+        count += 1
+        base = os.path.join(folder, '{}_{}'.format(name, count))
+
+    try:
+        profiler.dump_stats(base + '.prof')
+        with open(base + '.txt', 'w') as f:
+            stats = pstats.Stats(profiler, stream=f)
+            stats.strip_dirs()
+            f.write('Hotspots by cumulative time\n')
+            stats.sort_stats('cumulative').print_stats(REPORT_LINES)
+            f.write('Hotspots by own time\n')
+            stats.sort_stats('tottime').print_stats(REPORT_LINES)
+            f.write('Callers of the hotspots by own time\n')
+            stats.print_callers(REPORT_LINES)
+    except Exception:
+        logging.exception("Could not write profile {}".format(base))
+        return
+    logging.info("Profile of {} written to {}".format(stage, base + '.txt'))
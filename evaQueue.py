@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Shared work queue for the batch evaluation. Any number of workers, on one
+or several hosts sharing the results folder, evaluate a campaign together
+without a queue server: the queue is the results tree itself.
+
+A worker claims a case by atomically creating a lock file in the case
+folder and renews it while evaluating. Once the case is evaluated, a marker
+file records the size and modification time of the output file, so the case
+is evaluated again if the output file changes. Claims of crashed workers
+are recovered after they were not renewed for the stale time. Cases whose
+evaluation failed get a marker as well and are not retried until their
+output file changes. Deleting the marker files forces a new evaluation.
+
+All workers must run in the same working directory on the shared
+filesystem, as the evaluation results are written relative to it.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import evalAuto
+import evaIndex
+
+# Files in every case folder
+LOCK_FILE = '.evaluation.lock'
+DONE_FILE = '.evaluation.done'
+FAILED_FILE = '.evaluation.failed'
+
+# Seconds after which a claim that was not renewed is taken over by another worker
+STALE_TIME = 600
+
+
+def workerId():
+    """ Returns the name of this worker process, unique across hosts. """
+    return '{}:{}'.format(socket.gethostname(), os.getpid())
+
+
+def signature(filePath):
+    """ Returns the size and modification time of <filePath> as string, None if it does not exist. """
+    try:
+        stat = os.stat(filePath)
+    except OSError:
+        return None
+    return '{} {!r}'.format(stat.st_size, stat.st_mtime)
+
+
+def readFile(fileName):
+    """ Returns the stripped content of a small text file, None if it cannot be read. """
+    try:
+        with open(fileName) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def writeMarker(fileName, text):
+    """ Writes <text> to <fileName> atomically, so other workers never read a partial marker. """
+    tmp = '{}.{}.tmp'.format(fileName, workerId())
+    with open(tmp, 'w') as f:
+        f.write(text + '\n')
+    os.replace(tmp, fileName)
+
+
+
+class Claim():
+    """ Lock file <lockPath> held by this worker. Renewed every <interval> seconds until released. """
+    def __init__(self, lockPath, owner, interval):
+        self.lockPath = lockPath
+        self.owner = owner
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.renew, daemon=True)
+        self.thread.start()
+
+
+    def renew(self):
+        """
+        Touches the lock file so other workers see the claim is alive. The
+        lock is missing for a moment while another worker checks whether it
+        went stale, so renewing goes on until another worker owns the lock.
+        """
+        missing = False
+        while not self.stopped.wait(self.interval):
+            owner = readFile(self.lockPath)
+            if owner is not None and owner != self.owner:
+                logging.warning("Lock {} was taken over by {}, another worker may evaluate the case as well".format(self.lockPath, owner))
+                return
+            try:
+                os.utime(self.lockPath)
+                missing = False
+            except OSError:
+                if not missing:
+                    logging.warning("Lock {} is missing, trying to renew it again".format(self.lockPath))
+                missing = True
+
+
+    def release(self):
+        """ Stops renewing and removes the lock file, unless another worker took it over. """
+        self.stopped.set()
+        self.thread.join()
+        if readFile(self.lockPath) == self.owner:
+            try:
+                os.remove(self.lockPath)
+            except OSError:
+                pass
+
+
+
+def claim(folder, stale=STALE_TIME):
+    """ Claims the case in <folder>. Returns the Claim, or None if another worker holds a live claim. """
+    lockPath = os.path.join(folder, LOCK_FILE)
+    owner = '{} {!r}'.format(workerId(), time.time())
+    for attempt in range(2):
+        try:
+            fd = os.open(lockPath, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if attempt or not recoverStale(lockPath, stale):
+                return None
+            continue
+        except OSError:
+            logging.error("Could not create lock file in {}".format(folder))
+            return None
+        with os.fdopen(fd, 'w') as f:
+            f.write(owner + '\n')
+        return Claim(lockPath, owner, stale / 4)
+    return None
+
+
+def recoverStale(lockPath, stale=STALE_TIME):
+    """ Removes the lock file <lockPath> if it was not renewed for <stale> seconds. Returns if the lock is gone. """
+    owner = readFile(lockPath)
+    try:
+        mtime = os.stat(lockPath).st_mtime
+    except OSError:
+        return True
+    if time.time() - mtime < stale:
+        return False
+
+    # Move the lock aside first. Renaming is atomic, so only one worker succeeds.
+    aside = '{}.{}.stale'.format(lockPath, workerId())
+    try:
+        os.rename(lockPath, aside)
+    except OSError:
+        return False
+
+    # Put it back if it was renewed or claimed anew in the meantime
+    try:
+        renewed = readFile(aside) != owner or time.time() - os.stat(aside).st_mtime < stale
+    except OSError:
+        renewed = False
+    if renewed:
+        try:
+            os.link(aside, lockPath)
+        except OSError:
+            pass
+    os.remove(aside)
+    if renewed:
+        return False
+    logging.warning("Recovered stale claim {} of {}".format(owner, os.path.dirname(lockPath)))
+    return True
+
+
+
+class Worker():
+    """
+    Evaluates the cases below <root> that are not evaluated yet, competing
+    with other workers for them. <options> are passed on to evalAuto.Case.
+    While only cases claimed by others are left, the worker checks every
+    <interval> seconds whether they are finished or their claim went stale.
+    """
+    def __init__(self, root, options, stale=STALE_TIME, interval=30):
+        self.root = root
+        self.options = options
+        self.stale = stale
+        self.interval = interval
+        self.name = workerId()
+
+
+    def run(self):
+        """ Works until every case is evaluated or failed. Returns the number of cases evaluated by this worker. """
+        index = evaIndex.CaseIndex(self.root, checkInterval=self.interval)
+        count = 0
+        while True:
+            pending = [comb for comb in index.combs() if not self.isFinished(index, comb)]
+            if not pending:
+                break
+
+            # Start at a random case, so workers rarely compete for the same lock
+            start = random.randrange(len(pending))
+            claimed = False
+            for comb in pending[start:] + pending[:start]:
+                # Another worker may have finished the case in the meantime
+                if self.isFinished(index, comb):
+                    continue
+                caseClaim = claim(index.cases[comb]['path'], self.stale)
+                if caseClaim is None:
+                    continue
+                claimed = True
+                try:
+                    if not self.isFinished(index, comb):
+                        count += self.evaluate(index, comb)
+                finally:
+                    caseClaim.release()
+
+            if not claimed:
+                time.sleep(self.interval)
+            index.refresh()
+        print('{} finished after evaluating {} cases'.format(self.name, count))
+        return count
+
+
+    def isFinished(self, index, comb):
+        """ Checks if case <comb> was evaluated or failed with its current output file. """
+        entry = index.cases.get(comb)
+        if entry is None:
+            return True
+        current = signature(entry['filePath'])
+        return any(readFile(os.path.join(entry['path'], marker)) == current for marker in (DONE_FILE, FAILED_FILE))
+
+
+    def evaluate(self, index, comb):
+        """ Evaluates the claimed case <comb> and leaves the marker of its result. Returns 1 on success, 0 on failure. """
+        entry = index.cases[comb]
+        current = signature(entry['filePath'])
+        print('{} evaluating case {}'.format(self.name, comb))
+        try:
+            evalAuto.Case(scan=False, **self.options).evaluate(comb, entry['path'])
+        except Exception:
+            logging.exception("Evaluation of case {} failed".format(comb))
+            writeMarker(os.path.join(entry['path'], FAILED_FILE), current)
+            return 0
+        writeMarker(os.path.join(entry['path'], DONE_FILE), current)
+        return 1
+
+
+
+def runWorker(root, options, stale, interval):
+    """ Runs a single worker in a worker process. """
+    return Worker(root, options, stale, interval).run()
+
+
+def runWorkers(root, options, workers=None, stale=STALE_TIME, interval=30):
+    """ Runs <workers> workers on this host, by default one per CPU. Returns the number of cases they evaluated. """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return runWorker(root, options, stale, interval)
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(runWorker, root, options, stale, interval) for _ in range(workers)]
+        return sum(future.result() for future in futures)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Headless report rendering. Renders the figure shown by the GUI for every
+available case with the Agg backend, spread over a process pool, and writes
+an index page linking all figures.
+"""
+
+import html
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import evalAuto
+import evaIndex
+import evaPlot
+
+# Figure reused for all cases rendered by one worker process
+template = None
+
+
+def getTemplate():
+    """ Returns figure, temporal axes and extrema axes of this process, creating them on first use. """
+    global template
+    if template is None:
+        fig = Figure(figsize=(16, 8))
+        FigureCanvasAgg(fig)
+        tempAxes = fig.add_subplot(121)
+        extrAxes = fig.add_subplot(122)
+        # Add margins for xaxis labels
+        fig.subplots_adjust(bottom=0.15)
+        template = (fig, tempAxes, extrAxes)
+    return template
+
+
+def renderCase(caseComb, path, folder, components=None):
+    """
+    Reads case <caseComb> from <path> and saves its figure into <folder>.
+    Plots all components unless a list of <components> is given. Returns a
+    dictionary summarizing the case for the index page.
+    """
+    case = evalAuto.Case(scan=False)
+    case.caseComb = caseComb
+    case.path = path
+    case.fetchTemp()
+    data = case.data
+
+    comps = sorted(comp for comp in data.extrema if components is None or comp in components)
+    colors = evaPlot.componentColors(data.components)
+
+    fig, tempAxes, extrAxes = getTemplate()
+    tempAxes.cla()
+    evaPlot.setupAxes(tempAxes, extrAxes)
+    fig.suptitle("Maximum and minimum temperatures - Case {}".format(caseComb))
+
+    handles = []
+    for comp in comps:
+        x, yMax, yMin = data.series(comp)
+        plots = evaPlot.plotTemp(tempAxes, x, yMax, yMin, data.extrema[comp]['glob_max'], data.extrema[comp]['glob_min'], colors[comp])
+        handles.append(plots['max'])
+    if handles:
+        tempAxes.legend(handles, comps, fontsize='small').get_frame().set_alpha(0.4)
+    evaPlot.plotExtrema(extrAxes, comps, data.extrema)
+
+    fileName = 'case_{}.png'.format(caseComb)
+    fig.savefig(os.path.join(folder, fileName))
+
+    summary = {'case': caseComb, 'figure': fileName}
+    if comps:
+        hottest = max(comps, key=lambda comp: data.extrema[comp]['glob_max'][1])
+        coldest = min(comps, key=lambda comp: data.extrema[comp]['glob_min'][1])
+        summary['hottest'] = (hottest, data.extrema[hottest]['glob_max'][1])
+        summary['coldest'] = (coldest, data.extrema[coldest]['glob_min'][1])
+    return summary
+
+
+def renderReport(root, folder, workers=None, components=None):
+    """ Renders the figures of all cases below <root> into <folder> with <workers> processes and writes index.html. """
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    caseIndex = evaIndex.CaseIndex(root)
+    combs = caseIndex.combs()
+    paths = [caseIndex.cases[comb]['path'] for comb in combs]
+
+    summaries = []
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(renderCase, comb, path, folder, components) for comb, path in zip(combs, paths)]
+        for comb, future in zip(combs, futures):
+            try:
+                summaries.append(future.result())
+                print('Rendered case {}'.format(comb))
+            except Exception:
+                logging.exception("Rendering case {} failed".format(comb))
+
+    writeIndex(os.path.join(folder, 'index.html'), summaries)
+    print('Report written to {}'.format(os.path.join(folder, 'index.html')))
+
+
+def describeCase(caseComb):
+    """ Returns the descriptions of the case options encoded in <caseComb>, if it is a regular combination. """
+    options = evalAuto.Case(scan=False)
+    try:
+        return [options.OptSets[int(caseComb[0])], options.powBud[int(caseComb[1])], options.orient[int(caseComb[2])]]
+    except (ValueError, KeyError, IndexError):
+        return ['', '', '']
+
+
+def writeIndex(fileName, summaries):
+    """ Writes the index page with one table row and thumbnail per case. """
+    rows = []
+    for summary in summaries:
+        cells = [html.escape(summary['case'])] + [html.escape(d) for d in describeCase(summary['case'])]
+        for key in ('hottest', 'coldest'):
+            if key in summary:
+                cells.append('{} ({} &deg;C)'.format(html.escape(summary[key][0]), summary[key][1]))
+            else:
+                cells.append('')
+        cells.append('<a href="{0}"><img src="{0}" width="320"></a>'.format(html.escape(summary['figure'])))
+        rows.append('<tr>' + ''.join('<td>{}</td>'.format(c) for c in cells) + '</tr>')
+
+    with open(fileName, 'w') as f:
+        f.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>ESATAN Evaluation Report</title></head><body>\n')
+        f.write('<h1>ESATAN Evaluation Report</h1>\n<table border="1" cellpadding="4">\n')
+        f.write('<tr><th>Case</th><th>Optical set</th><th>Power budget</th><th>Orientation</th><th>Hottest component</th><th>Coldest component</th><th>Figure</th></tr>\n')
+        f.write('\n'.join(rows))
+        f.write('\n</table>\n</body></html>\n')
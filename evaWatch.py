@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Watch-folder service. Keeps running on the results folder and evaluates
+every case as soon as its output file is complete, instead of waiting for
+a manual run of evalAuto.py over all cases.
+
+Changes are detected with filesystem notifications if the optional package
+watchdog is installed, otherwise by polling the case index.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import evalAuto
+import evaIndex
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# Seconds an output file must stay unchanged before it is considered complete
+SETTLE_TIME = 60
+
+
+def evaluateCase(caseComb, path, options):
+    """ Evaluates a single case in a worker process. """
+    evalAuto.Case(scan=False, **options).evaluate(caseComb, path)
+    return caseComb
+
+
+
+class WakeupHandler(FileSystemEventHandler):
+    """ Wakes up the watcher on any filesystem event below the results folder. """
+    def __init__(self, wakeup):
+        self.wakeup = wakeup
+
+    def on_any_event(self, event):
+        self.wakeup.set()
+
+
+
+class Watcher():
+    """
+    Evaluates new and updated cases below <root> in a pool of <workers>
+    processes. <options> are passed on to evalAuto.Case. Without
+    notifications the folders are polled every <interval> seconds.
+    """
+    def __init__(self, root, options, workers=None, interval=30, settle=SETTLE_TIME):
+        self.root = root
+        self.options = options
+        self.workers = workers
+        self.interval = interval
+        self.settle = settle
+        self.wakeup = threading.Event()
+        # Case combinations waiting for their output file to settle, with the modification time of the output file
+        self.pending = {}
+        # Cases being evaluated, with their futures
+        self.running = {}
+
+
+    def run(self):
+        """ Watches the results folder until interrupted. """
+        self.index = evaIndex.CaseIndex(self.root, checkInterval=self.interval)
+        observer = self.startObserver()
+
+        # Catch up on cases that changed while nobody was watching. Output
+        # files still being written are only evaluated once they settled.
+        for comb in self.index.combs():
+            if self.isOutdated(comb):
+                self.pending[comb] = self.index.cases[comb]['mtime']
+
+        print('Watching {} for new simulation results'.format(self.root))
+        with ProcessPoolExecutor(self.workers) as pool:
+            try:
+                while True:
+                    self.submitSettled(pool)
+                    self.collect()
+                    woken = self.wakeup.wait(self.waitTime(observer is not None))
+                    self.wakeup.clear()
+                    self.refresh(woken)
+            except KeyboardInterrupt:
+                print('Stopped watching')
+            finally:
+                if observer is not None:
+                    observer.stop()
+                    observer.join()
+
+
+    def startObserver(self):
+        """ Starts filesystem notifications if watchdog is available. Returns the observer or None. """
+        if Observer is None:
+            logging.info("watchdog not installed, polling every {} s".format(self.interval))
+            return None
+        observer = Observer()
+        observer.schedule(WakeupHandler(self.wakeup), self.root, recursive=True)
+        observer.start()
+        return observer
+
+
+    def refresh(self, woken):
+        """
+        Adds new and changed cases of the index to the pending ones. After
+        a notification (<woken>) the known cases are checked right away,
+        when polling only every check interval of the index.
+        """
+        for comb in self.index.refresh(force=woken):
+            self.pending[comb] = self.index.cases[comb]['mtime']
+
+
+    def isOutdated(self, comb):
+        """ Checks if the extrema of case <comb> are missing or older than its output file. """
+        extremaFile = evalAuto.extremaFile(comb)
+        if not os.path.isfile(extremaFile):
+            return True
+        return os.path.getmtime(extremaFile) < self.index.cases[comb]['mtime']
+
+
+    def waitTime(self, notified):
+        """ Returns how long to wait for the next change. """
+        wait = self.settle if notified else self.interval
+        if self.pending:
+            nextSettled = min(self.pending.values()) + self.settle - time.time()
+            wait = min(wait, max(nextSettled, 0.1))
+        if self.running:
+            wait = min(wait, 1.0)
+        return wait
+
+
+    def submitSettled(self, pool):
+        """
+        Hands cases whose output file did not change for the settle time to
+        the worker pool. The output file is checked again right before, as
+        the index only notices changes every few seconds.
+        """
+        now = time.time()
+        for comb, changed in list(self.pending.items()):
+            if now - changed < self.settle or comb in self.running or comb not in self.index:
+                continue
+            try:
+                mtime = os.path.getmtime(self.index.cases[comb]['filePath'])
+            except OSError:
+                # Picked up again by the index if the file reappears
+                del self.pending[comb]
+                continue
+            if mtime != changed:
+                self.pending[comb] = mtime
+                continue
+            del self.pending[comb]
+            print('Evaluating case {}'.format(comb))
+            self.running[comb] = pool.submit(evaluateCase, comb, self.index.cases[comb]['path'], self.options)
+
+
+    def collect(self):
+        """ Reports finished evaluations. """
+        for comb, future in list(self.running.items()):
+            if not future.done():
+                continue
+            del self.running[comb]
+            try:
+                future.result()
+                print('Case {} evaluated'.format(comb))
+            except Exception:
+                logging.exception("Evaluation of case {} failed".format(comb))
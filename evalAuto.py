@@ -1,10 +1,31 @@
 # -*- coding: utf-8 -*-
 
-from matplotlib import pyplot as plt
+import argparse
 import os
+import re
+
+import numpy as np
+
+import evaAnalysis
+import evaData
+import evaExport
+import evaIndex
+import evaNodes
+import evaProfile
+
+# Output folders, relative to the working directory
+EXTREMA_DIR = 'autoExtremaLogs'
+EXPORT_DIR = 'autoSeriesExports'
+DIFF_DIR = 'autoDiffs'
+SENSITIVITY_DIR = 'autoSensitivity'
+REGRESSION_DIR = 'autoRegressions'
+GRADIENT_DIR = 'autoGradients'
+NODEMAP_DIR = 'autoNodeMaps'
+NODE_EXTREMA_DIR = 'autoNodeExtremaLogs'
+CSV_EXTREMA_DIR = 'autoCsvExtremaLogs'
 
 class Case():
-    def __init__(self):
+    def __init__(self, root='.', exportFormats=(), nodes=False, nodeBudget=evaData.NODE_BUDGET, resample=0, profile=False, submodel=None, quantities=evaData.QUANTITIES, window=0, statistic='mean', gradients=(), scan=True):
         # Optical sets
         self.OptSets = {
                 1: 'CFK for Flappanels, Green PCB for Sidepanels',
@@ -31,84 +52,451 @@ class Case():
                 3: 'Random Tumbling'
                 }
 
-        self.checkComb()
+        self.root = root
+        self.exportFormats = exportFormats
+        self.nodes = nodes
+        self.nodeBudget = nodeBudget
+        self.resample = resample
+        self.submodel = submodel
+        self.quantities = quantities
+        self.window = window
+        self.statistic = statistic
+        self.gradients = gradients
+        if profile:
+            evaProfile.enable()
+        if scan:
+            self.checkComb()
 
     def checkComb(self):
-        for i in self.OptSets:
-            for j in self.powBud:
-                for k in self.orient:
-                    self.caseComb = str(i) + str(j) + str(k)
-                    self.path = 'MOVE_II_3_' + str(self.caseComb)[0] + '/esatan/Case_' + self.caseComb
-                    if os.path.isdir(self.path):
-                        self.fetchTemp()
-                        self.saveExtrema()
-                    else:
-                        pass
+        # Find all available cases with a single scan of the folder tree
+        caseIndex = evaIndex.CaseIndex(self.root)
+        for caseComb in caseIndex.combs():
+            self.evaluate(caseComb, caseIndex.cases[caseComb]['path'])
+        if self.gradients:
+            gradientCampaign()
+
+    @evaProfile.profiled('evaluate')
+    def evaluate(self, caseComb, path):
+        self.caseComb = caseComb
+        self.path = path
+        self.fetchTemp()
+        # Extrema of every quantity read, temperatures in the plain extrema log
+        for quantity in self.data.quantitiesOf(self.data.submodel):
+            self.data.select(quantity=quantity)
+            self.saveExtrema()
+            if self.data.nodeTemps is not None:
+                self.saveNodeExtrema()
+        if self.gradients:
+            self.saveGradients()
+        self.saveNodeMap()
+        if self.exportFormats:
+            self.exportSeries()
 
+    def evaluateCSV(self, fileName, nodeMap):
+        # Reduce the node columns of an ESATAN CSV export to components
+        self.caseComb = csvComb(fileName)
+        print('Reading node temperatures from CSV file {}'.format(fileName))
+        time, nodes, temps = evaNodes.readCSV(fileName)
+        # Temperatures of exactly 0.0 are known to be faulty
+        temps[temps == 0.0] = np.nan
+        components, Tmax, Tmin = nodeMap.reduce(nodes, temps)
+        self.data = evaAnalysis.Series(time, components, Tmax, Tmin, self.caseComb)
+        self.components = components
+        # CSV exports carry full double precision
+        self.saveExtrema(CSV_EXTREMA_DIR, digits=3)
+        for fmt in self.exportFormats:
+            if not os.path.isdir(EXPORT_DIR): os.makedirs(EXPORT_DIR)
+            fileName = os.path.join(EXPORT_DIR, 'series_{}_csv.{}'.format(self.caseComb, fmt))
+            evaExport.exportSeries(fileName, time, components, [('Tmax', Tmax), ('Tmin', Tmin)])
+
+    @evaProfile.profiled('fetchTemp')
     def fetchTemp(self):
-        filePath = self.path + '/MOVE_II_.out'
-        print 'Reading temperature data from ESATAN logfile {}'.format(filePath)
-
-        with open(filePath) as logFile:
-                lines = logFile.readlines()
-        
-        timestep = 0
-        self.data = {}
-        self.components = []
-        for i,line in enumerate(lines):
-                # Search for temperature data paragraph
-                if '+MOVE' in line:
-                        timestep += 1
-                        
-                        # This if is necessary because in some files the data following the +MOVE flag is not temperature data
-                        if lines[i+3].split()[2] == 'T':
-                            for l in lines[i+6:]:               #skip subheader
-                                # Break at end of paragraph
-                                if not l.strip():
-                                        break
-                                else:
-                                        lWords = l.split()
-                                        component = lWords[1]
-                                        try:
-                                            temp = float(lWords[2])
-                                        except Exception:
-                                            pass
-
-                                        if component not in self.data.keys():
-                                            self.components.append(component)
-                                            self.data[component] = {}
-                                            self.data[component]['Tmax_global'] = (0.0,-9999)
-                                            self.data[component]['Tmin_global'] = (0.0,9999)
-                                        if timestep not in self.data[component].keys():
-                                            self.data[component][timestep] = {}
-                                            self.data[component][timestep]['Tmax'] = -9999
-                                            self.data[component][timestep]['Tmin'] = 9999 
-                                        
-                                        # Check against global extrema
-                                        if temp > self.data[component]['Tmax_global'][1] and temp != 0.0:
-                                            self.data[component]['Tmax_global'] = (timestep,temp)
-                                        elif temp < self.data[component]['Tmin_global'][1] and temp != 0.0:
-                                            self.data[component]['Tmin_global'] = (timestep,temp)
-
-                                        # Determine extrema for this timestep
-                                        if temp > self.data[component][timestep]['Tmax'] and temp!= 0.0:
-                                            self.data[component][timestep]['Tmax'] = temp
-                                        elif temp < self.data[component][timestep]['Tmin'] and temp != 0.0:
-                                            self.data[component][timestep]['Tmin'] = temp
-    
-
-    def saveExtrema(self):
-        if not os.path.isdir('autoExtremaLogs'): os.mkdir('autoExtremaLogs')
-        saveFile = 'autoExtremaLogs/extrema_' + self.caseComb + '.txt'
-        print "Writing data to file", saveFile
+        filePath = evaData.findOutput(self.path)
+        print('Reading temperature data from ESATAN logfile {}'.format(filePath))
+
+        # Temperatures of exactly 0.0 are known to be faulty
+        self.data = evaData.CaseData(filePath, self.caseComb, ignoreValues=[0.0], nodes=self.nodes, nodeBudget=self.nodeBudget, quantities=self.quantities)
+        if self.submodel is not None:
+            if self.submodel in self.data.submodels:
+                self.data.select(self.submodel)
+            else:
+                print('Submodel {} not found, using {}'.format(self.submodel, self.data.submodel))
+        if self.resample > 0:
+            self.data.resample(self.resample)
+        self.components = self.data.components
+
+    def exportSeries(self):
+        print('Exporting time series of case {}'.format(self.caseComb))
+        evaExport.exportCase(self.data, EXPORT_DIR, self.exportFormats)
+        if self.window > 0:
+            self.exportRolling()
+
+    def exportRolling(self):
+        # Rolling window series of every quantity, named like Tmax_mean5400
+        print('Exporting rolling window series of case {}'.format(self.caseComb))
+        selected = self.data.quantity
+        series = []
+        for quantity in self.data.quantitiesOf(self.data.submodel):
+            self.data.select(quantity=quantity)
+            rolled = evaAnalysis.rollingSeries(self.data, self.window, self.statistic)
+            name = '{}{:g}'.format(self.statistic, self.window)
+            series.extend([('{}max_{}'.format(quantity, name), rolled.Tmax), ('{}min_{}'.format(quantity, name), rolled.Tmin)])
+        self.data.select(quantity=selected)
+        for fmt in self.exportFormats:
+            fileName = os.path.join(EXPORT_DIR, 'rolling_{}.{}'.format(self.caseComb, fmt))
+            evaExport.exportSeries(fileName, self.data.time, self.data.components, series)
+
+    def saveGradients(self):
+        # Temperature differences within the groups of components
+        if 'T' not in self.data.quantitiesOf(self.data.submodel):
+            print('No temperatures found in case {}, skipping the gradients'.format(self.caseComb))
+            return
+        selected = self.data.quantity
+        self.data.select(quantity='T')
+        gradients = evaAnalysis.Gradients(self.data, self.gradients)
+        self.data.select(quantity=selected)
+        for group in gradients.missing:
+            print('Less than two components of group {} found in case {}'.format(evaAnalysis.GROUP_SEPARATOR.join(group), self.caseComb))
+        os.makedirs(GRADIENT_DIR, exist_ok=True)
+        saveFile = gradientFile(self.caseComb)
+        print("Writing gradients to file", saveFile)
+        gradients.saveMaxima(saveFile)
+        for fmt in self.exportFormats:
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            fileName = os.path.join(EXPORT_DIR, 'gradients_{}.{}'.format(self.caseComb, fmt))
+            evaExport.exportSeries(fileName, gradients.time, gradients.names, [('dT', gradients.dT)])
+
+    def saveNodeMap(self):
+        # Workers of a shared queue may create the folders at the same time
+        os.makedirs(NODEMAP_DIR, exist_ok=True)
+        evaNodes.fromCase(self.data).save(nodeMapFile(self.caseComb))
+
+    def saveExtrema(self, folder=EXTREMA_DIR, digits=None):
+        # Values are written as read, unless a number of decimal <digits> is given
+        quantity = getattr(self.data, 'quantity', 'T')
+        os.makedirs(folder, exist_ok=True)
+        saveFile = extremaFile(self.caseComb, folder, quantity)
+        print("Writing data to file", saveFile)
         f = open(saveFile,'w')
 
-        f.write('Component\tTmax\tTmin\n')
+        f.write('Component\t{0}max\t{0}min\n'.format(quantity))
 
-        for comp in self.data.keys():
-                string = '{:60s}{:15s}{:15s}\n'.format(comp, str(self.data[comp]['Tmax_global'][1]), str(self.data[comp]['Tmin_global'][1]))
+        for comp in self.data.extrema:
+                Tmax, Tmin = self.data.extrema[comp]['glob_max'][1], self.data.extrema[comp]['glob_min'][1]
+                if digits is not None:
+                    Tmax, Tmin = round(float(Tmax), digits), round(float(Tmin), digits)
+                string = '{:60s}{:15s}{:15s}\n'.format(comp, str(Tmax), str(Tmin))
                 f.write(string)
 
         f.close()
-        
-obj = Case()
+
+
+    def saveNodeExtrema(self):
+        # Hottest and coldest node of every component, with the time they occur
+        quantity = self.data.quantity
+        os.makedirs(NODE_EXTREMA_DIR, exist_ok=True)
+        saveFile = extremaFile(self.caseComb, NODE_EXTREMA_DIR, quantity)
+        print("Writing node extrema to file", saveFile)
+        with open(saveFile, 'w') as f:
+            f.write('Component\t{0}max\tNode\tTime\t{0}min\tNode\tTime\n'.format(quantity))
+            for comp in self.data.components:
+                extrema = self.data.nodeExtrema(comp)
+                if not extrema:
+                    continue
+                nodeMax, timeMax, Tmax = extrema['glob_max']
+                nodeMin, timeMin, Tmin = extrema['glob_min']
+                f.write('{:60s}{:<15g}{:10s}{:<15g}{:<15g}{:10s}{:g}\n'.format(comp, Tmax, nodeMax, timeMax, Tmin, nodeMin, timeMin))
+
+
+def extremaFile(caseComb, folder=EXTREMA_DIR, quantity='T'):
+    # Extrema of other quantities than temperature are named extrema_<case combination>_<quantity>.txt
+    if quantity != 'T':
+        caseComb = '{}_{}'.format(caseComb, quantity)
+    return os.path.join(folder, 'extrema_' + caseComb + '.txt')
+
+
+def nodeMapFile(caseComb):
+    return os.path.join(NODEMAP_DIR, 'nodes_' + caseComb + '.txt')
+
+
+def csvComb(fileName):
+    # ESATAN CSV exports are named case<case combination>.csv
+    name = os.path.basename(fileName)
+    match = re.search(r'(\d+)', name)
+    return match.group(1) if match else name.split('.')[0]
+
+
+def loadNodeMap(caseComb):
+    # Use the node map of the same case, otherwise merge the maps of all evaluated cases
+    if os.path.isfile(nodeMapFile(caseComb)):
+        return evaNodes.load(nodeMapFile(caseComb))
+    nodeMap = evaNodes.NodeMap()
+    if os.path.isdir(NODEMAP_DIR):
+        for name in sorted(os.listdir(NODEMAP_DIR)):
+            nodeMap.update(evaNodes.load(os.path.join(NODEMAP_DIR, name)))
+    return nodeMap
+
+
+def evaluateCSVs(fileNames, exportFormats=()):
+    case = Case(exportFormats=exportFormats, scan=False)
+    for fileName in fileNames:
+        nodeMap = loadNodeMap(csvComb(fileName))
+        if not len(nodeMap):
+            print('No node maps found in {}, evaluate the output files first'.format(NODEMAP_DIR))
+            return
+        case.evaluateCSV(fileName, nodeMap)
+
+
+def readExtrema(caseComb, folder=EXTREMA_DIR):
+    # Read the extrema log written by Case.saveExtrema
+    extrema = {}
+    with open(extremaFile(caseComb, folder)) as f:
+        next(f, None)
+        for line in f:
+            words = line.split()
+            if len(words) == 3:
+                extrema[words[0]] = (float(words[1]), float(words[2]))
+    return extrema
+
+
+def readCampaign(folder=EXTREMA_DIR, temperatures=True):
+    # Read all extrema logs in <folder>. Returns the case combinations, the
+    # components and Tmax and Tmin of shape (cases, components), NaN where a
+    # case lacks a component. Logs of other quantities are read as cases
+    # <case combination>_<quantity> unless only <temperatures> are wanted.
+    combs = []
+    if os.path.isdir(folder):
+        combs = sorted(name[len('extrema_'):-len('.txt')] for name in os.listdir(folder) if name.startswith('extrema_') and name.endswith('.txt'))
+        if temperatures:
+            combs = [caseComb for caseComb in combs if '_' not in caseComb]
+
+    extrema = [readExtrema(caseComb, folder) for caseComb in combs]
+    components = []
+    compIndex = {}
+    for caseExtrema in extrema:
+        for comp in caseExtrema:
+            if comp not in compIndex:
+                compIndex[comp] = len(components)
+                components.append(comp)
+    Tmax = np.full((len(combs), len(components)), np.nan)
+    Tmin = np.full((len(combs), len(components)), np.nan)
+    for i, caseExtrema in enumerate(extrema):
+        for comp, (ma, mi) in caseExtrema.items():
+            Tmax[i, compIndex[comp]] = ma
+            Tmin[i, compIndex[comp]] = mi
+    return combs, components, Tmax, Tmin
+
+
+def gradientFile(caseComb, folder=GRADIENT_DIR):
+    return os.path.join(folder, 'gradients_' + caseComb + '.txt')
+
+
+def readGradients(caseComb, folder=GRADIENT_DIR):
+    # Read the gradients written by Case.saveGradients. Returns a dictionary
+    # of (dTmax, time, hot, cold) tuples per group, None for groups without data.
+    gradients = {}
+    with open(gradientFile(caseComb, folder)) as f:
+        next(f, None)
+        for line in f:
+            words = line.split()
+            if len(words) == 5:
+                gradients[words[0]] = (float(words[1]), float(words[2]), words[3], words[4])
+            elif len(words) == 1:
+                gradients[words[0]] = None
+    return gradients
+
+
+def gradientCampaign(folder=GRADIENT_DIR):
+    # Summarize the gradients of all evaluated cases: the worst case of every
+    # group and the largest difference of every group in every case
+    combs = []
+    if os.path.isdir(folder):
+        combs = sorted(name[len('gradients_'):-len('.txt')] for name in os.listdir(folder) if name.startswith('gradients_') and name.endswith('.txt'))
+    if not combs:
+        print('No gradients found in {}'.format(folder))
+        return
+    gradients = [readGradients(caseComb, folder) for caseComb in combs]
+    groups = []
+    for caseGradients in gradients:
+        groups.extend(group for group in caseGradients if group not in groups)
+    dTmax = np.array([[caseGradients[group][0] if caseGradients.get(group) else np.nan for group in groups] for caseGradients in gradients]).reshape(len(combs), len(groups))
+
+    saveFile = os.path.join(folder, 'gradients.txt')
+    print("Writing gradients of {} cases to file".format(len(combs)), saveFile)
+    with open(saveFile, 'w') as f:
+        f.write('##############################\n# ESATAN Evaluation - Temperature gradients, {} cases\n##############################\n\n'.format(len(combs)))
+        f.write('# Largest temperature difference of every group over all cases [K]\n')
+        f.write('{:60s}{:15s}{:15s}{:15s}{:60s}{}\n'.format('Group', 'dTmax', 'Case', 'Time', 'Hot', 'Cold'))
+        for g, group in enumerate(groups):
+            if np.isnan(dTmax[:, g]).all():
+                f.write('{:60s}\n'.format(group))
+                continue
+            i = np.nanargmax(dTmax[:, g])
+            value, time, hot, cold = gradients[i][group]
+            f.write('{:60s}{:15s}{:15s}{:15s}{:60s}{}\n'.format(group, evaAnalysis.formatValue(value), combs[i], '{:g}'.format(time), hot, cold))
+
+        f.write('\n# Largest temperature difference of every group per case [K]\n')
+        f.write('{:15s}'.format('Case') + ''.join('{:60s}'.format(group) for group in groups).rstrip() + '\n')
+        for i, caseComb in enumerate(combs):
+            f.write(('{:15s}'.format(caseComb) + ''.join('{:60s}'.format(evaAnalysis.formatValue(v)) for v in dTmax[i])).rstrip() + '\n')
+
+
+def sensitivity():
+    # Effects of the case factors on the extrema of all evaluated cases
+    combs, components, Tmax, Tmin = readCampaign()
+    if not combs:
+        print('No evaluated cases found in {}, evaluate the cases first'.format(EXTREMA_DIR))
+        return
+
+    analysis = evaAnalysis.Sensitivity(combs, components, Tmax, Tmin)
+
+    if not os.path.isdir(SENSITIVITY_DIR): os.mkdir(SENSITIVITY_DIR)
+    saveFile = os.path.join(SENSITIVITY_DIR, 'sensitivity.txt')
+    print("Writing sensitivity of {} cases to file".format(len(analysis.combs)), saveFile)
+    options = Case(scan=False)
+    analysis.saveEffects(saveFile, [options.OptSets, options.powBud, options.orient])
+
+
+def compareCampaigns(baseline, candidate=EXTREMA_DIR, tolerance=0.1):
+    # Compare the extrema logs of two campaigns, e.g. an archived copy of
+    # autoExtremaLogs against the current one
+    campaigns = []
+    for folder in (baseline, candidate):
+        campaign = readCampaign(folder, temperatures=False)
+        if not campaign[0]:
+            print('No extrema logs found in {}'.format(folder))
+            return
+        campaigns.append(campaign)
+    regression = evaAnalysis.Regression(campaigns[0], campaigns[1], tolerance)
+
+    if not os.path.isdir(REGRESSION_DIR): os.mkdir(REGRESSION_DIR)
+    saveFile = os.path.join(REGRESSION_DIR, 'regression_{}_{}.txt'.format(os.path.basename(os.path.normpath(baseline)), os.path.basename(os.path.normpath(candidate))))
+    print("{} extrema changed by more than {} K, writing them to file".format(len(regression.changes), tolerance), saveFile)
+    regression.saveReport(saveFile, baseline, candidate)
+
+
+def checkCases(root):
+    # Validate the output files of all cases before an evaluation from their
+    # headers, without parsing the results
+    caseIndex = evaIndex.CaseIndex(root)
+    headers = [(comb, caseIndex.header(comb)) for comb in caseIndex.combs()]
+    if not headers:
+        print('No cases found below {}'.format(root))
+        return []
+
+    # Cases are expected to agree with the majority in time range and components
+    def majority(values):
+        values = [v for v in values if v is not None]
+        return max(set(values), key=values.count) if values else None
+    valid = [info for comb, info in headers if info is not None and info['components']]
+    timeRange = majority([info['timeRange'] for info in valid])
+    components = majority([tuple(sorted((sub, tuple(comps)) for sub, comps in info['components'].items())) for info in valid])
+
+    problems = []
+    print('{:<8}{:>10}{:>12}{:>12}{:>12}  {}'.format('Case', 'Size [MB]', 'Time steps', 'First [s]', 'Last [s]', 'Remarks'))
+    for comb, info in headers:
+        remarks = []
+        if info is None:
+            remarks.append('unreadable')
+        elif not info['components']:
+            remarks.append('no results')
+        else:
+            if info['timeRange'][1] is None:
+                remarks.append('end unknown')
+            elif info['timeRange'] != timeRange:
+                remarks.append('time range differs')
+            if tuple(sorted((sub, tuple(comps)) for sub, comps in info['components'].items())) != components:
+                remarks.append('components differ')
+        if remarks:
+            problems.append(comb)
+        if info is None:
+            print('{:<8}{:>10}{:>12}{:>12}{:>12}  {}'.format(comb, '', '', '', '', ', '.join(remarks)))
+            continue
+        first, last = info['timeRange']
+        print('{:<8}{:>10.1f}{:>12}{:>12}{:>12}  {}'.format(comb, info['size'] / 1e6,
+              evaData.formatTimesteps(info),
+              '{:.10g}'.format(first) if first is not None else '?', '{:.10g}'.format(last) if last is not None else '?', ', '.join(remarks)))
+    print('{} of {} cases need attention'.format(len(problems), len(headers)))
+    return problems
+
+
+def diffCases(root, caseA, caseB, exportFormats=()):
+    # Read both cases and write the difference A minus B
+    caseIndex = evaIndex.CaseIndex(root)
+    data = []
+    for caseComb in (caseA, caseB):
+        if caseComb not in caseIndex:
+            print('Case {} not found below {}'.format(caseComb, root))
+            return
+        case = Case(scan=False)
+        case.caseComb = caseComb
+        case.path = caseIndex.cases[caseComb]['path']
+        case.fetchTemp()
+        data.append(case.data)
+    diff = evaAnalysis.CaseDiff(*data)
+
+    if not os.path.isdir(DIFF_DIR): os.mkdir(DIFF_DIR)
+    baseName = os.path.join(DIFF_DIR, 'diff_{}_{}'.format(caseA, caseB))
+    print("Writing differences to file", baseName + '.txt')
+    diff.saveExtrema(baseName + '.txt')
+    for fmt in exportFormats:
+        evaExport.exportSeries(baseName + '.' + fmt, diff.time, diff.components, [('dTmax', diff.dTmax), ('dTmin', diff.dTmin)])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Evaluates all available case combinations.')
+    parser.add_argument('--root', default='.', help='folder below which the Case_<case combination> folders are searched (default: current folder)')
+    parser.add_argument('--export', nargs='+', choices=('npz', 'csv'), default=[], help='also export the complete time series of every case in the given formats')
+    parser.add_argument('--nodes', action='store_true', help='keep the temperature of every node, exported along with the component series and logged with the hottest and coldest node of every component')
+    parser.add_argument('--node-budget', type=float, default=evaData.NODE_BUDGET, help='memory budget for node data per case in MB (default: %(default)s)')
+    parser.add_argument('--submodel', default=None, help='submodel to evaluate (default: the main model {}*, otherwise the first submodel found)'.format(evaData.MAIN_SUBMODEL))
+    parser.add_argument('--quantities', nargs='+', default=list(evaData.QUANTITIES), metavar='ENTITY', help='ESATAN quantities to read, e.g. T QI, each written to its own extrema log and exported (default: %(default)s)')
+    parser.add_argument('--resample', type=float, default=0, metavar='STEP', help='resample the exported time series onto a uniform grid with a spacing of STEP seconds')
+    parser.add_argument('--window', type=float, default=0, metavar='SECONDS', help='also export rolling window series over SECONDS, e.g. one orbit, with the time series exported by --export')
+    parser.add_argument('--statistic', choices=evaAnalysis.WINDOW_STATISTICS, default='mean', help='statistic of the rolling window (default: %(default)s)')
+    parser.add_argument('--gradients', nargs='+', default=[], metavar='GROUP', help='also write the largest temperature difference within every group of components, given as comma separated components, e.g. battery_board1,battery_board2')
+    parser.add_argument('--watch', action='store_true', help='keep running and evaluate cases as soon as their output file is complete')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes in watch, queue and report mode (default: number of CPUs)')
+    parser.add_argument('--interval', type=float, default=30, help='seconds between polls of the case folders in watch mode and between checks for cases claimed by other workers in queue mode (default: %(default)s)')
+    parser.add_argument('--settle', type=float, default=60, help='seconds an output file must stay unchanged before it is evaluated in watch mode (default: %(default)s)')
+    parser.add_argument('--queue', action='store_true', help='evaluate the cases together with workers on other hosts, claiming them through lock files in the case folders. All workers must run in the same folder on the shared filesystem')
+    parser.add_argument('--stale', type=float, default=600, help='seconds after which the claim of a case by a crashed worker is taken over in queue mode (default: %(default)s)')
+    parser.add_argument('--report', metavar='FOLDER', help='instead of evaluating, render the figures of all cases into FOLDER with an index page')
+    parser.add_argument('--components', nargs='+', default=None, help='components to plot in the report (default: all)')
+    parser.add_argument('--diff', nargs=2, metavar=('CASE_A', 'CASE_B'), help='instead of evaluating, write the differences of case A minus case B')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'), help='instead of evaluating, compare the extrema logs in folder CANDIDATE (e.g. {}) against those in folder BASELINE'.format(EXTREMA_DIR))
+    parser.add_argument('--tolerance', type=float, default=0.1, help='changes of extrema up to this many K are not reported by --compare (default: %(default)s)')
+    parser.add_argument('--check', action='store_true', help='instead of evaluating, list the time range and size of every case from the headers of the output files and flag incomplete or deviating cases')
+    parser.add_argument('--sensitivity', action='store_true', help='instead of evaluating, analyse the effects of optical set, power budget and orientation on the extrema of all evaluated cases')
+    parser.add_argument('--profile', action='store_true', help='write profiling reports of reading and evaluating every case to the folder profiles')
+    parser.add_argument('--csv', nargs='+', metavar='FILE', help='instead of evaluating the output files, reduce the node columns of ESATAN CSV exports to components using the node maps of evaluated cases')
+    args = parser.parse_args()
+    if args.window > 0 and not args.export:
+        parser.error('--window writes the rolling window series with the exported time series, choose their formats with --export')
+    gradients = evaAnalysis.parseGroups(';'.join(args.gradients))
+
+    if args.profile:
+        evaProfile.enable()
+    if args.csv:
+        evaluateCSVs(args.csv, args.export)
+    elif args.check:
+        checkCases(args.root)
+    elif args.compare:
+        compareCampaigns(args.compare[0], args.compare[1], args.tolerance)
+    elif args.sensitivity:
+        sensitivity()
+    elif args.diff:
+        diffCases(args.root, args.diff[0], args.diff[1], args.export)
+    elif args.report:
+        import evaReport
+        evaReport.renderReport(args.root, args.report, args.workers, args.components)
+    elif args.watch or args.queue:
+        options = {'exportFormats': args.export, 'nodes': args.nodes, 'nodeBudget': args.node_budget, 'resample': args.resample, 'profile': args.profile, 'submodel': args.submodel, 'quantities': args.quantities, 'window': args.window, 'statistic': args.statistic, 'gradients': gradients}
+        if args.queue:
+            import evaQueue
+            evaQueue.runWorkers(args.root, options, args.workers, args.stale, args.interval)
+        else:
+            import evaWatch
+            evaWatch.Watcher(args.root, options, args.workers, args.interval, args.settle).run()
+    else:
+        obj = Case(args.root, args.export, args.nodes, args.node_budget, args.resample, args.profile, args.submodel, args.quantities, args.window, args.statistic, gradients)
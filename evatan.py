@@ -16,21 +16,31 @@ from matplotlib.figure import Figure
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.pyplot import cm
-import matplotlib.patches as mpatches
 import matplotlib.transforms as mtransforms
+import matplotlib.ticker as mticker
+from matplotlib.lines import Line2D
 
 logging.info('Importing PyQt5')
 from PyQt5 import QtWidgets
 from PyQt5.uic import loadUiType
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QStringListModel
 
 logging.info('Importing sys')
 import sys
 logging.info('Importing os')
 import os
+import functools
 logging.info('Importing numpy')
 import numpy as np
 
+import evaAnalysis
+import evaCache
+import evaData
+import evaExport
+import evaIndex
+import evaPlot
+import evaProfile
+
 
 # Try to find UI file in temp folder created by exe. Works if UI file was included in the exe by tweaking the pyinstaller spec file
 if hasattr(sys, '_MEIPASS'):
@@ -109,18 +119,46 @@ class ApplicationWindow(QMainWindow, Ui_MainWindow):
         self.tempStatTable.horizontalHeader().setStretchLastSection(True)
         
 
+        # Workspace of loaded cases, one tab per case
+        self.cases = evaCache.CaseCache(self.cacheBudget, onEvict=self.removeCase)
+        self.caseTabs = QtWidgets.QTabBar(self)
+        self.caseTabs.setTabsClosable(True)
+        self.caseTabs.setExpanding(False)
+        self.caseTabs.currentChanged.connect(self.switchCase)
+        self.caseTabs.tabCloseRequested.connect(self.closeCase)
+        self.xPlotLayout.addWidget(self.caseTabs)
+
+        # Background reading of the cases likely to be opened next, in a separate process
+        self.recentCombs = []
+        self.prefetcher = evaCache.Prefetcher(self.caseReader(), self.cases, self.prefetchCount)
+
+        # Index of available cases, used for autocompletion of the case input
+        self.caseCompleterModel = QStringListModel(self)
+        self.caseCompleter = QtWidgets.QCompleter(self.caseCompleterModel, self)
+        self.caseEdit.setCompleter(self.caseCompleter)
+        self.updateCaseIndex()
+
         # Make some menu buttons checkable
         self.menuFixZoom.setCheckable(True)
+        self.menuViewHeatmap.setCheckable(True)
+        self.menuViewHeatmapTmin.setCheckable(True)
 
         # Implement GUI logic
-        self.menuFixZoom.toggled.connect(self.updatexPlot)
+        self.menuFixZoom.toggled.connect(lambda checked: self.updatexPlot())
+        self.menuViewHeatmap.toggled.connect(self.toggleHeatmap)
+        self.menuViewHeatmapTmin.toggled.connect(self.toggleHeatmap)
+        self.menuViewDiff.triggered.connect(self.showDiff)
+        self.menuViewGradients.triggered.connect(self.showGradients)
         self.caseEdit.returnPressed.connect(self.createxPlot)
+        self.caseEdit.textChanged.connect(self.previewCase)
         self.compSelection.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         self.compSelection.itemSelectionChanged.connect(self.updatexPlot)
         self.menuViewShowCaseOptions.triggered.connect(self.showCaseOptions)
         self.menuQuit.triggered.connect(self.quit)
         self.menuIgnore.triggered.connect(self.editIgnores)
         self.menuThresholds.triggered.connect(self.editThresholds)
+        self.menuWindow.triggered.connect(self.editWindow)
+        self.menuGradients.triggered.connect(self.editGradients)
         self.btnLoadFile.clicked.connect(self.loadFile)
         self.menuChangeDir.triggered.connect(self.changeCfg)
         # unbind previous plots from save menu action
@@ -141,10 +179,24 @@ class ApplicationWindow(QMainWindow, Ui_MainWindow):
                 f.write('# Path to the parent folder in which the subfolders with the ESATAN output files reside. Subfolders must be named "Case_<case combination>"\npath = "MOVE_II_3_1/esatan/"\n')
                 f.write('# Threshold values above/below which temperatures should be disregarded. Values must be separated by commas.\nthresholds = -200,200\n')
                 f.write('# Specific temperature values to be disregarded (For example because they are known to be faulty). Values must be separated by commas.\nignore = 0\n')
+                f.write('# Memory in MB that loaded cases may use. Least recently used cases are closed when it is exceeded.\ncache = 1000\n')
+                f.write('# Number of neighbouring case combinations read in the background while a case is displayed. 0 disables prefetching.\nprefetch = 4\n')
+                f.write('# Time step in seconds onto which all temperature series are resampled. 0 keeps the time steps of the output file.\nresample = 0\n')
+                f.write('# Set to 1 to write profiling reports of reading and plotting cases to the folder "profiles".\nprofile = 0\n')
+                f.write('# ESATAN quantities read from the output files, e.g. T for temperatures and QI for internal dissipations. Values must be separated by commas.\nquantities = T\n')
+                f.write('# Rolling window in seconds, e.g. one orbit, followed by the statistic (mean, min or max) shown as dashed curves. 0 disables the rolling window.\nwindow = 0, mean\n')
+                f.write('# Groups of components whose temperature differences are analysed, e.g. battery_board1, battery_board2; PC104_1, PC104_2. Groups must be separated by semicolons, their components by commas.\ngradients = \n')
 
         self.parentPath = "MOVE_II_3_1/esatan/"
         self.thresholds = [None, None]
         self.ignoreValues = [0]
+        self.cacheBudget = evaCache.CACHE_BUDGET
+        self.prefetchCount = 4
+        self.resampleStep = 0
+        self.quantities = list(evaData.QUANTITIES)
+        self.window = 0
+        self.windowStatistic = 'mean'
+        self.gradientGroups = []
         # Load configuration
         with open('config.txt','r') as f:
             logging.info("Reading config file")
@@ -168,20 +220,98 @@ class ApplicationWindow(QMainWindow, Ui_MainWindow):
                             self.ignoreValues = [float(v) for v in val.split(',')]
                         except:
                             logging.error("Could not read ignore values from config file. No temperature values will be ignored.")
+                    elif var in ('cache','Cache'):
+                        try:
+                            self.cacheBudget = float(val)
+                        except:
+                            logging.error("Could not read cache size from config file. Using {} MB.".format(self.cacheBudget))
+                    elif var in ('prefetch','Prefetch'):
+                        try:
+                            self.prefetchCount = int(val)
+                        except:
+                            logging.error("Could not read number of cases to prefetch from config file. Prefetching {} cases.".format(self.prefetchCount))
+                    elif var in ('resample','Resample'):
+                        try:
+                            self.resampleStep = float(val)
+                        except:
+                            logging.error("Could not read resampling time step from config file. No resampling will be done.")
+                    elif var in ('window','Window'):
+                        self.setWindow(val)
+                    elif var in ('gradients','Gradients'):
+                        self.gradientGroups = evaAnalysis.parseGroups(val)
+                    elif var in ('quantities','Quantities'):
+                        quantities = [v.strip() for v in val.split(',') if v.strip() != '']
+                        if quantities:
+                            self.quantities = quantities
+                        else:
+                            logging.error("Could not read quantities from config file. Reading {}.".format(', '.join(self.quantities)))
+                    elif var in ('profile','Profile'):
+                        if val not in ('', '0'):
+                            evaProfile.enable()
         logging.info("Loaded path to ESATAN files from config file: {}".format(self.parentPath))
         logging.info("Loaded threshold values from config file: {}".format(self.thresholds))
         logging.info("Loaded ignore values from config file: {}".format(self.ignoreValues))
+        logging.info("Loaded cache size from config file: {} MB".format(self.cacheBudget))
+        logging.info("Loaded number of cases to prefetch from config file: {}".format(self.prefetchCount))
+        logging.info("Loaded resampling time step from config file: {} s".format(self.resampleStep))
+        logging.info("Loaded quantities from config file: {}".format(', '.join(self.quantities)))
+        logging.info("Loaded rolling window from config file: {} s, {}".format(self.window, self.windowStatistic))
+        logging.info("Loaded gradient groups from config file: {}".format(evaAnalysis.formatGroups(self.gradientGroups)))
+
+
+    def setWindow(self, setting):
+        """ Sets rolling window and statistic from a setting like '5400, mean'. Returns whether the setting was valid. """
+        words = [w.strip() for w in setting.split(',')]
+        try:
+            window = float(words[0]) if words[0] else 0
+        except ValueError:
+            logging.error("Could not read rolling window {}. No rolling window will be shown.".format(setting))
+            return False
+        statistic = words[1] if len(words) > 1 and words[1] else 'mean'
+        if statistic not in evaAnalysis.WINDOW_STATISTICS:
+            logging.error("Unknown rolling window statistic {}, use one of {}.".format(statistic, ', '.join(evaAnalysis.WINDOW_STATISTICS)))
+            return False
+        self.window = window
+        self.windowStatistic = statistic
+        return True
 
 
     def showCaseOptions(self):
-        """ Opens message box showing case options with descriptions. """
-        QtWidgets.QMessageBox.about(self, "Case options", self.caseOptions)
+        """ Opens message box showing case options with descriptions and the available case combinations. """
+        self.updateCaseIndex()
+        available = '\n\nAvailable cases in {}:\n{}'.format(self.parentPath, ', '.join(self.caseIndex.combs()))
+        QtWidgets.QMessageBox.about(self, "Case options", self.caseOptions + available)
+
+
+    def updateCaseIndex(self, rebuild=False):
+        """ Updates the index of available cases and the autocompletion of the case input. """
+        if rebuild or not hasattr(self, 'caseIndex'):
+            self.caseIndex = evaIndex.CaseIndex(self.parentPath)
+        else:
+            self.caseIndex.refresh()
+        self.caseCompleterModel.setStringList(self.caseIndex.combs())
+
+
+    def previewCase(self, text):
+        """ Shows an overview of the output file of the case entered so far in the status bar, without reading the case. """
+        comb = str(text).strip()
+        if comb not in self.caseIndex:
+            self.statusBar().clearMessage()
+            return
+        info = self.caseIndex.header(comb)
+        if info is not None:
+            self.statusBar().showMessage('Case {}   {}'.format(comb, evaData.describeHeader(info)))
 
 
     def loadFile(self):
         """ Loads an ESATAN output file to be searched for temperature data to be evaluated. """
-        self.filePath, ok  = QtWidgets.QFileDialog.getOpenFileName(self, caption='Load file', filter='ESATAN output files (*.out)')
-        if ok: self.fileLoaded = True
+        self.filePath, ok  = QtWidgets.QFileDialog.getOpenFileName(self, caption='Load file', filter='ESATAN output files (*.out *.out.gz *.out.xz *.out.bz2)')
+        if ok:
+            self.fileLoaded = True
+            try:
+                self.statusBar().showMessage('{}   {}'.format(os.path.basename(self.filePath), evaData.describeHeader(evaData.scanHeader(self.filePath))))
+            except (OSError, EOFError, ValueError, IndexError):
+                logging.exception("Could not scan output file {}".format(self.filePath))
 
         # Create new canvas and plots
         self.createxPlot()
@@ -192,8 +322,11 @@ class ApplicationWindow(QMainWindow, Ui_MainWindow):
         self.close()
 
 
+    @evaProfile.profiled('updatexPlot', caseOf=lambda gui: getattr(getattr(gui, 'xPlot', None), 'caseComb', None))
     def updatexPlot(self):
-        # Update plots and draw them
+        # Update plots and draw them, there is nothing to update once the workspace is empty
+        if not hasattr(self, 'xPlot'):
+            return
         QtWidgets.QApplication.setOverrideCursor(Qt.WaitCursor)
         self.selectedComps = sorted([str(x.text()) for x in self.compSelection.selectedItems()])
         self.xPlot.fixZoom = self.menuFixZoom.isChecked()
@@ -204,49 +337,36 @@ class ApplicationWindow(QMainWindow, Ui_MainWindow):
         QtWidgets.QApplication.restoreOverrideCursor()
 
 
+    @evaProfile.profiled('createxPlot')
     def createxPlot(self):
-        """ Removes old canvas and creates new one when new output file is being loaded. """
+        """ 
+        Shows the case entered in the GUI or the output file loaded manually.
+        Cases that are still in the workspace are shown right away, other
+        cases are read and get a new canvas and tab.
+        """
         logging.info("Updating plot")
         QtWidgets.QApplication.setOverrideCursor(Qt.WaitCursor)
-        # If canvas already exists, delete it
-        try:
-            self.xPlotLayout.removeWidget(self.xPlotCanvas)
-            self.xPlotCanvas.close()
-        except:
-            logging.warning("plot canvas could not be cleared")
-            pass
+        self.closeHeatmap()
         
         self.selectedComps = sorted([str(x.text()) for x in self.compSelection.selectedItems()])
         
         # Read case from GUI line input only if file not loaded manually
         if not self.fileLoaded:
-            self.caseComb = self.caseEdit.text()
-        else: self.caseComb = None
-
-        # Create new plot and canvas
-        self.xPlot = Case(self, self.caseComb)
-        # If case was not properly set up (e.g. caseComb was incorrect)
-        if not hasattr(self.xPlot, 'canvas'):
-            return
-        self.xPlotCanvas = self.xPlot.canvas
-        self.xPlotLayout.addWidget(self.xPlotCanvas)
-
-        # Add margins for xaxis labels
-        self.xPlot.fig.subplots_adjust(bottom=0.15)
-        
-        # Add available components to QList
-        self.compSelection.addItems(self.xPlot.components)
-
-        # If no item is selected, select first in list
-        if len(self.compSelection.selectedItems()) == 0:
-            self.compSelection.setCurrentRow(0)
+            self.caseComb = str(self.caseEdit.text()).strip()
+            key = self.caseComb
+        else: 
+            self.caseComb = None
+            key = self.filePath
+
+        # Create new plot and canvas if case is not in the workspace
+        if key not in self.cases:
+            case = Case(self, self.caseComb)
+            # If case was not properly set up (e.g. caseComb was incorrect)
+            if not hasattr(case, 'canvas'):
+                return
+            self.addCase(key, case)
 
-        # Add Toolbar functionality
-        self.toolbar = NavigationToolbar(self.xPlotCanvas, self)
-        self.toolbar.hide()
-        self.buttonRestore.clicked.connect(self.toolbar.home)
-        self.buttonZoom.clicked.connect(self.toolbar.zoom)
-        self.buttonPan.clicked.connect(self.toolbar.pan)
+        self.showCase(key)
 
         # Unbind previous case from save menu action
         try: 
@@ -261,12 +381,358 @@ class ApplicationWindow(QMainWindow, Ui_MainWindow):
             pass
         self.menuFileSaveAs_2.triggered.connect(self.savePlot)
 
+        try: 
+            self.menuFileExportSeries.triggered.disconnect()
+        except Exception: 
+            pass
+        self.menuFileExportSeries.triggered.connect(self.exportSeries)
+
         # Enable the user to enter case combinations again
         self.fileLoaded = False
 
         QtWidgets.QApplication.restoreOverrideCursor()
 
 
+    def addCase(self, key, case):
+        """ Adds a newly read case to the workspace and gives it a tab. """
+        # Add margins for xaxis labels
+        case.fig.subplots_adjust(bottom=0.15)
+
+        # Every canvas has its own (hidden) toolbar providing zoom and pan
+        case.toolbar = NavigationToolbar(case.canvas, self)
+        case.toolbar.hide()
+
+        case.canvas.hide()
+        self.xPlotLayout.addWidget(case.canvas)
+
+        label = 'Case {}'.format(case.caseComb) if case.caseComb is not None else os.path.basename(key)
+        self.caseTabs.blockSignals(True)
+        index = self.caseTabs.addTab(label)
+        self.caseTabs.setTabData(index, key)
+        self.caseTabs.setTabToolTip(index, key)
+        self.caseTabs.blockSignals(False)
+
+        # Might evict least recently used cases
+        self.cases.put(key, case)
+
+
+    def showCase(self, key):
+        """ Makes the case <key> from the workspace the current one. """
+        self.closeHeatmap()
+        if hasattr(self, 'xPlotCanvas'):
+            self.xPlotCanvas.hide()
+
+        self.xPlot = self.cases.get(key)
+        self.xPlotCanvas = self.xPlot.canvas
+        self.xPlotCanvas.show()
+
+        self.caseTabs.blockSignals(True)
+        self.caseTabs.setCurrentIndex(self.caseTabIndex(key))
+        self.caseTabs.blockSignals(False)
+        
+        # Add available components to QList, keeping the current selection
+        self.compSelection.blockSignals(True)
+        self.compSelection.clear()
+        self.compSelection.addItems(self.xPlot.components)
+        for i in range(self.compSelection.count()):
+            item = self.compSelection.item(i)
+            item.setSelected(str(item.text()) in self.selectedComps)
+
+        # If no item is selected, select first in list
+        if len(self.compSelection.selectedItems()) == 0:
+            self.compSelection.setCurrentRow(0)
+        self.compSelection.blockSignals(False)
+
+        self.updateSubmodelMenu()
+        self.updateQuantityMenu()
+
+        # Connect toolbar buttons to the toolbar of this canvas
+        for button, action in ((self.buttonRestore, self.xPlot.toolbar.home), (self.buttonZoom, self.xPlot.toolbar.zoom), (self.buttonPan, self.xPlot.toolbar.pan)):
+            try: 
+                button.clicked.disconnect()
+            except Exception: 
+                pass
+            button.clicked.connect(action)
+
+        self.updatexPlot()
+
+        # Keep showing the heatmap if it was active for the previous case
+        if self.menuViewHeatmap.isChecked():
+            self.toggleHeatmap()
+
+        # Remember case for prefetching
+        if self.xPlot.caseComb is not None:
+            comb = str(self.xPlot.caseComb)
+            if comb in self.recentCombs:
+                self.recentCombs.remove(comb)
+            self.recentCombs.append(comb)
+            del self.recentCombs[:-10]
+
+        # Start prefetching once the GUI is idle again
+        QTimer.singleShot(0, self.prefetchCases)
+
+
+    def updateSubmodelMenu(self):
+        """ Lists the submodels of the current case in the submodel menu, the selected one checked. """
+        self.menuSubmodel.clear()
+        group = QtWidgets.QActionGroup(self.menuSubmodel)
+        for submodel in self.xPlot.data.submodels:
+            action = self.menuSubmodel.addAction(submodel)
+            action.setCheckable(True)
+            action.setChecked(submodel == self.xPlot.data.submodel)
+            action.setActionGroup(group)
+            action.triggered.connect(lambda checked, submodel=submodel: self.selectSubmodel(submodel))
+        self.menuSubmodel.setEnabled(len(self.xPlot.data.submodels) > 1)
+
+
+    def updateQuantityMenu(self):
+        """ Lists the quantities read for the selected submodel in the quantity menu, the selected one checked. """
+        self.menuQuantity.clear()
+        group = QtWidgets.QActionGroup(self.menuQuantity)
+        quantities = self.xPlot.data.quantitiesOf(self.xPlot.data.submodel)
+        for quantity in quantities:
+            action = self.menuQuantity.addAction('{} ({})'.format(quantity, evaPlot.quantityName(quantity)))
+            action.setCheckable(True)
+            action.setChecked(quantity == self.xPlot.data.quantity)
+            action.setActionGroup(group)
+            action.triggered.connect(lambda checked, quantity=quantity: self.selectQuantity(quantity))
+        self.menuQuantity.setEnabled(len(quantities) > 1)
+
+
+    def selectSubmodel(self, submodel):
+        """ Shows the results of another submodel of the current case, without reading the file again. """
+        if submodel == self.xPlot.data.submodel:
+            return
+        QtWidgets.QApplication.setOverrideCursor(Qt.WaitCursor)
+        self.xPlot.selectResults(submodel=submodel)
+        self.showCase(self.caseTabs.tabData(self.caseTabs.currentIndex()))
+        QtWidgets.QApplication.restoreOverrideCursor()
+
+
+    def selectQuantity(self, quantity):
+        """ Shows another quantity of the current case, without reading the file again. """
+        if quantity == self.xPlot.data.quantity:
+            return
+        QtWidgets.QApplication.setOverrideCursor(Qt.WaitCursor)
+        self.xPlot.selectResults(quantity=quantity)
+        self.showCase(self.caseTabs.tabData(self.caseTabs.currentIndex()))
+        QtWidgets.QApplication.restoreOverrideCursor()
+
+
+    def predictCases(self):
+        """ 
+        Guesses which cases will be opened next: the current combination with 
+        one digit changed to a neighbouring option, orientation first, then 
+        recently used cases that are not in the workspace anymore. Returns 
+        the paths of the output files of existing cases, most likely first.
+        """
+        comb = str(self.xPlot.caseComb)
+        candidates = []
+        if len(comb) == 3 and comb.isdigit():
+            options = (self.OptSets, self.powBud, self.orient)
+            for step in (1, -1, 2, -2):
+                for pos in (2, 1, 0):
+                    value = int(comb[pos]) + step
+                    if value in options[pos]:
+                        candidates.append(comb[:pos] + str(value) + comb[pos+1:])
+        candidates += reversed(self.recentCombs)
+
+        filePaths = []
+        for candidate in candidates:
+            if candidate == comb or candidate in self.cases or candidate not in self.caseIndex:
+                continue
+            filePath = self.caseIndex.filePath(candidate)
+            if filePath not in filePaths:
+                filePaths.append(filePath)
+            if len(filePaths) >= self.prefetchCount:
+                break
+        return filePaths
+
+
+    def prefetchCases(self):
+        """ Hands the predicted cases to the prefetcher. """
+        if self.prefetchCount > 0 and hasattr(self, 'xPlot'):
+            self.prefetcher.schedule(self.predictCases())
+
+
+    def caseReader(self):
+        """ 
+        Returns a function reading an output file with the current filter and
+        resampling settings. It does not touch any widgets and can be pickled,
+        so the prefetcher calls it in a separate process.
+        """
+        return functools.partial(evaData.readCase, thresholds=self.filterThresholds(), ignoreValues=list(self.ignoreValues), quantities=list(self.quantities), resampleStep=self.resampleStep)
+
+
+    def readCase(self, filePath):
+        """ Reads an output file with the current filter and resampling settings. """
+        return self.caseReader()(filePath)
+
+
+    def filterThresholds(self):
+        """ Returns the thresholds as (lower, upper) tuple. Without two valid values no thresholds are applied. """
+        try:
+            thresholds = sorted(float(v) for v in self.thresholds if v is not None)
+        except ValueError:
+            logging.error("Invalid threshold values {}. No filtering will be done.".format(self.thresholds))
+            return (None, None)
+        if len(thresholds) != 2:
+            return (None, None)
+        return tuple(thresholds)
+
+
+    def caseTabIndex(self, key):
+        """ Returns the index of the tab belonging to case <key>, or -1. """
+        for index in range(self.caseTabs.count()):
+            if self.caseTabs.tabData(index) == key:
+                return index
+        return -1
+
+
+    def switchCase(self, index):
+        """ Shows the case whose tab was selected. """
+        key = self.caseTabs.tabData(index)
+        if key is not None and key in self.cases:
+            self.selectedComps = sorted([str(x.text()) for x in self.compSelection.selectedItems()])
+            self.showCase(key)
+
+
+    def closeCase(self, index):
+        """ Removes the case whose tab was closed from the workspace. """
+        key = self.caseTabs.tabData(index)
+        case = self.cases.pop(key)
+        if case is not None:
+            self.removeCase(key, case)
+
+        # Show the most recently used case if the current one was closed
+        if not hasattr(self, 'xPlot') and len(self.cases):
+            self.selectedComps = sorted([str(x.text()) for x in self.compSelection.selectedItems()])
+            self.showCase(self.cases.keys()[-1])
+        elif not len(self.cases):
+            self.clearSelection()
+
+
+    def clearSelection(self):
+        """ Empties the component list and the statistics table once no case is left to show. """
+        self.compSelection.blockSignals(True)
+        self.compSelection.clear()
+        self.compSelection.blockSignals(False)
+        self.tempStatTable.setRowCount(0)
+
+
+    def removeCase(self, key, case):
+        """ Deletes tab and canvas of a case that was removed from the workspace. """
+        if case is getattr(self, 'xPlot', None):
+            self.closeHeatmap()
+        self.caseTabs.blockSignals(True)
+        self.caseTabs.removeTab(self.caseTabIndex(key))
+        self.caseTabs.blockSignals(False)
+        self.xPlotLayout.removeWidget(case.canvas)
+        case.canvas.close()
+        if case is getattr(self, 'xPlot', None):
+            del self.xPlot, self.xPlotCanvas
+
+
+    def clearCases(self):
+        """ Empties the workspace, e.g. because the data has to be read again with different settings. """
+        self.cases.clear()
+        self.prefetcher.clear(self.caseReader())
+
+
+    def toggleHeatmap(self):
+        """ Switches between the line view of the selected components and the heatmap of all components. """
+        self.closeHeatmap()
+        if not self.menuViewHeatmap.isChecked():
+            return
+        # Heatmap needs a properly set up case
+        if not hasattr(self, 'xPlot') or not hasattr(self.xPlot, 'canvas'):
+            self.menuViewHeatmap.setChecked(False)
+            return
+
+        QtWidgets.QApplication.setOverrideCursor(Qt.WaitCursor)
+        key = 'Tmin' if self.menuViewHeatmapTmin.isChecked() else 'Tmax'
+        self.heatmap = Heatmap(self.xPlot, key)
+        self.xPlotCanvas.hide()
+        self.xPlotLayout.addWidget(self.heatmap.canvas)
+        QtWidgets.QApplication.restoreOverrideCursor()
+
+
+    def closeHeatmap(self):
+        """ Removes the heatmap canvas, if there is one, and shows the line view again. """
+        if not hasattr(self, 'heatmap'):
+            return
+        self.xPlotLayout.removeWidget(self.heatmap.canvas)
+        self.heatmap.canvas.close()
+        del self.heatmap
+        self.statusBar().clearMessage()
+        try:
+            self.xPlotCanvas.show()
+        except AttributeError:
+            pass
+
+
+    def showDiff(self):
+        """ Asks for a second case and opens a window showing the current case minus that case. """
+        if not hasattr(self, 'xPlot'):
+            return
+        other, ok = QtWidgets.QInputDialog.getText(self, 'Case difference', 'Show differences of the current case minus case:')
+        other = str(other).strip()
+        if not ok or other == '':
+            return
+        if other not in self.caseIndex:
+            self.updateCaseIndex()
+        if other not in self.caseIndex:
+            QtWidgets.QMessageBox.warning(self, 'Unknown case combination', 'Case {} could not be found in {}.'.format(other, self.parentPath))
+            return
+
+        QtWidgets.QApplication.setOverrideCursor(Qt.WaitCursor)
+        time, Tmax, Tmin = self.xPlot.seriesMatrix()
+        current = evaAnalysis.Series(time, self.xPlot.components, Tmax, Tmin, self.xPlot.caseComb)
+        submodel, quantity = self.xPlot.data.submodel, self.xPlot.data.quantity
+        # Take the other case from the workspace if it is loaded already,
+        # otherwise read it with the settings of the current case
+        if other in self.cases:
+            otherData = self.cases.get(other).data
+        else:
+            otherData = self.readCase(self.caseIndex.filePath(other))
+        # Compare the same results, the tab of the other case keeps showing its own
+        selected = (otherData.submodel, otherData.quantity)
+        try:
+            otherData.select(submodel, quantity)
+        except KeyError:
+            QtWidgets.QApplication.restoreOverrideCursor()
+            QtWidgets.QMessageBox.warning(self, 'Case difference', 'Case {} has no {} data of submodel {}.'.format(other, quantity, submodel))
+            return
+        try:
+            otherSeries = evaAnalysis.Series(otherData.time, otherData.components, otherData.Tmax, otherData.Tmin, other)
+            diff = evaAnalysis.CaseDiff(current, otherSeries)
+        finally:
+            otherData.select(*selected)
+        self.diffWindow = DiffWindow(self, diff, quantity)
+        self.diffWindow.show()
+        QtWidgets.QApplication.restoreOverrideCursor()
+
+
+    def showGradients(self):
+        """ Opens a window showing the temperature differences within the gradient groups for the current case. """
+        if not hasattr(self, 'xPlot'):
+            return
+        if not self.gradientGroups:
+            self.editGradients()
+            if not self.gradientGroups:
+                return
+        if self.xPlot.data.quantity != 'T':
+            QtWidgets.QMessageBox.warning(self, 'Temperature gradients', 'Gradients are computed from temperatures, select the quantity T first.')
+            return
+
+        QtWidgets.QApplication.setOverrideCursor(Qt.WaitCursor)
+        time, Tmax, Tmin = self.xPlot.seriesMatrix()
+        current = evaAnalysis.Series(time, self.xPlot.components, Tmax, Tmin, self.xPlot.caseComb)
+        self.gradientWindow = GradientWindow(self, evaAnalysis.Gradients(current, self.gradientGroups))
+        self.gradientWindow.show()
+        QtWidgets.QApplication.restoreOverrideCursor()
+
+
     def savePlot(self):
         """ Opens save file dialog for saving current plot. """
         fileName, ok = str(QtWidgets.QFileDialog.getSaveFileName(self, 'Save Figure', filter='PNG files (*.png)'))
@@ -294,6 +760,24 @@ class ApplicationWindow(QMainWindow, Ui_MainWindow):
             logging.error("Extrema not saved: empty string is not a valid file name")
 
 
+    def exportSeries(self):
+        """ Opens save file dialog for exporting the complete Tmax/Tmin time series of all components for current case. """
+        fileName, fileFilter = QtWidgets.QFileDialog.getSaveFileName(self, 'Export Time Series', filter='Compressed NumPy archive (*.npz);;CSV files (*.csv)')
+        fileName = str(fileName)
+        if fileName != '': 
+            # Add extension of selected filter if the user didn't type one
+            if not fileName.endswith(('.npz', '.csv')):
+                fileName += '.csv' if 'csv' in fileFilter else '.npz'
+            QtWidgets.QApplication.setOverrideCursor(Qt.WaitCursor)
+            try: 
+                self.xPlot.exportSeries(fileName)
+            except Exception:
+                logging.error("Could not export time series")
+            QtWidgets.QApplication.restoreOverrideCursor()
+        else:
+            logging.error("Time series not exported: empty string is not a valid file name")
+
+
     def editThresholds(self):
         """ Opens dialog with which the user can change certain parts of the config file. """
         newSet = False
@@ -318,7 +802,8 @@ class ApplicationWindow(QMainWindow, Ui_MainWindow):
             with open('config.txt', 'w') as f:
                 f.writelines(content)
 
-            self.thresholds = newSetting.split(',')
+            self.thresholds = [v for v in newSetting.split(',') if v.strip() != '']
+            self.clearCases()
             self.createxPlot()
 
 
@@ -346,10 +831,80 @@ class ApplicationWindow(QMainWindow, Ui_MainWindow):
             with open('config.txt', 'w') as f:
                 f.writelines(content)
 
-            self.ignoreValues = newSetting.split(',')
+            try:
+                self.ignoreValues = [float(v) for v in newSetting.split(',') if v.strip() != '']
+            except ValueError:
+                logging.error("Could not read ignore values {}. No temperature values will be ignored.".format(newSetting))
+                self.ignoreValues = []
+            self.clearCases()
             self.createxPlot()
 
 
+    def editWindow(self):
+        """ Opens dialog with which the user can change the rolling window shown next to the curves. """
+        newSet = False
+        newSetting, ok = QtWidgets.QInputDialog.getText(self, 'Change Rolling Window', 'Rolling window in seconds and statistic (mean, min or max), e.g. 5400, mean. 0 disables it.', text='{:g}, {}'.format(self.window, self.windowStatistic))
+
+        if not ok or not self.setWindow(newSetting):
+            return
+
+        with open('config.txt', 'r') as f:
+            content = f.readlines()
+
+        # Search for affected line and replace it with the new value
+        for key, line in enumerate(content):
+            if not line.startswith('#') and any(w in line for w in ('window','Window','WINDOW')):
+                content[key] = 'window={}\n'.format(newSetting)
+                newSet = True
+                break
+
+        # In case the setting didn't exist before, just append it
+        if newSet == False:
+            content.append('\nwindow={}'.format(newSetting))
+
+        # Replace file with changed contents
+        with open('config.txt', 'w') as f:
+            f.writelines(content)
+
+        # The data is unchanged, only the curves are drawn again
+        for key in self.cases.keys():
+            self.cases.get(key).clearPlots()
+        if hasattr(self, 'xPlot'):
+            self.showCase(self.caseTabs.tabData(self.caseTabs.currentIndex()))
+
+
+    def editGradients(self):
+        """ Opens dialog with which the user can change the groups of components whose temperature differences are analysed. """
+        newSet = False
+        newSetting, ok = QtWidgets.QInputDialog.getText(self, 'Change Gradient Groups', 'Groups of components separated by semicolons, their components by commas, e.g. battery_board1, battery_board2; PC104_1, PC104_2', text=evaAnalysis.formatGroups(self.gradientGroups))
+        if not ok:
+            return
+        self.gradientGroups = evaAnalysis.parseGroups(str(newSetting))
+        newSetting = evaAnalysis.formatGroups(self.gradientGroups)
+
+        with open('config.txt', 'r') as f:
+            content = f.readlines()
+
+        # Search for affected line and replace it with the new value
+        for key, line in enumerate(content):
+            if not line.startswith('#') and any(w in line for w in ('gradients','Gradients','GRADIENTS')):
+                content[key] = 'gradients={}\n'.format(newSetting)
+                newSet = True
+                break
+
+        # In case the setting didn't exist before, just append it
+        if newSet == False:
+            content.append('\ngradients={}'.format(newSetting))
+
+        # Replace file with changed contents
+        with open('config.txt', 'w') as f:
+            f.writelines(content)
+
+        # Show the new groups if gradients are shown already
+        if hasattr(self, 'gradientWindow') and self.gradientWindow.isVisible():
+            self.showGradients()
+
+
     def changeCfg(self):
         """ Opens dialog with which the user can change certain parts of the config file. """
         newSet = False
@@ -375,6 +930,8 @@ class ApplicationWindow(QMainWindow, Ui_MainWindow):
                 f.writelines(content)
 
             self.parentPath = newSetting
+            self.updateCaseIndex(rebuild=True)
+            self.clearCases()
             self.createxPlot()
 
 
@@ -403,12 +960,13 @@ class Case():
         self.visiblePlots = []
         self.handles = []
         self.labels = []
-
-        # If thresholds contains a None, sorting will return None
-        if self.gui.thresholds.sort() == None:
-            self.thresholds = self.gui.thresholds
-        else:
-            self.thresholds = self.gui.thresholds.sort()
+        self.legendBoxes = []
+        self.pointerOverLegend = False
+        self.hoverIndex = None
+        self.rolled = None
+        self.rolledPyramid = None
+        self.timeRange = {}
+        self.background = None
 
         # If no file has been specified, take caseComb from GUI and search in default folder
         if not self.fileLoaded:
@@ -428,9 +986,7 @@ class Case():
         else: pass
 
         # Create color map with one color for each component
-        self.colors= {}
-        for color, comp in zip(cm.gist_rainbow(np.linspace(0,1,len(self.data))), self.data.keys()):
-            self.colors[comp] = color
+        self.colors = evaPlot.componentColors(self.components)
 
         # Create figure and canvas
         self.fig = Figure()
@@ -438,22 +994,25 @@ class Case():
         self.extrAxes = self.fig.add_subplot(122)
         self.canvas = FigureCanvas(self.fig)
 
-        # Set figure title based on if case was specified or file was loaded
-        if not self.fileLoaded:
-            figTitle = "Maximum and minimum temperatures - Case {}".format(self.caseComb)
-        else:
-            if self .getModel():
-                figTitle = "Maximum and minimum temperatures - Model {}".format(self.model)
-            else:
-                figTitle = "Maximum and minimum temperatures"
+        self.updateTitle()
 
-        self.fig.suptitle(figTitle)
+        evaPlot.setupAxes(self.tempAxes, self.extrAxes, self.data.quantity)
 
-        self.tempAxes.set_title("Temporal Evolution of Hottest and Coldest Points")
-        self.tempAxes.set_xlabel("Time [s]")
-        self.tempAxes.set_ylabel("Temperature [$^\circ$C]") 
-        
-        self.extrAxes.set_title("Absolute Extrema in Time and Space")
+        # Crosshair at the sample nearest to the mouse. The artists are
+        # animated, i.e. only drawn on top of the saved background.
+        crossStyle = {'color': 'gray', 'lw': 0.8, 'ls': '--', 'animated': True, 'visible': False}
+        self.crossV = Line2D([0, 0], [0, 1], transform=self.tempAxes.get_xaxis_transform(), **crossStyle)
+        self.crossH = Line2D([0, 1], [0, 0], transform=self.tempAxes.get_yaxis_transform(), **crossStyle)
+        self.crossPoint = Line2D([0], [0], marker='o', color='k', ms=6, animated=True, visible=False)
+        for artist in (self.crossV, self.crossH, self.crossPoint):
+            self.tempAxes.add_artist(artist)
+
+        # Connect the mouse events once for the lifetime of the canvas
+        self.canvas.mpl_connect('pick_event', self.changeColor)
+        self.canvas.mpl_connect('motion_notify_event', self.onMotion)
+        self.canvas.mpl_connect('axes_leave_event', self.hideCrosshair)
+        self.canvas.mpl_connect('draw_event', self.saveBackground)
+        self.tempAxes.callbacks.connect('xlim_changed', self.refreshCurves)
         
         self.updateTemps()
         self.updateExtrema()
@@ -462,35 +1021,65 @@ class Case():
         self.showTempStats()
 
 
-    def getModel(self):
-        """ Tries to find the model name for the loaded ESATAN file by searching a line with the word 'submodel' in it. """
-        with open(self.filePath) as f:
-            for line in f:
-                words = line.split()
-                if 'submodel' in words:
-                    try:
-                        self.model = words[ words.index('submodel') + 1 ]
-                        return True
-                    except IndexError:
-                        # Model name could not be found next to flag word
-                        return False
+    def updateTitle(self):
+        """ Sets the figure title based on if case was specified or file was loaded, naming the submodel if there are several. """
+        quantity = evaPlot.quantityName(self.data.quantity, plural=True)
+        if not self.fileLoaded:
+            figTitle = "Maximum and minimum {} - Case {}".format(quantity, self.caseComb)
+        elif self.data.model is not None:
+            figTitle = "Maximum and minimum {} - Model {}".format(quantity, self.data.model)
+        else:
+            figTitle = "Maximum and minimum {}".format(quantity)
+        if len(self.data.submodels) > 1:
+            figTitle += " - Submodel {}".format(self.data.submodel)
+
+        self.figTitle = figTitle
+        self.fig.suptitle(figTitle)
+
 
-        # If no model name could be found, return False
-        return False
+    def selectResults(self, submodel=None, quantity=None):
+        """ Switches to the results of another submodel or quantity, see evaData.CaseData.select. All plots are removed and drawn again on the next update. """
+        self.data.select(submodel, quantity)
+        self.extrema = self.data.extrema
+        self.components = self.data.components
+        self.colors = evaPlot.componentColors(self.components)
+        self.clearPlots()
+        self.updateTitle()
+        self.tempAxes.set_ylabel(evaPlot.quantityLabel(self.data.quantity))
+
+
+    def clearPlots(self):
+        """ Removes all temperature plots, they are drawn again on the next update. """
+        for plots in self.plots.values():
+            for plot in plots.values():
+                plot.remove()
+        self.plots = {}
+        self.visiblePlots = []
+        self.handles = []
+        self.labels = []
+        self.hoverIndex = None
+        self.rolled = None
+        self.rolledPyramid = None
+        self.timeRange = {}
 
 
     def showCombError(self):
         """ Shows error message box if output directory for specified case selection could not be found. """
         msg = QtWidgets.QMessageBox()
-        msg.setText('{} is not a valid path or doesn\'t contain an appropriate output file (MOVE_II_.out). The case seems to not exists, try another combination.'.format(self.path))
+        msg.setText('{} is not a valid path or doesn\'t contain an appropriate output file (MOVE_II_.out, possibly compressed). The case seems to not exists, try another combination.'.format(self.path))
         msg.setWindowTitle('Unknown case combination')
         msg.exec_()
 
     
     def checkComb(self):
-        """ Checks if output directory and file for specified case selection exist. """
-        if os.path.isdir(self.path) and os.path.isfile(self.path + '/MOVE_II_.out'):
-            self.filePath = self.path + '/MOVE_II_.out'
+        """ Checks in the case index if output directory and file for specified case selection exist. """
+        # The case might have been added since the last index update
+        if self.caseComb not in self.gui.caseIndex:
+            self.gui.updateCaseIndex()
+        caseIndex = self.gui.caseIndex
+        if self.caseComb in caseIndex:
+            self.path = caseIndex.cases[str(self.caseComb)]['path']
+            self.filePath = caseIndex.filePath(self.caseComb)
             return 1    
         else:
             self.showCombError()
@@ -498,102 +1087,31 @@ class Case():
             return 0
 
 
+    @evaProfile.profiled('fetchTemp')
     def fetchTemp(self):
-        """ Retrieves temperature data from ESATAN output file. """
-        timestep = 0
-        self.data = {}
-        self.extrema = {}
-        self.components = []
-        self.time = []
-        lowerLim, upperLim = self.thresholds
-        logging.info("Ignoring values smaller than {} and higher than {}".format(lowerLim, upperLim))
-        
-        # This check might not be necessary
-        if not os.path.isfile(self.filePath):
-            logging.critical("Output file could not be found")
-            return
+        """ Takes the temperature data of this case from the prefetched cases or reads it from the ESATAN output file. """
+        self.data = self.gui.prefetcher.take(self.filePath)
+        if self.data is None:
+            self.data = self.gui.readCase(self.filePath)
+        else:
+            logging.info("Using prefetched data of {}".format(self.filePath))
+        self.extrema = self.data.extrema
+        self.components = self.data.components
+
+
+    def seriesMatrix(self):
+        """ 
+        Returns the sorted time array and the Tmax and Tmin of all components 
+        as arrays of shape (components, times). Entries without data are NaN.
+        """
+        return self.data.time, self.data.Tmax, self.data.Tmin
+
+
+    def nbytes(self):
+        """ Estimates the memory held by this case in bytes: the data arrays and the RGBA buffer of the canvas. """
+        width, height = self.canvas.get_width_height()
+        return self.data.nbytes() + width * height * 4
 
-        # Open ESATAN file
-        logging.info('Reading temperature data from ESATAN logfile {}'.format(self.filePath))
-        with open(self.filePath) as logFile:
-            lines = logFile.readlines()    
-
-        # Scan all lines
-        for i,line in enumerate(lines):
-            # Search for timestamp
-            if 'TIMEN' in line:
-                time = float(line.split()[2])
-                self.time.append(time)
-
-            # Search for temperature data paragraph
-            if '+MOVE' in line:
-                # This if is necessary because in some files the data following the +MOVE flag is not temperature data
-                if lines[i+3].split()[2] == 'T':
-                    for l in lines[i+6:]:        #skip subheader
-                        # Break at end of paragraph
-                        if not l.strip():
-                            break
-                        else:
-                            lWords = l.split()
-                            comp = lWords[1]
-                            try:
-                                temp = float(lWords[2])
-                            except Exception:
-                                logging.error("Temperature value seems to be faulty: {}".format(lWords[2]))
-                                break
-
-                            ## If this temperature doesn't pass a filter, set it to NaN
-                            #if upperLim != None and temp > upperLim: 
-                            #    logging.info("Filtered too high value {}".format(temp))
-                            #    break
-                            #    #temp = np.NaN
-                            #if lowerLim != None and temp < lowerLim: 
-                            #    logging.info("Filtered too low value {}".format(temp))
-                            #    break
-                            #    #temp = np.NaN
-                            #if temp in self.ignoreValues: 
-                            #    logging.info("Filtered ignored value")
-                            #    break
-                            #    #temp = np.NaN
-
-                            # Create new keys if necessary
-                            if comp not in self.data.keys():
-                                self.components.append(comp)
-                                self.data[comp] = {}
-                            if comp not in self.extrema.keys():
-                                self.extrema[comp] = {}
-                                self.extrema[comp]['glob_max'] = (0.0,-9999)
-                                self.extrema[comp]['glob_min'] = (0.0,9999)
-                            if time not in self.data[comp].keys():
-                                self.data[comp][time] = {}
-                                self.data[comp][time]['Tmax'] = -9999
-                                self.data[comp][time]['Tmin'] = 9999 
-                        
-                            # See if this temperature is a global extremum
-                            if temp > self.extrema[comp]['glob_max'][1]:
-                                self.extrema[comp]['glob_max'] = (time,temp)
-                            elif temp < self.extrema[comp]['glob_min'][1]:
-                                self.extrema[comp]['glob_min'] = (time,temp)
-
-                            # Determine extrema at current time
-                            if temp > self.data[comp][time]['Tmax']:
-                                self.data[comp][time]['Tmax'] = temp
-                            elif temp < self.data[comp][time]['Tmin']:
-                                self.data[comp][time]['Tmin'] = temp
-                    
-        # Check if for all times in array:times there are data points.
-        # If filters are activated, that is sometimes not the case.
-        # If there are no data points for a certain time, delete it
-        print "Cleansing time array"
-        print "Time array:\n", self.time
-        for comp in self.data.keys():
-            print "Data keys:\n", self.data[comp].keys()
-            for i, time in enumerate(self.time):
-                if time not in self.data[comp].keys():
-                    print "Removing time", time
-                    self.time.remove(time)
-        print self.time
-    
 
     def saveFig(self, fileName):
         """ Uses pyplot savefig function to save the current plot to a file """
@@ -608,10 +1126,13 @@ class Case():
         # Remove everything from table
         table.setRowCount(0)
 
-        # Add all selected components back
+        # Add all selected components back. Components whose values were all filtered have no extrema.
+        unit = evaPlot.quantityUnit(self.data.quantity)
         for comp in self.selectedComps:
-            ma = str(self.extrema[comp]['glob_max'][1]) + '°C'
-            mi = str(self.extrema[comp]['glob_min'][1]) + '°C'
+            if comp not in self.extrema:
+                continue
+            ma = str(self.extrema[comp]['glob_max'][1]) + unit
+            mi = str(self.extrema[comp]['glob_min'][1]) + unit
             # Add row
             rowPosition = table.rowCount()
             table.insertRow(rowPosition)
@@ -625,7 +1146,10 @@ class Case():
         """ Updates temporal plot based on component selection. """
         self.selectedComps = sorted([str(x.text()) for x in self.gui.compSelection.selectedItems()])
 
-        for comp in self.data.keys():
+        for comp in self.components:
+            # Components whose values were all filtered cannot be plotted
+            if comp not in self.extrema:
+                continue
             # If this component has NOT been plotted and is selected, plot it
             if comp not in self.plots.keys() and comp in self.selectedComps:
                 plots = self.plotTemp(comp)
@@ -633,7 +1157,7 @@ class Case():
 
             # If this component has been plotted and is selected and is hidden, show it
             elif comp in self.plots.keys() and comp in self.selectedComps and not self.get_visible(comp):
-                for key, plot in self.plots[comp].iteritems():
+                for key, plot in self.plots[comp].items():
                     plot.set_visible(True)
                     self.visiblePlots.append(plot)
                     # Add comp back to legend
@@ -643,7 +1167,7 @@ class Case():
 
             # If this component has been plotted and is not selected and is visible, hide it
             elif comp in self.plots.keys() and comp not in self.selectedComps and self.get_visible(comp):
-                for key, plot in self.plots[comp].iteritems():
+                for key, plot in self.plots[comp].items():
                     plot.set_visible(False)
                     self.visiblePlots.remove(plot)
                     # Remove plot from legend
@@ -655,10 +1179,16 @@ class Case():
         # Add legend
         self.drawLegend()
 
+        # The displayed curves changed, the hover index is rebuilt when needed
+        self.hoverIndex = None
+
         # If zoom level is not fixed, rescale axes
         if not self.fixZoom:
             self.autoscale_based_on(self.visiblePlots)
 
+        # Newly shown curves still hold the data of the whole case
+        self.refreshCurves()
+
 
     def drawLegend(self):
         """ Creates the legend for the temporal plot. """
@@ -675,35 +1205,107 @@ class Case():
             for legline in self.templeg.get_lines():
                 legline.set_picker(5)
 
+            # Legend handles are looked up once, not on every mouse move
+            self.legendBoxes = self.templeg.findobj(matplotlib.offsetbox.DrawingArea)
+
         ## Make legend handles pickable
         #for handle in self.templeg.legendHandles:
         #    handle.set_picker(True)
-            
-        self.canvas.mpl_connect('pick_event', self.changeColor)
-        self.canvas.mpl_connect('motion_notify_event', self.changePointer)
 
         
+    def onMotion(self, event):
+        """ Handles mouse moves: changes the pointer over legend handles and shows the temperature under the mouse. """
+        self.changePointer(event)
+        if event.inaxes is self.tempAxes and event.xdata is not None:
+            self.showCrosshair(event)
+
+
     def changePointer(self, event):
-        """ Changes the moise pointer when hovering the mouse over a legend handle. """
-        handleBoxes = self.templeg.findobj(matplotlib.offsetbox.DrawingArea)
+        """ Changes the mouse pointer when hovering the mouse over a legend handle. """
+        over = any(handleBox.contains(event)[0] for handleBox in self.legendBoxes)
+        if over == self.pointerOverLegend:
+            return
+        self.pointerOverLegend = over
+        if over:
+            QtWidgets.QApplication.setOverrideCursor(Qt.SizeAllCursor)
+        else:
+            QtWidgets.QApplication.restoreOverrideCursor()
 
-        for handleBox in handleBoxes:
-            if handleBox.contains(event)[0]:
-                QtWidgets.QApplication.setOverrideCursor(Qt.SizeAllCursor)
-            else:
-                QtWidgets.QApplication.restoreOverrideCursor()
+
+    def buildHoverIndex(self):
+        """ Indexes the temperatures of all displayed curves for nearestSample. Curves are numbered Tmax first, then Tmin. """
+        self.hoverRows = [self.components.index(comp) for comp in self.labels]
+        self.hoverIndex = evaPlot.hoverIndex(np.concatenate([self.data.Tmax[self.hoverRows], self.data.Tmin[self.hoverRows]]))
+
+
+    def nearestSample(self, x, y):
+        """ Returns component, quantity, time and temperature of the displayed sample nearest to (x, y), or None. """
+        if not self.labels:
+            return None
+        if self.hoverIndex is None:
+            self.buildHoverIndex()
+        nearest = evaPlot.nearestSample(self.data.time, self.hoverIndex, x, y)
+        if nearest is None:
+            return None
+        curve, j = nearest
+        time = self.data.time
+        n = len(self.hoverRows)
+        comp = self.components[self.hoverRows[curve % n]]
+        quantity = '{}{}'.format(self.data.quantity, 'max' if curve < n else 'min')
+        return comp, quantity, time[j], (self.data.Tmax if curve < n else self.data.Tmin)[self.hoverRows[curve % n], j]
+
+
+    def showCrosshair(self, event):
+        """ Moves the crosshair to the sample nearest to the mouse and shows its temperature in the status bar. """
+        sample = self.nearestSample(event.xdata, event.ydata)
+        if sample is None or self.background is None:
+            return
+        comp, quantity, time, temp = sample
+        self.crossV.set_xdata([time, time])
+        self.crossH.set_ydata([temp, temp])
+        self.crossPoint.set_data([time], [temp])
+        self.crossPoint.set_color(self.colors[comp])
+
+        # Blit the crosshair onto the saved background instead of redrawing all curves
+        self.canvas.restore_region(self.background)
+        for artist in (self.crossV, self.crossH, self.crossPoint):
+            artist.set_visible(True)
+            self.tempAxes.draw_artist(artist)
+        self.canvas.blit(self.tempAxes.bbox)
+        self.gui.statusBar().showMessage("{}   t = {:g} s   {} = {:.2f} {}".format(comp, time, quantity, temp, evaPlot.quantityUnit(self.data.quantity)))
+
+
+    def hideCrosshair(self, event=None):
+        """ Removes the crosshair when the mouse leaves the temporal plot. """
+        if not self.crossPoint.get_visible():
+            return
+        for artist in (self.crossV, self.crossH, self.crossPoint):
+            artist.set_visible(False)
+        if self.background is not None:
+            self.canvas.restore_region(self.background)
+            self.canvas.blit(self.tempAxes.bbox)
+        self.gui.statusBar().clearMessage()
+
+
+    def saveBackground(self, event):
+        """ Saves the rendered temporal plot after every full redraw, as background for the crosshair. """
+        self.background = self.canvas.copy_from_bbox(self.tempAxes.bbox)
 
 
     def autoscale_based_on(self, lines):
-        """ Autoscales temporal axis based on pyplot 'Line2D' type <lines>. """
+        """ 
+        Autoscales temporal axis to the components with curves among <lines>.
+        The curves only hold the shown part of the series, so the global
+        extrema and the time range of the components are used instead.
+        """
         ymax = -99999; ymin = 99999
         xmax = -99999; xmin = 99999
-        for line in lines:
-            if type(line).__name__ == 'Line2D':
-                ymax = max(ymax,max(line.get_data()[1]))
-                ymin = min(ymin,min(line.get_data()[1]))
-                xmax = max(xmax,max(line.get_data()[0]))
-                xmin = min(xmin,min(line.get_data()[0]))
+        for comp, plots in self.plots.items():
+            if plots['max'] in lines:
+                ymax = max(ymax, self.extrema[comp]['glob_max'][1])
+                ymin = min(ymin, self.extrema[comp]['glob_min'][1])
+                xmin = min(xmin, self.timeRange[comp][0])
+                xmax = max(xmax, self.timeRange[comp][1])
         margin = self.tempMargin
         self.tempAxes.set_ylim([ymin - margin, ymax + margin])
         self.tempAxes.set_xlim([xmin, xmax])
@@ -712,48 +1314,87 @@ class Case():
     def plotTemp(self, comp):
         """ Plots the aquired temperature data against the time for a given component. """
 
-        self.plots[comp] = {}
-        x = []
-        yMax = []
-        yMin = []
         color = self.colors[comp]
 
-        # Create plotable arrays from aquired temperature data
-        for time in self.time:
-            if time in self.data[comp]:
-                x.append(time)
-                yMax.append(self.data[comp][time]['Tmax'])
-                yMin.append(self.data[comp][time]['Tmin'])
+        # Time range in which this component has data
+        i = self.components.index(comp)
+        present = np.flatnonzero(~np.isnan(self.data.Tmax[i]))
+        self.timeRange[comp] = (self.data.time[present[0]], self.data.time[present[-1]])
+
+        # The whole case at screen resolution, refined by refreshCurves for the shown range
+        x, yMax, yMin = self.curveData(self.data.pyramid, i, -np.inf, np.inf)
 
         # Global extrema
         Tmax_glob = self.extrema[comp]['glob_max']
         Tmin_glob = self.extrema[comp]['glob_min']
             
-        # Plot data
-        maxplt, =   self.tempAxes.plot(x,yMax, lw=2, color=color)
-        minplt, =   self.tempAxes.plot(x,yMin, color=color, lw=2)
-        max_glob =  self.tempAxes.scatter(Tmax_glob[0],Tmax_glob[1], marker="^", s=100, color=color)
-        min_glob =  self.tempAxes.scatter(Tmin_glob[0],Tmin_glob[1], marker="v", s=100, color=color)
-        fill =      self.tempAxes.fill_between(x,yMax,yMin,alpha=.5,facecolor=color)
-
-        # Save plots per component so they can be switched on and off later
-        self.plots[comp]['max'] = maxplt
-        self.plots[comp]['min'] = minplt
-        self.plots[comp]['max_glob'] = max_glob
-        self.plots[comp]['min_glob'] = min_glob
-        self.plots[comp]['fill'] = fill
+        # Plot data and save plots per component so they can be switched on and off later
+        self.plots[comp] = evaPlot.plotTemp(self.tempAxes, x, yMax, yMin, Tmax_glob, Tmin_glob, color)
+
+        # Rolling window series next to the raw curves
+        if self.gui.window > 0:
+            self.rollingSeries()
+            x, yMax, yMin = self.curveData(self.rolledPyramid, i, -np.inf, np.inf, dropMissing=False)
+            self.plots[comp].update(evaPlot.plotRolling(self.tempAxes, x, yMax, yMin, color))
 
         # Save one artist per component for populating the legend
-        self.handles.append(maxplt)
+        self.handles.append(self.plots[comp]['max'])
         self.labels.append(comp)
         self.tempAxes.label=comp
 
-        return [maxplt, minplt, max_glob, min_glob, fill]
+        return [self.plots[comp][key] for key in ('max', 'min', 'max_glob', 'min_glob', 'fill', 'roll_max', 'roll_min') if key in self.plots[comp]]
+
+
+    def rollingSeries(self):
+        """ Returns the rolling window series of all components, computed on first use along with their pyramid. """
+        if self.rolled is None:
+            self.rolled = evaAnalysis.rollingSeries(self.data, self.gui.window, self.gui.windowStatistic)
+            self.rolledPyramid = evaData.Pyramid(self.rolled.time, self.rolled.Tmax, self.rolled.Tmin)
+        return self.rolled
+
+
+    def curveData(self, pyramid, i, start, stop, dropMissing=True):
+        """ 
+        Returns time, Tmax and Tmin of component row <i> between <start> and 
+        <stop> from the coarsest level of <pyramid> that resolves the range at 
+        the width of the temporal axes. Times without data are dropped, so 
+        the curves are not interrupted, unless <dropMissing> is unset.
+        """
+        time, Tmax, Tmin = pyramid.view(start, stop, 2 * int(self.tempAxes.bbox.width))
+        if not dropMissing:
+            return time, Tmax[i], Tmin[i]
+        present = ~np.isnan(Tmax[i])
+        return time[present], Tmax[i, present], Tmin[i, present]
+
+
+    def refreshCurves(self, axes=None):
+        """ 
+        Fills the visible curves with the data of the shown time range, at 
+        screen resolution. Runs on every change of the x limits, so zooming 
+        and panning cost the same for any length of the simulation.
+        """
+        start, stop = self.tempAxes.get_xlim()
+        for comp, plots in self.plots.items():
+            if not plots['max'].get_visible():
+                continue
+            i = self.components.index(comp)
+            x, yMax, yMin = self.curveData(self.data.pyramid, i, start, stop)
+            plots['max'].set_data(x, yMax)
+            plots['min'].set_data(x, yMin)
+
+            # The outline of the area is set directly. Adding a new fill would
+            # autoscale the axes from within this callback.
+            plots['fill'].set_verts([np.column_stack((np.concatenate((x, x[::-1])), np.concatenate((yMax, yMin[::-1]))))])
+
+            if 'roll_max' in plots:
+                x, yMax, yMin = self.curveData(self.rolledPyramid, i, start, stop, dropMissing=False)
+                plots['roll_max'].set_data(x, yMax)
+                plots['roll_min'].set_data(x, yMin)
 
 
     def get_visible(self, comp):
         """ Meant to determine visibility of all plots belonging to a component. Has to be a method of a new class Plot or so"""
-        return all([plot.get_visible() for key, plot in self.plots[comp].iteritems()])
+        return all([plot.get_visible() for key, plot in self.plots[comp].items()])
                         
 
     def updateExtrema(self):
@@ -762,98 +1403,37 @@ class Case():
 
         # Plotting all components again proved fast enough and is much
         # easier than retaining previously plotted lines
-        self.extrAxes.clear()
-        self.extrAxes.set_title("Absolute Extrema in Time and Space")
-        self.ticklocs = []
-        self.ticklabels = []
-        for i, comp in enumerate(self.selectedComps):
-            self.plotExtrema(i, comp)
-
-        # Place and name ticks
-        self.extrAxes.set_xticks([loc + self.width/2 for loc in self.ticklocs])
-        self.extrAxes.tick_params(axis='x', which='both', length=0)
-        self.extrAxes.set_xticklabels(self.ticklabels)
-
-        # Add padding to every other ticklabel so they won't overlap
-        for i, tick in enumerate(self.extrAxes.xaxis.get_major_ticks()):
-            if i%2 == 0:
-                tick.set_pad(20)
-
-        # Add values above/below bars
-        bars = self.extrAxes.patches
-        vals = []
-        for bar in bars:
-            if bar.get_y() < 0:
-                vals.append(bar.get_y())
-            else:
-                vals.append(bar.get_height())
-
-        # Figure out how high the y-axis is
-        ybottom, ytop = self.extrAxes.get_ylim() 
-        yheight = ytop - ybottom
-
-        # Place the labels in good positions depending on the height of the
-        # bar and use height of y-axis as a scale for the padding
-        for bar, val in zip(bars, vals):
-            # If bar is positive, try to place label above it
-            if val > 0:
-                propHeight = val / ytop
-                # If the bar is too high, place label inside
-                if propHeight > .90: 
-                    self.extrAxes.text(bar.get_x() + bar.get_width()/2, val - ytop*.04, str(val), ha='center', va='bottom')
-                # Else, place label above
-                else:
-                    self.extrAxes.text(bar.get_x() + bar.get_width()/2, val + ytop*.01, str(val), ha='center', va='bottom')
-            # If bar is negative, try to place label below it
-            else:
-                propHeight = val / ybottom
-                # Note that ybottom is negative, so signs are reversed
-                if propHeight > .95: 
-                    self.extrAxes.text(bar.get_x() + bar.get_width()/2, val - ybottom*.01, str(val), ha='center', va='bottom')
-                else:
-                    self.extrAxes.text(bar.get_x() + bar.get_width()/2, val + ybottom*.04, str(val), ha='center', va='bottom')
-        
-        # Legend
-        blue_patch = mpatches.Patch(color='blue', label='Minimum temperature')
-        red_patch = mpatches.Patch(color='red', label='Maximum temperature')
-        leg = self.extrAxes.legend(handles=[red_patch, blue_patch])
-        leg.get_frame().set_alpha(0.4)
-
-        
-    def plotExtrema(self, ind, comp):
-        """ Creates a new figure and canvas and plots the global extrema of the aquired temperature data for each component as a bar chart. """
-        self.width = 0.35
-
-        yMax = self.extrema[comp]['glob_max'][1]
-        yMin = self.extrema[comp]['glob_min'][1]
-
-        # Create plots
-        self.extrPlots[comp] = {}
-        self.extrPlots[comp]['extrMax'] = self.extrAxes.bar(ind, yMax, width=self.width, color='r', align='center')
-        self.extrPlots[comp]['extrMin'] = self.extrAxes.bar(ind + self.width, yMin, width=self.width, color='b', align='center')
-
-        self.ticklocs.append(ind)
-        self.ticklabels.append(comp)
+        comps = [comp for comp in self.selectedComps if comp in self.extrema]
+        self.extrPlots = evaPlot.plotExtrema(self.extrAxes, comps, self.extrema, quantity=self.data.quantity)
 
 
     def saveExtrema(self, saveFile):
-        """ Writes temperature extrema for all components to a file. """
-        logging.info("Writing temperature extrema to file {}".format(saveFile))
+        """ Writes the extrema of the selected quantity for all components to a file. """
+        logging.info("Writing {} extrema to file {}".format(self.data.quantity, saveFile))
         f = open(saveFile,'w')
 
         # Write header
         f.write('##############################\n# ESATAN Evaluation - Case {}\n##############################\n\n'.format(self.caseComb))
-        f.write('{:60s}{:15s}{:15s}\n'.format('Component','Tmax','Tmin'))
+        f.write('{:60s}{:15s}{:15s}\n'.format('Component', self.data.quantity + 'max', self.data.quantity + 'min'))
         string = ''
         
         # Write data
-        for comp in self.data.keys():
+        for comp in self.components:
+            if comp not in self.extrema:
+                continue
             string += '{:60s}{:15s}{:15s}\n'.format(comp, str(self.extrema[comp]['glob_max'][1]), str(self.extrema[comp]['glob_min'][1]))
         
         f.write(string)
         f.close()
 
 
+    def exportSeries(self, fileName):
+        """ Writes the complete maximum and minimum time series of the selected quantity of all components to a .npz or .csv file. """
+        time, Tmax, Tmin = self.seriesMatrix()
+        quantity = self.data.quantity
+        evaExport.exportSeries(fileName, time, self.components, [(quantity + 'max', Tmax), (quantity + 'min', Tmin)])
+
+
     def changeColor(self, event):
         """ 
         Gets called when a legend line was clicked. Finds the 
@@ -878,7 +1458,7 @@ class Case():
         rgb = (red,green,blue)
 
         # Update color for each plot belonging to this comp
-        for key, plot in self.plots[comp].iteritems():
+        for key, plot in self.plots[comp].items():
             plot.set_color(rgb)
 
         # Update legend
@@ -892,6 +1472,275 @@ class Case():
 
 
 
+class Heatmap():
+    """ 
+    Full-model view of a case. Shows Tmax or Tmin of every component over 
+    time as a single image, with the hottest component on top. The number of
+    artists does not depend on the number of components or time steps.
+    """
+    def __init__(self, case, key='Tmax'):
+        """ Creates figure, canvas and image and connects the mouse events. """
+        self.case = case
+        self.gui = case.gui
+        self.key = key
+
+        time, Tmax, Tmin = case.seriesMatrix()
+        self.time = time
+
+        # Sort components by their global maximum, hottest first
+        self.components, self.values = evaPlot.heatmapRows(case.components, Tmax, Tmin, key)
+        # Maximum or minimum of the selected quantity, e.g. Tmax or QImin
+        self.label = case.data.quantity + key[1:]
+        self.unit = evaPlot.quantityUnit(case.data.quantity)
+
+        self.fig = Figure()
+        self.axes = self.fig.add_subplot(111)
+        self.canvas = FigureCanvas(self.fig)
+
+        # One image for the whole matrix. Columns are time step indices, the
+        # tick formatters translate them into times and component names.
+        self.image = self.axes.imshow(np.ma.masked_invalid(self.values), aspect='auto', interpolation='nearest', cmap=cm.jet)
+        self.fig.colorbar(self.image, ax=self.axes, label="{} [{}]".format(self.label, self.unit))
+        self.axes.xaxis.set_major_locator(mticker.MaxNLocator(10, integer=True))
+        self.axes.xaxis.set_major_formatter(mticker.FuncFormatter(self.formatTime))
+        self.axes.yaxis.set_major_locator(mticker.MaxNLocator(30, integer=True))
+        self.axes.yaxis.set_major_formatter(mticker.FuncFormatter(self.formatComp))
+        self.axes.tick_params(axis='y', labelsize='small')
+
+        self.axes.set_title("{} of all components, sorted by highest maximum".format(self.label))
+        self.axes.set_xlabel("Time [s]")
+        self.fig.suptitle(case.figTitle)
+        self.fig.subplots_adjust(left=0.2)
+
+        self.canvas.mpl_connect('motion_notify_event', self.showValue)
+        self.canvas.mpl_connect('button_press_event', self.selectComp)
+
+
+    def index(self, event):
+        """ Returns the (component, time) indices of the cell under the mouse, or None if outside the image. """
+        if event.inaxes is not self.axes:
+            return None
+        return evaPlot.heatmapCell(self.values.shape, event.xdata, event.ydata)
+
+
+    def formatTime(self, x, pos=None):
+        """ Tick formatter translating a time step index into the corresponding time. """
+        return evaPlot.indexLabel(self.time, x, '{:g}')
+
+
+    def formatComp(self, y, pos=None):
+        """ Tick formatter translating a row index into the component name. """
+        return evaPlot.indexLabel(self.components, y)
+
+
+    def showValue(self, event):
+        """ Shows component, time and value under the mouse in the status bar. """
+        ind = self.index(event)
+        if ind is None:
+            self.gui.statusBar().clearMessage()
+            return
+        row, col = ind
+        self.gui.statusBar().showMessage("{}   t = {:g} s   {} = {:.2f} {}".format(self.components[row], self.time[col], self.label, self.values[row, col], self.unit))
+
+
+    def selectComp(self, event):
+        """ Selects the clicked component and switches back to the line view. """
+        ind = self.index(event)
+        if ind is None or event.button != 1:
+            return
+        comp = self.components[ind[0]]
+        items = self.gui.compSelection.findItems(comp, Qt.MatchExactly)
+        if not items:
+            return
+
+        # Only redraw once for the new selection
+        self.gui.compSelection.blockSignals(True)
+        self.gui.compSelection.clearSelection()
+        self.gui.compSelection.blockSignals(False)
+        items[0].setSelected(True)
+        self.gui.compSelection.scrollToItem(items[0])
+
+        self.gui.menuViewHeatmap.setChecked(False)
+
+
+
+class DiffWindow(QtWidgets.QWidget):
+    """ 
+    Window showing the differences of two cases: Tmax and Tmin deltas over 
+    time for the selected components and the deltas of their global extrema.
+    <quantity> is the ESATAN quantity compared.
+    """
+    def __init__(self, gui, diff, quantity='T'):
+        """ Creates figure, canvas, toolbar and buttons and plots the differences. """
+        super(DiffWindow, self).__init__()
+        self.gui = gui
+        self.diff = diff
+        self.quantity = quantity
+        self.setWindowTitle('Case {} minus Case {}'.format(diff.a.caseComb, diff.b.caseComb))
+
+        self.fig = Figure()
+        self.tempAxes = self.fig.add_subplot(121)
+        self.extrAxes = self.fig.add_subplot(122)
+        self.canvas = FigureCanvas(self.fig)
+        self.fig.suptitle('{} - Case {} minus Case {}'.format(evaPlot.differenceName(quantity, plural=True), diff.a.caseComb, diff.b.caseComb))
+        self.fig.subplots_adjust(bottom=0.15)
+
+        buttonExport = QtWidgets.QPushButton('Export differences')
+        buttonExport.clicked.connect(self.exportSeries)
+        buttonSaveStats = QtWidgets.QPushButton('Save delta extrema')
+        buttonSaveStats.clicked.connect(self.saveStats)
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addWidget(buttonExport)
+        buttons.addWidget(buttonSaveStats)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(NavigationToolbar(self.canvas, self))
+        layout.addWidget(self.canvas)
+        layout.addLayout(buttons)
+        self.resize(1000, 600)
+
+        self.plotDiff()
+
+
+    def plotDiff(self):
+        """ Plots the differences of the components selected in the main window, or of all components. """
+        comps = [comp for comp in self.gui.selectedComps if comp in self.diff.components]
+        if not comps:
+            comps = self.diff.components
+        colors = evaPlot.componentColors(self.diff.components)
+
+        self.tempAxes.set_title("Differences of Hottest (solid) and Coldest (dashed) Points")
+        self.tempAxes.set_xlabel("Time [s]")
+        self.tempAxes.set_ylabel(evaPlot.differenceLabel(self.quantity))
+        for comp in comps:
+            i = self.diff.components.index(comp)
+            self.tempAxes.plot(self.diff.time, self.diff.dTmax[i], lw=2, color=colors[comp], label=comp)
+            self.tempAxes.plot(self.diff.time, self.diff.dTmin[i], lw=2, ls='--', color=colors[comp])
+        self.tempAxes.axhline(0, color='k', lw=.5)
+        self.tempAxes.legend().get_frame().set_alpha(0.4)
+
+        # Bar chart of the differences of the global extrema
+        deltas = dict((comp, {'glob_max': (0, round(self.diff.extrema[comp]['glob_max'], 2)), 'glob_min': (0, round(self.diff.extrema[comp]['glob_min'], 2))}) for comp in comps)
+        evaPlot.plotExtrema(self.extrAxes, comps, deltas, quantity=self.quantity)
+        self.extrAxes.set_title("Differences of Absolute Extrema")
+        self.canvas.draw()
+
+
+    def exportSeries(self):
+        """ Opens save file dialog for exporting the difference time series of all common components. """
+        fileName, fileFilter = QtWidgets.QFileDialog.getSaveFileName(self, 'Export Differences', filter='Compressed NumPy archive (*.npz);;CSV files (*.csv)')
+        fileName = str(fileName)
+        if fileName != '':
+            if not fileName.endswith(('.npz', '.csv')):
+                fileName += '.csv' if 'csv' in fileFilter else '.npz'
+            try:
+                evaExport.exportSeries(fileName, self.diff.time, self.diff.components, [('dTmax', self.diff.dTmax), ('dTmin', self.diff.dTmin)])
+            except Exception:
+                logging.error("Could not export differences")
+
+
+    def saveStats(self):
+        """ Opens save file dialog for saving the delta extrema of all common components. """
+        fileName = str(QtWidgets.QFileDialog.getSaveFileName(self, 'Save File')[0])
+        if fileName != '':
+            try:
+                self.diff.saveExtrema(fileName)
+            except Exception:
+                logging.error("Could not save delta extrema")
+
+
+
+class GradientWindow(QtWidgets.QWidget):
+    """
+    Window showing the temperature differences within the gradient groups
+    of a case: the largest difference of every group over time and the
+    largest differences of all groups.
+    """
+    def __init__(self, gui, gradients):
+        """ Creates figure, canvas, toolbar and buttons and plots the gradients. """
+        super(GradientWindow, self).__init__()
+        self.gui = gui
+        self.gradients = gradients
+        self.setWindowTitle('Temperature gradients - Case {}'.format(gradients.caseComb))
+
+        self.fig = Figure()
+        self.tempAxes = self.fig.add_subplot(121)
+        self.extrAxes = self.fig.add_subplot(122)
+        self.canvas = FigureCanvas(self.fig)
+        self.fig.suptitle('Temperature gradients - Case {}'.format(gradients.caseComb))
+        self.fig.subplots_adjust(bottom=0.25)
+
+        buttonExport = QtWidgets.QPushButton('Export gradients')
+        buttonExport.clicked.connect(self.exportSeries)
+        buttonSaveStats = QtWidgets.QPushButton('Save largest gradients')
+        buttonSaveStats.clicked.connect(self.saveStats)
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addWidget(buttonExport)
+        buttons.addWidget(buttonSaveStats)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(NavigationToolbar(self.canvas, self))
+        layout.addWidget(self.canvas)
+        layout.addLayout(buttons)
+        self.resize(1000, 600)
+
+        self.plotGradients()
+
+
+    def plotGradients(self):
+        """ Plots the difference of every group over time with its maximum marked, and the maxima as bar chart. """
+        gradients = self.gradients
+        colors = evaPlot.componentColors(gradients.names)
+
+        self.tempAxes.set_title("Largest Differences within Groups")
+        self.tempAxes.set_xlabel("Time [s]")
+        self.tempAxes.set_ylabel(evaPlot.differenceLabel('T'))
+        for g, name in enumerate(gradients.names):
+            self.tempAxes.plot(gradients.time, gradients.dT[g], lw=2, color=colors[name], label=name)
+            if not np.isnan(gradients.dTmax[g]):
+                self.tempAxes.plot(gradients.tMax[g], gradients.dTmax[g], 'o', color=colors[name])
+        if gradients.names:
+            self.tempAxes.legend().get_frame().set_alpha(0.4)
+
+        # Bar chart of the largest differences, labeled with the hot and cold component
+        self.extrAxes.set_title("Largest Temperature Differences")
+        self.extrAxes.set_ylabel(evaPlot.differenceLabel('T'))
+        ind = np.arange(len(gradients.names))
+        self.extrAxes.bar(ind, np.nan_to_num(gradients.dTmax), color=[colors[name] for name in gradients.names])
+        for g in range(len(gradients.names)):
+            if not np.isnan(gradients.dTmax[g]):
+                self.extrAxes.text(g, gradients.dTmax[g] / 2, '{:.2f} K\nt = {:g} s\n{}\n{}'.format(gradients.dTmax[g], gradients.tMax[g], gradients.hot[g], gradients.cold[g]), ha='center', va='center', fontsize='small')
+        self.extrAxes.set_xticks(ind)
+        self.extrAxes.set_xticklabels(gradients.names, rotation=20, ha='right')
+        if gradients.missing:
+            self.extrAxes.set_xlabel('Less than two components found of {}'.format(', '.join(evaAnalysis.GROUP_SEPARATOR.join(group) for group in gradients.missing)), ha='center')
+        self.canvas.draw()
+
+
+    def exportSeries(self):
+        """ Opens save file dialog for exporting the difference time series of all groups. """
+        fileName, fileFilter = QtWidgets.QFileDialog.getSaveFileName(self, 'Export Gradients', filter='Compressed NumPy archive (*.npz);;CSV files (*.csv)')
+        fileName = str(fileName)
+        if fileName != '':
+            if not fileName.endswith(('.npz', '.csv')):
+                fileName += '.csv' if 'csv' in fileFilter else '.npz'
+            try:
+                evaExport.exportSeries(fileName, self.gradients.time, self.gradients.names, [('dT', self.gradients.dT)])
+            except Exception:
+                logging.error("Could not export gradients")
+
+
+    def saveStats(self):
+        """ Opens save file dialog for saving the largest difference of every group. """
+        fileName = str(QtWidgets.QFileDialog.getSaveFileName(self, 'Save File')[0])
+        if fileName != '':
+            try:
+                self.gradients.saveMaxima(fileName)
+            except Exception:
+                logging.error("Could not save gradients")
+
+
+
 if __name__ == '__main__':
 
     logging.info("Starting application\n")
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+Shared fixtures of the test suite. The tests import the modules of the
+repository root directly and read the small ESATAN output file in
+tests/data.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA = os.path.join(ROOT, 'tests', 'data')
+sys.path.insert(0, ROOT)
+
+# Filter settings the expected values of the fixture file are based on
+THRESHOLDS = (-200, 200)
+IGNORE_VALUES = [0.0]
+
+
+@pytest.fixture
+def outFile():
+    """ Path of the ESATAN output file fixture. """
+    return os.path.join(DATA, 'MOVE_II_.out')
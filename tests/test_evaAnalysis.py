@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+""" Tests of the analyses on columnar case data. """
+
+import numpy as np
+import pytest
+
+import evaAnalysis
+import evaData
+from conftest import THRESHOLDS, IGNORE_VALUES
+
+
+def makeSeries(time, components, Tmax, Tmin=None, caseComb=None):
+    Tmax = np.array(Tmax, dtype=float)
+    Tmin = Tmax - 1 if Tmin is None else np.array(Tmin, dtype=float)
+    return evaAnalysis.Series(time, components, Tmax, Tmin, caseComb)
+
+
+def test_case_diff_identical():
+    a = makeSeries([0, 60, 120], ['a', 'b'], [[1, 2, 3], [4, 5, 6]], caseComb='122')
+    diff = evaAnalysis.CaseDiff(a, a)
+    assert diff.components == ['a', 'b']
+    np.testing.assert_array_equal(diff.dTmax, 0)
+    np.testing.assert_array_equal(diff.dGlobMin, 0)
+
+
+def test_case_diff_aligns_time_and_components():
+    a = makeSeries([0, 60, 120], ['a', 'b'], [[1, 2, 3], [4, 5, 6]])
+    b = makeSeries([30, 90], ['c', 'b'], [[0, 0], [3, 3]])
+    diff = evaAnalysis.CaseDiff(a, b)
+    assert diff.components == ['b']
+    np.testing.assert_array_equal(diff.time, [30, 60, 90])
+    np.testing.assert_allclose(diff.dTmax, [[1.5, 2, 2.5]])
+    assert diff.extrema['b']['glob_max'] == 3
+    assert diff.extrema['b']['max_delta'] == (90, 2.5)
+
+
+def test_case_diff_save(tmp_path):
+    a = makeSeries([0, 60], ['a'], [[1, 2]], caseComb='122')
+    b = makeSeries([0, 60], ['a'], [[1, 1]], caseComb='123')
+    saveFile = str(tmp_path / 'diff.txt')
+    evaAnalysis.CaseDiff(a, b).saveExtrema(saveFile)
+    with open(saveFile) as f:
+        text = f.read()
+    assert 'Case 122 minus Case 123' in text
+    assert text.splitlines()[-1].split() == ['a', '1.0', '0.0', '1.0', '0.0']
+
+
+def factorialCampaign():
+    combs = ['{}{}{}'.format(a, b, c) for a in (1, 2) for b in (0, 1) for c in (1, 3)]
+    Tmax = np.array([[10.0 * int(comb[0]) + 2.0 * int(comb[1])] for comb in combs])
+    return combs, ['a'], Tmax, -Tmax
+
+
+def test_sensitivity_main_effects():
+    sensitivity = evaAnalysis.Sensitivity(*factorialCampaign())
+    np.testing.assert_allclose(sensitivity.effects[0, 0], [10, 2, 0])
+    np.testing.assert_allclose(sensitivity.interactions[0, 0], 0, atol=1e-12)
+    assert sensitivity.ranking('Tmax', 'a') == [0, 1, 2]
+    np.testing.assert_array_equal(sensitivity.levels[1], [0, 1])
+
+
+def test_sensitivity_skips_invalid_combs(tmp_path):
+    combs, components, Tmax, Tmin = factorialCampaign()
+    combs[0] = '122_QI'
+    sensitivity = evaAnalysis.Sensitivity(combs, components, Tmax, Tmin)
+    assert len(sensitivity.combs) == 7
+    # The effects become estimates for an incomplete cube
+    assert not np.isnan(sensitivity.effects[1, 0]).any()
+    saveFile = str(tmp_path / 'sensitivity.txt')
+    sensitivity.saveEffects(saveFile, descriptions=[{1: 'CFK'}, {}, {}])
+    with open(saveFile) as f:
+        text = f.read()
+    assert '7 cases' in text and '# 1: CFK' in text
+
+
+def bruteRolling(time, values, window, reduce):
+    result = np.full(values.shape, np.nan)
+    for j, t in enumerate(time):
+        inside = (time > t - window) & (time <= t)
+        if t - time[0] >= window:
+            with np.errstate(all='ignore'):
+                result[:, j] = reduce(values[:, inside], axis=1)
+    return result
+
+
+@pytest.mark.parametrize('statistic, reduce', [('mean', np.nanmean), ('max', np.nanmax), ('min', np.nanmin)])
+def test_rolling_series(statistic, reduce):
+    rng = np.random.RandomState(0)
+    time = np.cumsum(rng.uniform(5, 15, 200))
+    Tmax = rng.normal(20, 5, (3, 200))
+    Tmax[1, 50:60] = np.nan
+    data = makeSeries(time, ['a', 'b', 'c'], Tmax)
+    rolled = evaAnalysis.rollingSeries(data, 100, statistic, chunk=2)
+    np.testing.assert_allclose(rolled.Tmax, bruteRolling(time, Tmax, 100, reduce))
+    np.testing.assert_allclose(rolled.Tmin, bruteRolling(time, Tmax - 1, 100, reduce))
+
+
+def test_rolling_series_unknown_statistic():
+    with pytest.raises(ValueError):
+        evaAnalysis.rollingSeries(makeSeries([0, 1], ['a'], [[1, 2]]), 1, 'median')
+
+
+def test_regression():
+    baseline = (['122', '123'], ['a', 'b'], [[10, 20], [30, 40]], [[0, 5], [1, 2]])
+    candidate = (['123', '142'], ['b', 'a', 'c'], [[40.05, 33, 1], [1, 1, 1]], [[2, 1, 1], [1, 1, 1]])
+    regression = evaAnalysis.Regression(baseline, candidate, tolerance=0.1)
+    assert regression.combs == ['122', '123', '142']
+    assert regression.components == ['a', 'b', 'c']
+    assert [(regression.combs[r], regression.components[c]) for r, c in regression.changes] == [('123', 'a')]
+    np.testing.assert_allclose(regression.dTmax[1, :2], [3, 0.05])
+    assert regression.componentChanges()[0] == ('a', 3)
+    assert (1, 2) in regression.added
+    assert (0, 0) in regression.removed and (2, 0) in regression.added
+
+
+def test_parse_groups():
+    groups = evaAnalysis.parseGroups('a, b; c ,d,e;;f')
+    assert groups == [('a', 'b'), ('c', 'd', 'e')]
+    assert evaAnalysis.parseGroups(evaAnalysis.formatGroups(groups)) == groups
+
+
+def test_gradients(outFile):
+    data = evaData.CaseData(outFile, '122', thresholds=THRESHOLDS, ignoreValues=IGNORE_VALUES)
+    groups = [('battery_board1', 'battery_board2', 'board5'), ('board5', 'missing'), ('battery_board1', 'battery_board2')]
+    gradients = evaAnalysis.Gradients(data, groups, chunk=2)
+    assert gradients.names == ['battery_board1/battery_board2/board5', 'battery_board1/battery_board2']
+    assert gradients.missing == [('board5', 'missing')]
+    # Largest Tmax of one component minus smallest Tmin of another, at every time
+    np.testing.assert_array_equal(gradients.dT, [[12, 12, 10], [4, 4, 6.5]])
+    np.testing.assert_array_equal(gradients.dTmax, [12, 6.5])
+    np.testing.assert_array_equal(gradients.tMax, [0, 120])
+    assert (gradients.hot[0], gradients.cold[0]) == ('board5', 'battery_board2')
+    assert (gradients.hot[1], gradients.cold[1]) == ('battery_board1', 'battery_board2')
+
+
+def test_gradients_save(tmp_path):
+    data = makeSeries([0, 60], ['a', 'b', 'c'], [[1, 2], [3, np.nan], [np.nan, np.nan]])
+    gradients = evaAnalysis.Gradients(data, [('a', 'b'), ('a', 'c')])
+    saveFile = str(tmp_path / 'gradients.txt')
+    gradients.saveMaxima(saveFile)
+    with open(saveFile) as f:
+        lines = [line.split() for line in f]
+    assert lines == [['Group', 'dTmax', 'Time', 'Hot', 'Cold'], ['a/b', '3.0', '0', 'b', 'a'], ['a/c']]
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+""" Tests of the case workspace. """
+
+import functools
+import time
+
+import numpy as np
+
+import evaCache
+import evaData
+from conftest import THRESHOLDS, IGNORE_VALUES
+
+
+class Entry():
+    def __init__(self, size):
+        self.size = size
+
+    def nbytes(self):
+        return self.size
+
+
+def test_evicts_least_recently_used():
+    evicted = []
+    cache = evaCache.CaseCache(budget=2, onEvict=lambda key, entry: evicted.append(key))
+    for key in ('a', 'b', 'c'):
+        cache.put(key, Entry(1024**2))
+        if key == 'b':
+            cache.get('a')
+    assert evicted == ['b']
+    assert cache.keys() == ['a', 'c']
+
+
+def test_keeps_most_recent_entry_over_budget():
+    cache = evaCache.CaseCache(budget=1)
+    cache.put('a', Entry(1024**2))
+    cache.put('b', Entry(5 * 1024**2))
+    assert cache.keys() == ['b']
+
+
+def test_max_entries():
+    cache = evaCache.CaseCache(maxEntries=2)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, Entry(1))
+    assert cache.keys() == ['b', 'c']
+    assert cache.totalSize() == 2
+
+
+def test_pop_does_not_evict():
+    evicted = []
+    cache = evaCache.CaseCache(onEvict=lambda key, entry: evicted.append(key))
+    cache.put('a', Entry(1))
+    assert cache.pop('a').size == 1
+    assert evicted == [] and len(cache) == 0
+    cache.put('b', Entry(1))
+    cache.clear()
+    assert evicted == ['b']
+
+
+def test_shared_budget():
+    workspace = evaCache.CaseCache(budget=1)
+    workspace.put('a', Entry(600 * 1024))
+    cache = evaCache.CaseCache(budget=1, shared=workspace)
+    cache.put('b', Entry(300 * 1024))
+    assert cache.keys() == ['b']
+    # Unlike the workspace, a cache sharing the budget gives up its last entry
+    cache.put('c', Entry(500 * 1024))
+    assert cache.keys() == []
+    assert workspace.keys() == ['a'] and cache.totalSize() == 0
+
+
+def loadEntry(key):
+    return Entry(300 * 1024)
+
+
+def failToLoad(key):
+    raise IOError(key)
+
+
+def waitIdle(prefetcher):
+    for _ in range(1000):
+        with prefetcher.condition:
+            if prefetcher.current is None and not prefetcher.pending:
+                return
+        time.sleep(0.01)
+
+
+def test_prefetcher_reads_scheduled_keys():
+    prefetcher = evaCache.Prefetcher(loadEntry, evaCache.CaseCache())
+    prefetcher.schedule(['a', 'b'])
+    waitIdle(prefetcher)
+    assert prefetcher.results.keys() == ['a', 'b']
+    assert prefetcher.take('a').size == 300 * 1024
+    assert prefetcher.take('a') is None
+
+
+def test_prefetcher_skips_failures():
+    prefetcher = evaCache.Prefetcher(failToLoad, evaCache.CaseCache())
+    prefetcher.schedule(['a'])
+    waitIdle(prefetcher)
+    assert prefetcher.take('a') is None
+    assert 'a' not in prefetcher.results
+
+
+def test_prefetcher_counts_against_workspace():
+    workspace = evaCache.CaseCache(budget=1)
+    workspace.put('open', Entry(600 * 1024))
+    prefetcher = evaCache.Prefetcher(loadEntry, workspace)
+    prefetcher.schedule(['a', 'b'])
+    waitIdle(prefetcher)
+    assert prefetcher.results.keys() == ['b']
+    # Results are dropped when the workspace grows
+    workspace.put('other', Entry(900 * 1024))
+    prefetcher.schedule([])
+    assert prefetcher.results.keys() == []
+
+
+def test_prefetcher_clear_replaces_load():
+    prefetcher = evaCache.Prefetcher(failToLoad, evaCache.CaseCache())
+    prefetcher.clear(loadEntry)
+    prefetcher.schedule(['a'])
+    waitIdle(prefetcher)
+    assert prefetcher.take('a').size == 300 * 1024
+
+
+def test_prefetcher_reads_case_data(outFile):
+    load = functools.partial(evaData.readCase, thresholds=THRESHOLDS, ignoreValues=IGNORE_VALUES, resampleStep=40)
+    prefetcher = evaCache.Prefetcher(load, evaCache.CaseCache())
+    prefetcher.schedule([outFile])
+    waitIdle(prefetcher)
+    data = prefetcher.take(outFile)
+    np.testing.assert_array_equal(data.time, [0, 40, 80, 120])
+    assert data.extrema['board5']['glob_max'] == (60, 31.5)
+    assert data.pyramid.levels[0][0] is data.time
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+""" Tests of the ESATAN output parser and the array helpers of evaData. """
+
+import os
+
+import numpy as np
+import pytest
+
+import evaData
+from conftest import THRESHOLDS, IGNORE_VALUES
+
+
+def readFixture(outFile, **kwargs):
+    return evaData.CaseData(outFile, '122', thresholds=THRESHOLDS, ignoreValues=IGNORE_VALUES, **kwargs)
+
+
+def test_parse_components(outFile):
+    data = readFixture(outFile)
+    assert data.components == ['battery_board1', 'battery_board2', 'board5']
+    np.testing.assert_array_equal(data.time, [0, 60, 120])
+    np.testing.assert_array_equal(data.Tmax, [[22, 23.5, 24], [18, 19.5, 17.5], [30, 31.5, 27.5]])
+    np.testing.assert_array_equal(data.Tmin, [[20.5, 21, 19], [18, 19.5, 17.5], [25, 26, 27.5]])
+
+
+def test_extrema(outFile):
+    data = readFixture(outFile)
+    assert data.extrema['battery_board1']['glob_max'] == (120, 24)
+    assert data.extrema['battery_board1']['glob_min'] == (120, 19)
+    assert data.extrema['board5']['glob_max'] == (60, 31.5)
+    assert data.extrema['board5']['glob_min'] == (0, 25)
+
+
+def test_without_filters(outFile):
+    data = evaData.CaseData(outFile, '122')
+    i = data.components.index('board5')
+    assert data.Tmin[i, 2] == 0
+
+
+def test_series(outFile):
+    data = readFixture(outFile)
+    time, Tmax, Tmin = data.series('battery_board2')
+    np.testing.assert_array_equal(time, [0, 60, 120])
+    np.testing.assert_array_equal(Tmax, Tmin)
+
+
+def test_group_extrema():
+    gmax, gmin = evaData.groupExtrema([2, 0, 2, 2], [1.0, 5.0, -3.0, 4.0], 4)
+    np.testing.assert_array_equal(gmax, [5, np.nan, 4, np.nan])
+    np.testing.assert_array_equal(gmin, [5, np.nan, -3, np.nan])
+
+
+def test_group_extrema_empty():
+    gmax, gmin = evaData.groupExtrema([], [], 2)
+    assert np.isnan(gmax).all() and np.isnan(gmin).all()
+
+
+def test_find_extrema_skips_empty_components():
+    Tmax = np.array([[1.0, 3.0], [np.nan, np.nan]])
+    extrema = evaData.findExtrema(np.array([0.0, 1.0]), ['a', 'b'], Tmax, Tmax - 1)
+    assert list(extrema) == ['a']
+    assert extrema['a']['glob_max'] == (1.0, 3.0)
+    assert extrema['a']['glob_min'] == (0.0, 0.0)
+
+
+def test_node_mode(outFile):
+    data = readFixture(outFile, nodes=True)
+    assert data.nodeIds == ['604', '605', '654', '3000', '3012']
+    np.testing.assert_array_equal(data.Tmax[0], [22, 23.5, 24])
+    nodes, temps = data.componentNodes('board5')
+    assert nodes == ['3000', '3012']
+    assert np.isnan(temps[0, 2])
+
+
+def test_node_extrema(outFile):
+    data = readFixture(outFile, nodes=True)
+    extrema = data.nodeExtrema('battery_board1')
+    assert extrema['glob_max'] == ('605', 120, 24)
+    assert extrema['glob_min'] == ('604', 120, 19)
+
+
+def test_node_extrema_without_nodes(outFile):
+    data = readFixture(outFile)
+    with pytest.raises(ValueError):
+        data.nodeExtrema('board5')
+
+
+@pytest.mark.parametrize('nodes', [False, True])
+def test_row_chunks(monkeypatch, outFile, nodes):
+    expected = readFixture(outFile, nodes=nodes, quantities=('T', 'QI'))
+    monkeypatch.setattr(evaData, 'ROW_CHUNK', 1)
+    data = readFixture(outFile, nodes=nodes, quantities=('T', 'QI'))
+    for key in expected.results:
+        expected.select(*key)
+        data.select(*key)
+        np.testing.assert_array_equal(data.Tmax, expected.Tmax)
+        np.testing.assert_array_equal(data.Tmin, expected.Tmin)
+        if nodes:
+            np.testing.assert_array_equal(data.nodeTemps, expected.nodeTemps)
+
+
+def test_node_budget_counts_rows(monkeypatch, outFile):
+    expected = readFixture(outFile)
+    monkeypatch.setattr(evaData, 'ROW_CHUNK', 1)
+    kept = []
+    # Node resolution is given up at every stage of the parse, with and without folded blocks
+    for budget in range(0, 1000, 20):
+        data = readFixture(outFile, nodes=True, nodeBudget=budget / 1024.0**2)
+        kept.append(data.nodes)
+        np.testing.assert_array_equal(data.Tmax, expected.Tmax)
+        np.testing.assert_array_equal(data.Tmin, expected.Tmin)
+    assert not kept[0] and kept[-1]
+    # The rows parsed so far count against the budget, not only the node array
+    assert not readFixture(outFile, nodes=True, nodeBudget=3 * 7 * 4 / 1024.0**2).nodes
+
+
+def test_merge_steps():
+    values = np.array([[1.0, 5.0, np.nan, 2.0]])
+    np.testing.assert_array_equal(evaData.mergeSteps(values, [1, 0, 0, 2], 3, np.fmax), [[5, 1, 2]])
+    np.testing.assert_array_equal(evaData.mergeSteps(values, [1, 0, 0, 2], 3), [[5, 1, 2]])
+    np.testing.assert_array_equal(evaData.mergeSteps(values, [0, 1, 1, 2], 3, np.fmin), [[1, 5, 2]])
+    assert evaData.mergeSteps(values, [0, 1, 2, 3], 4) is values
+
+
+def test_quantities(outFile):
+    data = readFixture(outFile, quantities=('T', 'QI', 'QS'))
+    assert data.quantitiesOf('MOVE_II') == ['T', 'QI', 'QS']
+    assert data.quantitiesOf('RADIATOR') == ['T']
+    data.select(quantity='QI')
+    # Other quantities than temperatures are not filtered
+    np.testing.assert_array_equal(data.Tmax[2], [3.25, 3.75, 4.25])
+    np.testing.assert_array_equal(data.Tmin[2], [0, 0.5, 1])
+    data.select(quantity='T')
+    np.testing.assert_array_equal(data.Tmax[0], [22, 23.5, 24])
+
+
+def test_select_missing_results(outFile):
+    data = readFixture(outFile, quantities=('T', 'QI'))
+    with pytest.raises(KeyError):
+        data.select('RADIATOR', 'QI')
+    assert (data.submodel, data.quantity) == ('MOVE_II', 'T')
+    data.select('RADIATOR')
+    assert data.quantity == 'T'
+    assert data.components == ['rad_panel']
+
+
+def test_interpolate():
+    values = np.array([[0.0, 10.0, np.nan, 30.0]])
+    result = evaData.interpolate([0, 10, 20, 30], values, [-5, 0, 5, 10, 15, 30, 35])
+    np.testing.assert_array_equal(result, [[np.nan, 0, 5, 10, np.nan, 30, np.nan]])
+
+
+def test_uniform_grid():
+    np.testing.assert_array_equal(evaData.uniformGrid(np.array([0.0, 35.0, 100.0]), 30), [0, 30, 60, 90])
+    assert len(evaData.uniformGrid(np.zeros(0), 30)) == 0
+
+
+def test_resample_keeps_extrema(outFile):
+    data = readFixture(outFile)
+    data.resample(40)
+    np.testing.assert_array_equal(data.time, [0, 40, 80, 120])
+    np.testing.assert_allclose(data.Tmax[1], [18, 19, 19.5 - 2 / 3.0, 17.5])
+    # Peaks between the grid points are kept in the extrema
+    assert data.extrema['board5']['glob_max'] == (60, 31.5)
+
+
+def test_resample_nodes(outFile):
+    data = readFixture(outFile, nodes=True)
+    data.resample(40)
+    assert data.nodeTemps.dtype == np.float32
+    np.testing.assert_allclose(data.Tmax[1], [18, 19, 19.5 - 2 / 3.0, 17.5], rtol=1e-6)
+
+
+@pytest.mark.parametrize('extension', sorted(evaData.OPENERS))
+def test_compressed_output(tmp_path, outFile, extension):
+    filePath = str(tmp_path / ('MOVE_II_.out' + extension))
+    with open(outFile, 'rb') as f, evaData.OPENERS[extension](filePath, 'wb') as compressed:
+        compressed.write(f.read())
+    data = readFixture(filePath)
+    np.testing.assert_array_equal(data.Tmax, readFixture(outFile).Tmax)
+
+
+def test_find_output_prefers_uncompressed(tmp_path):
+    folder = str(tmp_path)
+    assert evaData.findOutput(folder) == os.path.join(folder, 'MOVE_II_.out')
+    open(os.path.join(folder, 'MOVE_II_.out.xz'), 'w').close()
+    assert evaData.findOutput(folder) == os.path.join(folder, 'MOVE_II_.out.xz')
+    open(os.path.join(folder, 'MOVE_II_.out'), 'w').close()
+    assert evaData.findOutput(folder) == os.path.join(folder, 'MOVE_II_.out')
+
+
+def test_submodel_paragraphs(outFile):
+    # The fixture holds paragraphs of two submodels and a header line naming '+MOVE_II' among other words
+    data = readFixture(outFile)
+    assert data.model == 'MOVE_II_3_1_CASE_122'
+    assert data.submodels == ['MOVE_II', 'RADIATOR']
+    assert data.mainSubmodel() == 'MOVE_II'
+    data.select('RADIATOR')
+    assert data.components == ['rad_panel']
+    np.testing.assert_array_equal(data.Tmax, [[-10, -11, -9.5]])
+    np.testing.assert_array_equal(data.Tmin, [[-12.5, -13, -9.5]])
+
+
+def test_submodel_nodes(outFile):
+    data = readFixture(outFile, nodes=True, quantities=('T', 'QS'))
+    data.select('RADIATOR', 'T')
+    assert data.nodeIds == ['9001', '9002']
+    np.testing.assert_array_equal(data.nodeComp, [0, 0])
+    np.testing.assert_array_equal(data.nodeTemps[1], [-12.5, -13, np.nan])
+    data.select('MOVE_II', 'QS')
+    np.testing.assert_array_equal(data.Tmax[0], [100, 101, 102])
+
+
+def test_paragraph_before_time_stamp(tmp_path, outFile):
+    with open(outFile) as f:
+        lines = f.readlines()
+    first = [i for i, line in enumerate(lines) if 'TIMEN' in line][0]
+    # The paragraphs of the first time step lack their time stamp
+    fileName = str(tmp_path / 'MOVE_II_.out')
+    with open(fileName, 'w') as f:
+        f.writelines(lines[:first] + lines[first + 1:])
+    data = readFixture(fileName)
+    np.testing.assert_array_equal(data.time, [60, 120])
+    np.testing.assert_array_equal(data.Tmax[0], [23.5, 24])
+
+
+def test_pyramid_levels_keep_peaks():
+    time = np.arange(37, dtype=float)
+    Tmax = np.zeros((2, 37))
+    Tmax[0, 13] = 5.0
+    Tmax[1, 36] = 7.0
+    pyramid = evaData.Pyramid(time, Tmax, -Tmax, minSize=4)
+    assert [len(level[0]) for level in pyramid.levels] == [37, 19, 10, 5, 3]
+    assert pyramid.levels[0][1] is Tmax
+    for levelTime, levelMax, levelMin in pyramid.levels:
+        assert levelMax.shape == (2, len(levelTime))
+        assert levelMax[0].max() == 5.0 and levelMax[1].max() == 7.0
+        assert levelMin[0].min() == -5.0
+    # The peak at time 13 lies in the block starting at time 12 on level 2
+    assert pyramid.levels[2][1][0, 3] == 5.0
+
+
+def test_pyramid_view():
+    time = np.arange(1000, dtype=float)
+    values = np.vstack([time, -time])
+    pyramid = evaData.Pyramid(time, values, values, minSize=64)
+    viewTime, Tmax, Tmin = pyramid.view(100, 500, 100)
+    assert 100 <= len(viewTime) < 200
+    assert viewTime[0] <= 100 and viewTime[-1] >= 500
+    viewTime, Tmax, Tmin = pyramid.view(100, 110, 100)
+    np.testing.assert_array_equal(viewTime, np.arange(99, 112))
+    np.testing.assert_array_equal(Tmax[1], -viewTime)
+
+
+def test_case_pyramid(outFile):
+    data = readFixture(outFile)
+    assert len(data.pyramid.levels) == 1
+    assert data.pyramid is data.pyramid
+    data.resample(30)
+    np.testing.assert_array_equal(data.pyramid.levels[0][0], data.time)
+
+
+def test_scan_header(outFile):
+    info = evaData.scanHeader(outFile)
+    assert info['model'] == 'MOVE_II_3_1_CASE_122'
+    assert info['submodels'] == ['MOVE_II', 'RADIATOR']
+    assert info['components'] == {'MOVE_II': ['battery_board1', 'battery_board2', 'board5'], 'RADIATOR': ['rad_panel']}
+    assert info['quantities'] == ['T', 'QI', 'QS']
+    assert (info['timesteps'], info['estimated'], info['timeRange']) == (3, False, (0, 120))
+    assert '3 time steps, 0 to 120 s' in evaData.describeHeader(info)
+
+
+def test_scan_header_estimate(tmp_path, outFile):
+    # Without the QS paragraph in the last time step the estimate from the first step is off
+    with open(outFile) as f:
+        text = f.read()
+    last = text.rindex('TIMEN')
+    qs = text.rindex(' +MOVE_II', last, text.index('QS', last))
+    fileName = str(tmp_path / 'MOVE_II_.out')
+    with open(fileName, 'w') as f:
+        f.write(text[:qs] + text[text.index(' +RADIATOR', qs):])
+    assert evaData.scanHeader(fileName)['timesteps'] == 3
+    info = evaData.scanHeader(fileName, tailSize=100)
+    assert info['estimated'] and info['timeRange'] == (0, 120)
+    assert evaData.formatTimesteps(info) == '~{}'.format(info['timesteps'])
+    assert '~' in evaData.describeHeader(info)
+
+
+def test_scan_header_compressed(tmp_path, outFile):
+    fileName = str(tmp_path / 'MOVE_II_.out.gz')
+    with open(outFile, 'rb') as f, evaData.OPENERS['.gz'](fileName, 'wb') as compressed:
+        compressed.write(f.read())
+    info = evaData.scanHeader(fileName)
+    assert info['timesteps'] is None and info['timeRange'] == (0, None)
+    assert evaData.formatTimesteps(info) == '?'
+    assert 'time steps unknown, from 0 s' in evaData.describeHeader(info)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+""" Tests of the chunked time series export. """
+
+import numpy as np
+import pytest
+
+import evaExport
+
+
+@pytest.fixture
+def series():
+    time = np.arange(5, dtype=float)
+    Tmax = np.array([[1, 2, 3, 4, 5], [10, 20, 30, 40, 50]], dtype=float)
+    return time, ['a', 'b'], [('Tmax', Tmax), ('Tmin', Tmax - 1)]
+
+
+def test_export_npz(tmp_path, series):
+    time, names, quantities = series
+    fileName = str(tmp_path / 'series.npz')
+    evaExport.exportSeries(fileName, time, names, quantities, chunk=2)
+    archive = np.load(fileName)
+    assert list(archive['components']) == names
+    np.testing.assert_array_equal(archive['time'], time)
+    np.testing.assert_array_equal(archive['Tmax/b'], quantities[0][1][1])
+    np.testing.assert_array_equal(archive['Tmin/a'], quantities[1][1][0])
+
+
+def test_export_csv(tmp_path, series):
+    time, names, quantities = series
+    fileName = str(tmp_path / 'series.csv')
+    evaExport.exportSeries(fileName, time, names, quantities, chunk=2)
+    with open(fileName) as f:
+        header = f.readline().strip().split(',')
+    assert header == ['time', 'a Tmax', 'a Tmin', 'b Tmax', 'b Tmin']
+    table = np.loadtxt(fileName, delimiter=',', skiprows=1)
+    assert table.shape == (5, 5)
+    np.testing.assert_array_equal(table[:, 3], quantities[0][1][1])
+    np.testing.assert_array_equal(table[:, 2], quantities[1][1][0])
+
+
+def test_export_unknown_format(tmp_path, series):
+    with pytest.raises(ValueError):
+        evaExport.exportSeries(str(tmp_path / 'series.txt'), *series)
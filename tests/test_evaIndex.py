@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+""" Tests of the case index. """
+
+import os
+import shutil
+
+import evaIndex
+
+
+def addCase(root, comb, outFile, subfolder='esatan'):
+    folder = os.path.join(str(root), subfolder, evaIndex.CASE_PREFIX + comb)
+    os.makedirs(folder)
+    shutil.copy(outFile, os.path.join(folder, 'MOVE_II_.out'))
+    return folder
+
+
+def test_scan(tmp_path, outFile):
+    addCase(tmp_path, '122', outFile)
+    addCase(tmp_path, '123', outFile, 'other')
+    index = evaIndex.CaseIndex(str(tmp_path))
+    assert index.combs() == ['122', '123']
+    assert 122 in index
+    assert index.filePath('123').endswith(os.path.join('other', 'Case_123', 'MOVE_II_.out'))
+    assert index.filePath('124') is None
+
+
+def test_refresh_finds_new_cases(tmp_path, outFile):
+    addCase(tmp_path, '122', outFile)
+    index = evaIndex.CaseIndex(str(tmp_path), checkInterval=3600)
+    folder = os.path.join(str(tmp_path), 'esatan', 'Case_123')
+    os.makedirs(folder)
+    assert index.refresh() == []
+    shutil.copy(outFile, os.path.join(folder, 'MOVE_II_.out'))
+    assert index.refresh() == ['123']
+
+
+def test_refresh_checks_output_files_every_interval(tmp_path, outFile):
+    folder = addCase(tmp_path, '122', outFile)
+    index = evaIndex.CaseIndex(str(tmp_path), checkInterval=3600)
+    with open(os.path.join(folder, 'MOVE_II_.out'), 'a') as f:
+        f.write('\n')
+    assert index.refresh() == []
+    assert index.refresh(force=True) == ['122']
+    assert index.cases['122']['size'] == os.path.getsize(outFile) + 1
+
+
+def test_refresh_removed_case(tmp_path, outFile):
+    folder = addCase(tmp_path, '122', outFile)
+    index = evaIndex.CaseIndex(str(tmp_path), checkInterval=0)
+    shutil.rmtree(folder)
+    index.refresh()
+    assert index.combs() == []
+
+
+def test_header(tmp_path, outFile):
+    addCase(tmp_path, '122', outFile)
+    index = evaIndex.CaseIndex(str(tmp_path))
+    info = index.header('122')
+    assert info['model'] == 'MOVE_II_3_1_CASE_122'
+    assert index.header('122') is info
+    assert index.header('124') is None
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+""" Tests of the node to component mapping and the CSV reader. """
+
+import numpy as np
+
+import evaData
+import evaNodes
+from conftest import THRESHOLDS, IGNORE_VALUES
+
+
+def test_from_case_and_reduce(outFile):
+    data = evaData.CaseData(outFile, '122', thresholds=THRESHOLDS, ignoreValues=IGNORE_VALUES)
+    nodeMap = evaNodes.fromCase(data)
+    assert len(nodeMap) == 5
+    temps = np.array([[1.0, 2.0], [3.0, 0.0], [5.0, 5.0], [np.nan, 7.0]])
+    components, Tmax, Tmin = nodeMap.reduce(['3000', '604', '605', '3012'], temps)
+    assert components == ['board5', 'battery_board1']
+    np.testing.assert_array_equal(Tmax, [[1, 7], [5, 5]])
+    np.testing.assert_array_equal(Tmin, [[1, 2], [3, 0]])
+
+
+def test_reduce_ignores_unknown_nodes():
+    nodeMap = evaNodes.NodeMap(['1'], ['a'])
+    components, Tmax, Tmin = nodeMap.reduce(['2'], np.ones((1, 3)))
+    assert components == [] and Tmax.shape == (0, 3)
+
+
+def test_save_and_load(tmp_path):
+    nodeMap = evaNodes.NodeMap(['604', '3000', '99'], ['a', 'b', 'c'])
+    nodeMap.update(evaNodes.NodeMap(['604', '7'], ['x', 'd']))
+    fileName = str(tmp_path / 'nodes.txt')
+    nodeMap.save(fileName)
+    with open(fileName) as f:
+        assert f.read().split() == ['Node,Component', '7,d', '99,c', '604,a', '3000,b']
+    assert evaNodes.load(fileName).component == nodeMap.component
+
+
+def test_read_csv(tmp_path):
+    fileName = str(tmp_path / 'case122.csv')
+    with open(fileName, 'w') as f:
+        f.write('ESATAN 2016 sp2;  MODEL MOVE_II_3_1_CASE_122\n \n')
+        f.write('TIME,T604,QI604,T3000,\n 6.0E+01,1.0,9.0,2.0,\n')
+        f.write('TIME,T604,T3000,\n 0.0E+00,3.0,4.0,\n')
+    time, nodes, temps = evaNodes.readCSV(fileName)
+    np.testing.assert_array_equal(time, [0, 60])
+    assert nodes == ['604', '3000']
+    np.testing.assert_array_equal(temps, [[3, 1], [4, 2]])
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+""" Tests of the labels of the plotted quantities and the heatmap layout. """
+
+import numpy as np
+import pytest
+
+import evaPlot
+
+
+def test_quantity_label():
+    assert evaPlot.quantityLabel('T') == 'Temperature [°C]'
+    assert evaPlot.quantityLabel('XY') == 'XY'
+
+
+def test_difference_labels():
+    assert evaPlot.differenceName('T', plural=True) == 'Temperature differences'
+    assert evaPlot.differenceLabel('T') == 'Temperature difference [K]'
+    assert evaPlot.differenceLabel('QI') == 'Internal dissipation difference [W]'
+    assert evaPlot.differenceLabel('XY') == 'XY difference'
+
+
+
+def test_heatmap_rows():
+    nan = np.nan
+    Tmax = np.array([[1.0, 2.0], [nan, nan], [5.0, nan], [2.0, 1.0]])
+    Tmin = Tmax - 10.0
+    components, values = evaPlot.heatmapRows(['a', 'b', 'c', 'd'], Tmax, Tmin)
+    # Hottest first, ties keep their order, components without data last
+    assert components == ['c', 'a', 'd', 'b']
+    np.testing.assert_array_equal(values, Tmax[[2, 0, 3, 1]])
+    components, values = evaPlot.heatmapRows(['a', 'b', 'c', 'd'], Tmax, Tmin, 'Tmin')
+    assert components == ['c', 'a', 'd', 'b']
+    np.testing.assert_array_equal(values, Tmin[[2, 0, 3, 1]])
+
+
+def test_heatmap_rows_without_time_steps():
+    components, values = evaPlot.heatmapRows(['a', 'b'], np.empty((2, 0)), np.empty((2, 0)))
+    assert components == ['a', 'b']
+    assert values.shape == (2, 0)
+
+
+@pytest.mark.parametrize('x, y, cell', [
+    (0.0, 0.0, (0, 0)),
+    (0.4, 2.49, (2, 0)),
+    (4.4, 2.0, (2, 4)),
+    (4.6, 2.0, None),
+    (1.0, 2.6, None),
+    (-0.6, 0.0, None),
+    (0.0, -0.6, None),
+    (None, None, None),
+])
+def test_heatmap_cell(x, y, cell):
+    assert evaPlot.heatmapCell((3, 5), x, y) == cell
+
+
+def test_index_label():
+    assert evaPlot.indexLabel([0.5, 1.0, 2.5], 1.6, '{:g}') == '2.5'
+    assert evaPlot.indexLabel(['a', 'b'], -0.4) == 'a'
+    assert evaPlot.indexLabel(['a', 'b'], 1.6) == ''
+    assert evaPlot.indexLabel([], 0.0) == ''
+
+
+@pytest.mark.parametrize('x, position', [(-5.0, 0), (0.0, 0), (0.4, 0), (0.6, 1), (2.0, 2), (9.0, 3), (10.0, 3), (50.0, 3)])
+def test_nearest_position(x, position):
+    assert evaPlot.nearestPosition(np.array([0.0, 1.0, 2.0, 10.0]), x) == position
+
+
+def test_nearest_sample():
+    nan = np.nan
+    time = np.array([0.0, 10.0, 20.0])
+    # Curves 0 and 1, curve 1 has no value at the last time step
+    index = evaPlot.hoverIndex([[20.0, 30.0, 40.0], [25.0, 10.0, nan]])
+    assert evaPlot.nearestSample(time, index, -100.0, 21.0) == (0, 0)
+    assert evaPlot.nearestSample(time, index, 0.0, 24.0) == (1, 0)
+    assert evaPlot.nearestSample(time, index, 11.0, 0.0) == (1, 1)
+    assert evaPlot.nearestSample(time, index, 11.0, 1000.0) == (0, 1)
+    assert evaPlot.nearestSample(time, index, 100.0, 0.0) == (0, 2)
+    assert evaPlot.nearestSample(time, index, 20.0, nan) is None
+    assert evaPlot.nearestSample(time, index, nan, 20.0) is None
+
+
+def test_nearest_sample_without_values():
+    time = np.array([0.0, 10.0])
+    index = evaPlot.hoverIndex(np.full((2, 2), np.nan))
+    assert evaPlot.nearestSample(time, index, 0.0, 20.0) is None
+    assert evaPlot.nearestSample(np.array([]), evaPlot.hoverIndex(np.empty((2, 0))), 0.0, 20.0) is None
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+""" Tests of the profiling decorator. """
+
+import os
+
+import pytest
+
+import evaProfile
+
+
+class Stage():
+    caseComb = '122'
+
+    @evaProfile.profiled('outer')
+    def outer(self, value):
+        return self.inner(value) + 1
+
+    @evaProfile.profiled('inner')
+    def inner(self, value):
+        return value * 2
+
+
+@pytest.fixture
+def profileDir(tmp_path, monkeypatch):
+    monkeypatch.setattr(evaProfile, 'folder', None)
+    return str(tmp_path / 'profiles')
+
+
+def test_disabled(profileDir):
+    assert Stage().outer(1) == 3
+    assert not os.path.exists(profileDir)
+
+
+def test_reports_outer_call_only(profileDir):
+    evaProfile.enable(profileDir)
+    assert Stage().outer(2) == 5
+    files = sorted(os.listdir(profileDir))
+    assert len(files) == 2
+    assert all(name.startswith('outer_122_') for name in files)
+    with open(os.path.join(profileDir, files[-1])) as f:
+        assert 'Hotspots by own time' in f.read()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+""" Tests of the file-lock work queue. """
+
+import os
+import shutil
+import time
+
+import evaIndex
+import evaQueue
+
+
+def waitFor(condition, timeout=5):
+    stop = time.time() + timeout
+    while not condition() and time.time() < stop:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_claim_is_exclusive(tmp_path):
+    folder = str(tmp_path)
+    first = evaQueue.claim(folder)
+    assert first is not None
+    assert evaQueue.claim(folder) is None
+    first.release()
+    assert not os.path.exists(os.path.join(folder, evaQueue.LOCK_FILE))
+    evaQueue.claim(folder).release()
+
+
+def test_recover_stale_claim(tmp_path):
+    lockPath = os.path.join(str(tmp_path), evaQueue.LOCK_FILE)
+    with open(lockPath, 'w') as f:
+        f.write('crashed:1 0.0\n')
+    assert evaQueue.claim(str(tmp_path), stale=60) is None
+    past = time.time() - 120
+    os.utime(lockPath, (past, past))
+    caseClaim = evaQueue.claim(str(tmp_path), stale=60)
+    assert caseClaim is not None
+    assert evaQueue.readFile(lockPath) == caseClaim.owner
+    caseClaim.release()
+
+
+def test_renew_goes_on_after_lock_was_missing(tmp_path):
+    lockPath = os.path.join(str(tmp_path), evaQueue.LOCK_FILE)
+    caseClaim = evaQueue.claim(str(tmp_path), stale=0.2)
+    aside = lockPath + '.aside'
+    os.rename(lockPath, aside)
+    time.sleep(0.15)
+    os.rename(aside, lockPath)
+    past = time.time() - 120
+    os.utime(lockPath, (past, past))
+    assert waitFor(lambda: time.time() - os.stat(lockPath).st_mtime < 60)
+    assert caseClaim.thread.is_alive()
+    caseClaim.release()
+
+
+def test_renew_stops_when_taken_over(tmp_path):
+    lockPath = os.path.join(str(tmp_path), evaQueue.LOCK_FILE)
+    caseClaim = evaQueue.claim(str(tmp_path), stale=0.2)
+    evaQueue.writeMarker(lockPath, 'other:1 0.0')
+    assert waitFor(lambda: not caseClaim.thread.is_alive())
+    caseClaim.release()
+    assert evaQueue.readFile(lockPath) == 'other:1 0.0'
+
+
+def test_finished_cases(tmp_path, outFile):
+    folder = os.path.join(str(tmp_path), 'Case_122')
+    os.makedirs(folder)
+    shutil.copy(outFile, folder)
+    index = evaIndex.CaseIndex(str(tmp_path))
+    worker = evaQueue.Worker(str(tmp_path), {})
+    assert not worker.isFinished(index, '122')
+    evaQueue.writeMarker(os.path.join(folder, evaQueue.DONE_FILE), evaQueue.signature(index.filePath('122')))
+    assert worker.isFinished(index, '122')
+    with open(index.filePath('122'), 'a') as f:
+        f.write('\n')
+    assert not worker.isFinished(index, '122')
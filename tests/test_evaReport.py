@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+""" Tests of the headless report rendering. """
+
+import os
+import shutil
+
+import evaReport
+
+
+def test_render_case_and_index(tmp_path, outFile):
+    folder = str(tmp_path / 'Case_122')
+    os.makedirs(folder)
+    shutil.copy(outFile, folder)
+    report = str(tmp_path / 'report')
+    os.makedirs(report)
+    summary = evaReport.renderCase('122', folder, report, components=['board5', 'battery_board2'])
+    assert os.path.isfile(os.path.join(report, summary['figure']))
+    assert summary['hottest'] == ('board5', 31.5)
+    assert summary['coldest'] == ('battery_board2', 17.5)
+
+    evaReport.writeIndex(os.path.join(report, 'index.html'), [summary])
+    with open(os.path.join(report, 'index.html')) as f:
+        page = f.read()
+    assert 'case_122.png' in page and 'Green PCB for Sidepanels' in page
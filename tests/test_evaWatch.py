@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+""" Tests of the watch-folder service, without starting it. """
+
+import os
+import shutil
+import time
+
+import evaIndex
+import evaWatch
+
+
+class Pool():
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, func, comb, path, options):
+        self.submitted.append(comb)
+
+
+def makeWatcher(tmp_path, outFile, age):
+    folder = os.path.join(str(tmp_path), 'Case_122')
+    os.makedirs(folder)
+    filePath = os.path.join(folder, 'MOVE_II_.out')
+    shutil.copy(outFile, filePath)
+    mtime = time.time() - age
+    os.utime(filePath, (mtime, mtime))
+    watcher = evaWatch.Watcher(str(tmp_path), {}, settle=60)
+    watcher.index = evaIndex.CaseIndex(str(tmp_path))
+    watcher.pending['122'] = watcher.index.cases['122']['mtime']
+    return watcher, filePath
+
+
+def test_submits_settled_output(tmp_path, outFile):
+    watcher, filePath = makeWatcher(tmp_path, outFile, 120)
+    pool = Pool()
+    watcher.submitSettled(pool)
+    assert pool.submitted == ['122']
+    assert watcher.pending == {}
+
+
+def test_waits_for_recent_output(tmp_path, outFile):
+    watcher, filePath = makeWatcher(tmp_path, outFile, 10)
+    pool = Pool()
+    watcher.submitSettled(pool)
+    assert pool.submitted == []
+    assert 50 - 1 < watcher.waitTime(True) <= 50
+
+
+def test_rechecks_output_before_submitting(tmp_path, outFile):
+    watcher, filePath = makeWatcher(tmp_path, outFile, 120)
+    os.utime(filePath, None)
+    pool = Pool()
+    watcher.submitSettled(pool)
+    assert pool.submitted == []
+    assert watcher.pending['122'] == os.path.getmtime(filePath)
+
+
+def test_refresh_checks_known_cases_when_woken(tmp_path, outFile):
+    watcher, filePath = makeWatcher(tmp_path, outFile, 120)
+    del watcher.pending['122']
+    with open(filePath, 'a') as f:
+        f.write('\n')
+    # Polling keeps to the check interval of the index
+    watcher.refresh(False)
+    assert watcher.pending == {}
+    watcher.refresh(True)
+    assert watcher.pending == {'122': os.path.getmtime(filePath)}